@@ -0,0 +1,207 @@
+# db/benchmark.py
+# Seeds a scratch database from schema.sql with synthetic data and times the
+# helpers/db_utils hot paths. Results are written as JSON so runs can be compared.
+#
+#   python -m db.benchmark --grants 300 --line-items 40 --months 60 --output bench.json
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "schema.sql")
+
+
+def month_keys(start, count):
+    year, month = start.year, start.month
+    keys = []
+    for _ in range(count):
+        keys.append(f"{year:04d}-{month:02d}")
+        month += 1
+        if month > 12:
+            year, month = year + 1, 1
+    return keys
+
+
+def seed(db_path, funders=20, grants=50, line_items=20, accounts=300, mappings=60,
+         months=36, parents=4, subcategories=30, rng_seed=42, overwrite=False):
+    """
+    Creates db_path from schema.sql and fills it with synthetic data. Returns row counts.
+    An existing db_path is only replaced with overwrite=True; otherwise FileExistsError.
+    """
+    rng = random.Random(rng_seed)
+    if os.path.exists(db_path):
+        if not overwrite:
+            raise FileExistsError(f"{db_path} already exists; pass --force to overwrite it with synthetic data.")
+        for path in (db_path, db_path + "-wal", db_path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    conn = sqlite3.connect(db_path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+
+    with conn:
+        conn.executemany("INSERT INTO funders (id, name, type) VALUES (?, ?, ?)",
+                         [(i, f"Funder {i}", rng.choice(["Government", "Foundation", "Corporate"]))
+                          for i in range(1, funders + 1)])
+        conn.executemany("INSERT INTO qb_parent_categories (id, name) VALUES (?, ?)",
+                         [(i, f"Parent {i}") for i in range(1, parents + 1)])
+        conn.executemany("INSERT INTO qb_categories (id, name, parent_id) VALUES (?, ?, ?)",
+                         [(i, f"Subcategory {i}", rng.randint(1, parents)) for i in range(1, subcategories + 1)])
+        codes = [str(10000 + i) for i in range(accounts)]
+        conn.executemany("INSERT INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)",
+                         [(code, f"Account {code}", rng.randint(1, subcategories)) for code in codes])
+
+        start = date(2021, 1, 1)
+        keys = month_keys(start, months)
+        end = f"{keys[-1]}-28"
+        li_id = 0
+        grant_rows, li_rows, map_rows, actual_rows, planned_rows = [], [], [], [], []
+        for g in range(1, grants + 1):
+            grant_rows.append((g, f"Grant {g}", rng.randint(1, funders), start.isoformat(), end,
+                               float(line_items * 50000), rng.choice(["Active", "Closed", "Pending"])))
+            grant_li = []
+            for n in range(line_items):
+                li_id += 1
+                grant_li.append(li_id)
+                li_rows.append((li_id, g, f"Line Item {n}", "", 50000.0))
+            for code in rng.sample(codes, min(mappings, len(codes))):
+                li = rng.choice(grant_li)
+                map_rows.append((g, code, li))
+                for m in keys:
+                    actual_rows.append((g, m, code, round(rng.uniform(0, 500), 2), "", li, "2024-01-01"))
+            for li in grant_li:
+                planned_rows.extend((g, li, m, round(50000.0 / months, 2)) for m in keys)
+
+        conn.executemany("""INSERT INTO grants (id, name, funder_id, start_date, end_date, total_award, status)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""", grant_rows)
+        conn.executemany("""INSERT INTO grant_line_items (id, grant_id, name, description, allocated_amount)
+                            VALUES (?, ?, ?, ?, ?)""", li_rows)
+        conn.executemany("""INSERT INTO qb_to_grant_mapping (grant_id, qb_code, grant_line_item_id)
+                            VALUES (?, ?, ?)""", map_rows)
+        conn.executemany("""INSERT INTO actual_expenses (grant_id, month, qb_code, amount, notes, line_item_id, date_submitted)
+                            VALUES (?, ?, ?, ?, ?, ?, ?)""", actual_rows)
+        conn.executemany("""INSERT INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+                            VALUES (?, ?, ?, ?)""", planned_rows)
+    conn.close()
+
+    return {
+        "funders": funders, "grants": grants, "line_items": len(li_rows), "qb_accounts": accounts,
+        "mappings": len(map_rows), "months": months,
+        "actual_expenses": len(actual_rows), "anticipated_expenses": len(planned_rows),
+    }
+
+
+def timed(func, repeat, setup=None):
+    """Runs func `repeat` times (setup untimed before each) and returns timing stats in ms."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "max_ms": round(samples[-1], 3),
+    }
+
+
+def run(db_path, repeat=20, rng_seed=42):
+    """Times the db_utils hot paths against db_path. Reads are timed with the query cache cleared."""
+    from helpers import db_connection
+    from helpers import db_utils
+    from helpers.query_cache import clear_cache
+    from helpers.summary import get_grant_summary_data
+
+    db_connection.close_all_connections()
+    db_connection.DB_PATH = db_path
+    rng = random.Random(rng_seed)
+
+    grant_ids = [row[0] for row in db_utils.fetch_all("SELECT id FROM grants")]
+    grant = db_utils.fetch_one("SELECT id, start_date, end_date FROM grants ORDER BY id LIMIT 1")
+    mapping = db_utils.fetch_one("""
+        SELECT grant_id, qb_code, grant_line_item_id FROM qb_to_grant_mapping WHERE grant_id = ? LIMIT 1
+    """, (grant[0],))
+    month = db_utils.fetch_one("SELECT MIN(month) FROM actual_expenses WHERE grant_id = ?", (grant[0],))[0]
+    line_item_id = db_utils.fetch_one("SELECT id FROM grant_line_items WHERE grant_id = ? LIMIT 1", (grant[0],))[0]
+
+    def reset_plan():
+        db_utils.execute_query("DELETE FROM anticipated_expenses WHERE line_item_id = ?", (line_item_id,))
+        clear_cache()
+
+    results = {
+        "get_all_grants": timed(db_utils.get_all_grants, repeat, clear_cache),
+        "get_mappings_for_grant": timed(lambda: db_utils.get_mappings_for_grant(rng.choice(grant_ids)),
+                                        repeat, clear_cache),
+        "save_actual_expense": timed(lambda: db_utils.save_actual_expense(
+            mapping[0], month, mapping[1], mapping[2], round(rng.uniform(0, 500), 2), "bench", date.today()
+        ), repeat),
+        "initialize_anticipated_expenses": timed(lambda: db_utils.initialize_anticipated_expenses(
+            grant[0], line_item_id, grant[1], grant[2], 50000.0
+        ), repeat, reset_plan),
+        "get_grant_summary_data": timed(lambda: get_grant_summary_data(rng.choice(grant_ids)),
+                                        repeat, clear_cache),
+    }
+    results["_connections_opened"] = db_connection.connections_opened()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the helpers/db_utils hot paths on synthetic data.")
+    parser.add_argument("--funders", type=int, default=20)
+    parser.add_argument("--grants", type=int, default=50)
+    parser.add_argument("--line-items", type=int, default=20, help="line items per grant")
+    parser.add_argument("--accounts", type=int, default=300, help="QB accounts in the chart")
+    parser.add_argument("--mappings", type=int, default=60, help="QB code mappings per grant")
+    parser.add_argument("--months", type=int, default=36, help="months of actual/anticipated expenses")
+    parser.add_argument("--repeat", type=int, default=20, help="timed runs per function")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--db", help="scratch database path (default: a temp file)")
+    parser.add_argument("--force", action="store_true", help="overwrite --db if it already exists")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    args = parser.parse_args(argv)
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix="grant_bench_"), "bench.db")
+    started = time.perf_counter()
+    try:
+        counts = seed(db_path, args.funders, args.grants, args.line_items, args.accounts,
+                      args.mappings, args.months, rng_seed=args.seed, overwrite=args.force)
+    except FileExistsError as e:
+        parser.error(str(e))
+    seed_seconds = round(time.perf_counter() - started, 3)
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "db_path": db_path,
+        "data": counts,
+        "seed_seconds": seed_seconds,
+        "results": run(db_path, args.repeat, args.seed),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"✅ Benchmark written to {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,92 @@
 import sqlite3
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from helpers.db_connection import apply_storage_profile
+from helpers.db_backend import BACKEND, get_backend
 
 # Always write the database to the root folder
 DB_PATH = os.path.join(os.path.dirname(__file__), "..", "grant_tracker.db")
 
+
+def table_exists(conn, table):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone() is not None
+
+
+def migrate(conn, schema):
+    """Brings a database created by any older schema version up to schema (the text of schema.sql)."""
+    # idx_actual_expenses_entry is UNIQUE; keep only the latest row of any duplicates
+    if table_exists(conn, "actual_expenses"):
+        conn.execute("""
+            DELETE FROM actual_expenses
+            WHERE id NOT IN (
+                SELECT MAX(id) FROM actual_expenses
+                GROUP BY grant_id, month, qb_code, line_item_id
+            )
+        """)
+
+    # idx_anticipated_entry replaces the non-unique idx_anticipated_lookup
+    if table_exists(conn, "anticipated_expenses"):
+        conn.execute("""
+            DELETE FROM anticipated_expenses
+            WHERE id NOT IN (
+                SELECT MIN(id) FROM anticipated_expenses
+                GROUP BY grant_id, line_item_id, month
+            )
+        """)
+        conn.execute("DROP INDEX IF EXISTS idx_anticipated_lookup")
+
+    # Every schema.sql statement is IF NOT EXISTS, so this only adds what the
+    # database is missing (e.g. the audit log or rollup_versions)
+    conn.executescript(schema)
+
+
+def backfill_rollup(conn):
+    """Populates monthly_rollup for databases that had expenses before its triggers existed."""
+    if conn.execute("SELECT 1 FROM monthly_rollup LIMIT 1").fetchone():
+        return
+    conn.execute("""
+        INSERT INTO monthly_rollup (grant_id, line_item_id, month, actual_total, anticipated_total)
+        SELECT grant_id, line_item_id, month, ROUND(SUM(actual), 2), ROUND(SUM(anticipated), 2)
+        FROM (
+            SELECT grant_id, line_item_id, month, IFNULL(amount, 0) AS actual, 0 AS anticipated
+            FROM actual_expenses
+            WHERE line_item_id IS NOT NULL AND month IS NOT NULL
+            UNION ALL
+            SELECT grant_id, line_item_id, month, 0, IFNULL(expected_amount, 0)
+            FROM anticipated_expenses
+            WHERE line_item_id IS NOT NULL AND month IS NOT NULL
+        )
+        GROUP BY grant_id, line_item_id, month
+    """)
+
+
+def init_postgres():
+    """Applies schema_postgres.sql to GRANT_TRACKER_DATABASE_URL (idempotent)."""
+    with open(os.path.join(os.path.dirname(__file__), "schema_postgres.sql"), "r") as f:
+        schema = f.read()
+    backend = get_backend()
+    with backend.get_connection() as conn:
+        conn.raw.cursor().execute(schema)  # raw cursor: the schema needs no placeholder rewriting
+    backend.close()
+
+
 try:
-    with sqlite3.connect(DB_PATH) as conn:
-        with open(os.path.join(os.path.dirname(__file__), "schema.sql"), "r") as f:
-            schema = f.read()
-        conn.executescript(schema)
-        conn.commit()
+    if BACKEND in ("postgres", "postgresql"):
+        init_postgres()
+    else:
+        with sqlite3.connect(DB_PATH) as conn:
+            # Journal mode is stored in the file; the other pragmas only matter for this run
+            apply_storage_profile(conn)
+            with open(os.path.join(os.path.dirname(__file__), "schema.sql"), "r") as f:
+                schema = f.read()
+            migrate(conn, schema)
+            backfill_rollup(conn)
+            conn.commit()
     print("✅ Database initialized successfully.")
 except Exception as e:
     print(f"❌ Initialization failed: {e}")
-    print("🗂 Using DB path:", DB_PATH)
-
-
+    print("🗂 Using DB path:", DB_PATH if BACKEND == "sqlite" else "GRANT_TRACKER_DATABASE_URL")
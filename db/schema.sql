@@ -106,7 +106,8 @@ CREATE TABLE IF NOT EXISTS actual_expenses (
     FOREIGN KEY (grant_id) REFERENCES grants(id) ON DELETE CASCADE,
     FOREIGN KEY (qb_code) REFERENCES qb_accounts(code),
     FOREIGN KEY (line_item_id) REFERENCES grant_line_items(id) ON DELETE CASCADE
-    -- UNIQUE (grant_id, month, qb_code, line_item_id)
+    -- UNIQUE (grant_id, month, qb_code, line_item_id) is enforced by
+    -- idx_actual_expenses_entry below so existing databases pick it up too
 
 
 );
@@ -125,6 +126,178 @@ CREATE TABLE IF NOT EXISTS anticipated_expenses (
 
 
 
+-- Table: Monthly Rollup (maintained by the triggers below)
+-- Actual and anticipated totals per grant/line item/month so summaries read
+-- O(line items x months) rows instead of every expense row.
+-- Rebuild or verify with: python -m helpers.rollup rebuild|verify
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    grant_id INTEGER NOT NULL,
+    line_item_id INTEGER NOT NULL,
+    month TEXT NOT NULL,              -- e.g., "2025-06"
+    actual_total REAL NOT NULL DEFAULT 0.0,
+    anticipated_total REAL NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (grant_id, line_item_id, month)
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_actual_insert
+AFTER INSERT ON actual_expenses
+WHEN NEW.line_item_id IS NOT NULL AND NEW.month IS NOT NULL
+BEGIN
+    INSERT INTO monthly_rollup (grant_id, line_item_id, month, actual_total)
+    VALUES (NEW.grant_id, NEW.line_item_id, NEW.month, IFNULL(NEW.amount, 0))
+    ON CONFLICT (grant_id, line_item_id, month)
+    DO UPDATE SET actual_total = ROUND(actual_total + excluded.actual_total, 2);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_actual_delete
+AFTER DELETE ON actual_expenses
+WHEN OLD.line_item_id IS NOT NULL AND OLD.month IS NOT NULL
+BEGIN
+    UPDATE monthly_rollup
+    SET actual_total = ROUND(actual_total - IFNULL(OLD.amount, 0), 2)
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month;
+    DELETE FROM monthly_rollup
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month
+      AND actual_total = 0 AND anticipated_total = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_actual_update
+AFTER UPDATE OF grant_id, line_item_id, month, amount ON actual_expenses
+BEGIN
+    UPDATE monthly_rollup
+    SET actual_total = ROUND(actual_total - IFNULL(OLD.amount, 0), 2)
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month;
+    INSERT INTO monthly_rollup (grant_id, line_item_id, month, actual_total)
+    SELECT NEW.grant_id, NEW.line_item_id, NEW.month, IFNULL(NEW.amount, 0)
+    WHERE NEW.line_item_id IS NOT NULL AND NEW.month IS NOT NULL
+    ON CONFLICT (grant_id, line_item_id, month)
+    DO UPDATE SET actual_total = ROUND(actual_total + excluded.actual_total, 2);
+    DELETE FROM monthly_rollup
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month
+      AND actual_total = 0 AND anticipated_total = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_anticipated_insert
+AFTER INSERT ON anticipated_expenses
+WHEN NEW.line_item_id IS NOT NULL AND NEW.month IS NOT NULL
+BEGIN
+    INSERT INTO monthly_rollup (grant_id, line_item_id, month, anticipated_total)
+    VALUES (NEW.grant_id, NEW.line_item_id, NEW.month, IFNULL(NEW.expected_amount, 0))
+    ON CONFLICT (grant_id, line_item_id, month)
+    DO UPDATE SET anticipated_total = ROUND(anticipated_total + excluded.anticipated_total, 2);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_anticipated_delete
+AFTER DELETE ON anticipated_expenses
+WHEN OLD.line_item_id IS NOT NULL AND OLD.month IS NOT NULL
+BEGIN
+    UPDATE monthly_rollup
+    SET anticipated_total = ROUND(anticipated_total - IFNULL(OLD.expected_amount, 0), 2)
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month;
+    DELETE FROM monthly_rollup
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month
+      AND actual_total = 0 AND anticipated_total = 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_anticipated_update
+AFTER UPDATE OF grant_id, line_item_id, month, expected_amount ON anticipated_expenses
+BEGIN
+    UPDATE monthly_rollup
+    SET anticipated_total = ROUND(anticipated_total - IFNULL(OLD.expected_amount, 0), 2)
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month;
+    INSERT INTO monthly_rollup (grant_id, line_item_id, month, anticipated_total)
+    SELECT NEW.grant_id, NEW.line_item_id, NEW.month, IFNULL(NEW.expected_amount, 0)
+    WHERE NEW.line_item_id IS NOT NULL AND NEW.month IS NOT NULL
+    ON CONFLICT (grant_id, line_item_id, month)
+    DO UPDATE SET anticipated_total = ROUND(anticipated_total + excluded.anticipated_total, 2);
+    DELETE FROM monthly_rollup
+    WHERE grant_id = OLD.grant_id AND line_item_id = OLD.line_item_id AND month = OLD.month
+      AND actual_total = 0 AND anticipated_total = 0;
+END;
+
+
+-- Table: Rollup Versions (maintained by the triggers below)
+-- A per-grant counter bumped whenever one of the grant's monthly_rollup rows
+-- changes, so helpers/projections.py only recomputes the grants that did.
+CREATE TABLE IF NOT EXISTS rollup_versions (
+    grant_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_version_insert
+AFTER INSERT ON monthly_rollup
+BEGIN
+    INSERT INTO rollup_versions (grant_id, version) VALUES (NEW.grant_id, 1)
+    ON CONFLICT (grant_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_version_update
+AFTER UPDATE ON monthly_rollup
+BEGIN
+    INSERT INTO rollup_versions (grant_id, version) VALUES (NEW.grant_id, 1)
+    ON CONFLICT (grant_id) DO UPDATE SET version = version + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_version_delete
+AFTER DELETE ON monthly_rollup
+BEGIN
+    INSERT INTO rollup_versions (grant_id, version) VALUES (OLD.grant_id, 1)
+    ON CONFLICT (grant_id) DO UPDATE SET version = version + 1;
+END;
+
+
+-- Table: Audit Log (append-only)
+-- One row per changed record of actual_expenses, anticipated_expenses or
+-- grant_line_items, written by helpers/audit.py in the same transaction as
+-- the edit. Old rows are folded into audit_snapshots by
+-- python -m helpers.audit_history compact
+CREATE TABLE IF NOT EXISTS audit_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    changed_at TEXT NOT NULL,         -- e.g., "2025-06-03T14:21:07"
+    changed_by TEXT,
+    page TEXT,                        -- e.g., "pages/monthly_planning.py"
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,            -- key columns joined with "|", e.g., "3|2025-06|8705|12"
+    grant_id INTEGER,
+    month TEXT,
+    changes TEXT NOT NULL             -- JSON {column: [old, new]}
+);
+
+-- Table: Audit Snapshots (compacted audit_log rows, one per record and compaction)
+CREATE TABLE IF NOT EXISTS audit_snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    grant_id INTEGER,
+    month TEXT,
+    first_changed_at TEXT,
+    last_changed_at TEXT,
+    edits INTEGER NOT NULL,           -- audit_log rows folded in
+    changes TEXT NOT NULL             -- JSON {column: [value before first edit, value after last edit]}
+);
+
+-- Table: Audit Compaction (flag row)
+-- helpers.audit_history.compact_audit_log inserts a row while it deletes the
+-- audit_log rows it has folded and removes it before committing; audit_log
+-- deletes are refused at any other time.
+CREATE TABLE IF NOT EXISTS audit_compaction (
+    started_at TEXT NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_audit_log_append_only
+BEFORE UPDATE ON audit_log
+BEGIN
+    SELECT RAISE(ABORT, 'audit_log is append-only');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_audit_log_no_delete
+BEFORE DELETE ON audit_log
+WHEN NOT EXISTS (SELECT 1 FROM audit_compaction)
+BEGIN
+    SELECT RAISE(ABORT, 'audit_log rows are only removed by compaction');
+END;
+
+
 -- Future: Add tables for GrantYears, FTE allocations, and Team Buckets for reporting.
 -- Future: Metrics per Grant and Outcomes/Goals
 
@@ -158,4 +331,12 @@ CREATE INDEX IF NOT EXISTS idx_mapping_line_item ON qb_to_grant_mapping(grant_li
 CREATE INDEX IF NOT EXISTS idx_expenses_grant_month ON actual_expenses(grant_id, month);
 CREATE INDEX IF NOT EXISTS idx_qb_accounts_code ON qb_accounts(code);
 CREATE INDEX IF NOT EXISTS idx_expenses_line_item ON actual_expenses(line_item_id);
-CREATE INDEX IF NOT EXISTS idx_anticipated_lookup ON anticipated_expenses(grant_id, line_item_id, month);
\ No newline at end of file
+-- One anticipated row per grant/line item/month (lets INSERT OR IGNORE skip months already planned)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_anticipated_entry ON anticipated_expenses(grant_id, line_item_id, month);
+
+-- One actual expense row per grant/month/QB code/line item (target of the upsert in save_actual_expenses_bulk)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_actual_expenses_entry ON actual_expenses(grant_id, month, qb_code, line_item_id);
+
+-- Per-grant and per-month audit history
+CREATE INDEX IF NOT EXISTS idx_audit_log_grant_month ON audit_log(grant_id, month);
+CREATE INDEX IF NOT EXISTS idx_audit_snapshots_grant_month ON audit_snapshots(grant_id, month);
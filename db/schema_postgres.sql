@@ -0,0 +1,223 @@
+-- PostgreSQL version of schema.sql, used when GRANT_TRACKER_DB_BACKEND=postgres.
+-- Keep the two files in step. Dates stay TEXT (ISO strings) because the pages
+-- parse them with date.fromisoformat; money columns are NUMERIC and come back
+-- to the app as floats (see helpers/db_backend.py).
+
+-- Table: Funders
+CREATE TABLE IF NOT EXISTS funders (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,               -- e.g., "W.K. Kellogg Foundation"
+    type TEXT,                        -- e.g., "private", "federal", "state"
+    contact_email TEXT,
+    notes TEXT
+);
+
+-- Table: Grants
+CREATE TABLE IF NOT EXISTS grants (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,        -- e.g., "Baker 2024"
+    funder_id INTEGER REFERENCES funders(id),
+    start_date TEXT,
+    end_date TEXT,
+    total_award NUMERIC(14, 2),
+    status TEXT,                      -- e.g., "active", "closed", "Pending"
+    notes TEXT
+);
+
+-- Table: Grant Line Items
+CREATE TABLE IF NOT EXISTS grant_line_items (
+    id SERIAL PRIMARY KEY,
+    grant_id INTEGER REFERENCES grants(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,               -- e.g., "Salaries & Fringe"
+    description TEXT,
+    allocated_amount NUMERIC(14, 2) DEFAULT 0.0,
+    UNIQUE (grant_id, name)
+);
+
+-- Table: Parent Categories e.g., 'Expenses', 'Income'
+CREATE TABLE IF NOT EXISTS qb_parent_categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    description TEXT
+);
+
+-- Table: Mid-Level Categories
+CREATE TABLE IF NOT EXISTS qb_categories (
+    id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    parent_id INTEGER REFERENCES qb_parent_categories(id) ON DELETE CASCADE
+);
+
+-- Table: Leaf Level QB Accounts
+CREATE TABLE IF NOT EXISTS qb_accounts (
+    code TEXT PRIMARY KEY,            -- e.g., "8705"
+    name TEXT NOT NULL,
+    category_id INTEGER NOT NULL REFERENCES qb_categories(id) ON DELETE CASCADE
+);
+
+-- Table: Mapping QB codes to Grant-specific Line Items
+CREATE TABLE IF NOT EXISTS qb_to_grant_mapping (
+    id SERIAL PRIMARY KEY,
+    grant_id INTEGER REFERENCES grants(id) ON DELETE CASCADE,
+    qb_code TEXT REFERENCES qb_accounts(code),
+    grant_line_item_id INTEGER REFERENCES grant_line_items(id) ON DELETE CASCADE,
+    UNIQUE (grant_id, qb_code, grant_line_item_id)
+);
+
+-- Table: Monthly Actual Expenses
+CREATE TABLE IF NOT EXISTS actual_expenses (
+    id SERIAL PRIMARY KEY,
+    grant_id INTEGER NOT NULL REFERENCES grants(id) ON DELETE CASCADE,
+    month TEXT,                       -- e.g., "2025-06"
+    qb_code TEXT REFERENCES qb_accounts(code),
+    amount NUMERIC(14, 2),
+    notes TEXT,
+    line_item_id INTEGER REFERENCES grant_line_items(id) ON DELETE CASCADE,
+    date_submitted TEXT
+);
+
+-- Table: Monthly Anticipated Expenses
+CREATE TABLE IF NOT EXISTS anticipated_expenses (
+    id SERIAL PRIMARY KEY,
+    grant_id INTEGER REFERENCES grants(id) ON DELETE CASCADE,
+    line_item_id INTEGER REFERENCES grant_line_items(id) ON DELETE CASCADE,
+    month TEXT,
+    expected_amount NUMERIC(14, 2)
+);
+
+-- Table: Monthly Rollup (maintained by the triggers below)
+CREATE TABLE IF NOT EXISTS monthly_rollup (
+    grant_id INTEGER NOT NULL,
+    line_item_id INTEGER NOT NULL,
+    month TEXT NOT NULL,
+    actual_total NUMERIC(14, 2) NOT NULL DEFAULT 0.0,
+    anticipated_total NUMERIC(14, 2) NOT NULL DEFAULT 0.0,
+    PRIMARY KEY (grant_id, line_item_id, month)
+);
+
+CREATE OR REPLACE FUNCTION rollup_apply(p_grant INTEGER, p_line_item INTEGER, p_month TEXT,
+                                        p_actual NUMERIC, p_anticipated NUMERIC) RETURNS void AS $$
+BEGIN
+    IF p_line_item IS NULL OR p_month IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO monthly_rollup (grant_id, line_item_id, month, actual_total, anticipated_total)
+    VALUES (p_grant, p_line_item, p_month, p_actual, p_anticipated)
+    ON CONFLICT (grant_id, line_item_id, month) DO UPDATE SET
+        actual_total = monthly_rollup.actual_total + EXCLUDED.actual_total,
+        anticipated_total = monthly_rollup.anticipated_total + EXCLUDED.anticipated_total;
+    DELETE FROM monthly_rollup
+    WHERE grant_id = p_grant AND line_item_id = p_line_item AND month = p_month
+      AND actual_total = 0 AND anticipated_total = 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trg_rollup_actual() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM rollup_apply(OLD.grant_id, OLD.line_item_id, OLD.month, -COALESCE(OLD.amount, 0), 0);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM rollup_apply(NEW.grant_id, NEW.line_item_id, NEW.month, COALESCE(NEW.amount, 0), 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION trg_rollup_anticipated() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM rollup_apply(OLD.grant_id, OLD.line_item_id, OLD.month, 0, -COALESCE(OLD.expected_amount, 0));
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM rollup_apply(NEW.grant_id, NEW.line_item_id, NEW.month, 0, COALESCE(NEW.expected_amount, 0));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_actual ON actual_expenses;
+CREATE TRIGGER trg_rollup_actual
+AFTER INSERT OR DELETE OR UPDATE OF grant_id, line_item_id, month, amount ON actual_expenses
+FOR EACH ROW EXECUTE FUNCTION trg_rollup_actual();
+
+DROP TRIGGER IF EXISTS trg_rollup_anticipated ON anticipated_expenses;
+CREATE TRIGGER trg_rollup_anticipated
+AFTER INSERT OR DELETE OR UPDATE OF grant_id, line_item_id, month, expected_amount ON anticipated_expenses
+FOR EACH ROW EXECUTE FUNCTION trg_rollup_anticipated();
+
+-- Per-grant counter bumped on every monthly_rollup change (see db/schema.sql)
+CREATE TABLE IF NOT EXISTS rollup_versions (
+    grant_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION trg_rollup_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO rollup_versions (grant_id, version)
+    VALUES (CASE WHEN TG_OP = 'DELETE' THEN OLD.grant_id ELSE NEW.grant_id END, 1)
+    ON CONFLICT (grant_id) DO UPDATE SET version = rollup_versions.version + 1;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rollup_version ON monthly_rollup;
+CREATE TRIGGER trg_rollup_version
+AFTER INSERT OR UPDATE OR DELETE ON monthly_rollup
+FOR EACH ROW EXECUTE FUNCTION trg_rollup_version();
+
+-- Audit log (append-only; see db/schema.sql)
+CREATE TABLE IF NOT EXISTS audit_log (
+    id SERIAL PRIMARY KEY,
+    changed_at TEXT NOT NULL,
+    changed_by TEXT,
+    page TEXT,
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    grant_id INTEGER,
+    month TEXT,
+    changes TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS audit_snapshots (
+    id SERIAL PRIMARY KEY,
+    table_name TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    grant_id INTEGER,
+    month TEXT,
+    first_changed_at TEXT,
+    last_changed_at TEXT,
+    edits INTEGER NOT NULL,
+    changes TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS audit_compaction (
+    started_at TEXT NOT NULL
+);
+
+-- Deletes only while compact_audit_log holds its audit_compaction flag row
+CREATE OR REPLACE FUNCTION trg_audit_log_append_only() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' AND EXISTS (SELECT 1 FROM audit_compaction) THEN
+        RETURN OLD;
+    END IF;
+    RAISE EXCEPTION 'audit_log is append-only';
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_audit_log_append_only ON audit_log;
+CREATE TRIGGER trg_audit_log_append_only
+BEFORE UPDATE OR DELETE ON audit_log
+FOR EACH ROW EXECUTE FUNCTION trg_audit_log_append_only();
+
+-- Indexes
+CREATE INDEX IF NOT EXISTS idx_grants_funder_id ON grants(funder_id);
+CREATE INDEX IF NOT EXISTS idx_lineitems_grant_id ON grant_line_items(grant_id);
+CREATE INDEX IF NOT EXISTS idx_mapping_grant ON qb_to_grant_mapping(grant_id);
+CREATE INDEX IF NOT EXISTS idx_mapping_line_item ON qb_to_grant_mapping(grant_line_item_id);
+CREATE INDEX IF NOT EXISTS idx_expenses_grant_month ON actual_expenses(grant_id, month);
+CREATE INDEX IF NOT EXISTS idx_expenses_line_item ON actual_expenses(line_item_id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_anticipated_entry ON anticipated_expenses(grant_id, line_item_id, month);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_actual_expenses_entry ON actual_expenses(grant_id, month, qb_code, line_item_id);
+CREATE INDEX IF NOT EXISTS idx_audit_log_grant_month ON audit_log(grant_id, month);
+CREATE INDEX IF NOT EXISTS idx_audit_snapshots_grant_month ON audit_snapshots(grant_id, month);
@@ -0,0 +1,134 @@
+# helpers/audit.py
+# Append-only history of financial edits (actual and anticipated expenses,
+# line item budgets). Writers snapshot the rows they are about to change with
+# one query, write, then append one audit_log row per changed record in the
+# same transaction, so an edit and its history commit or roll back together.
+# History queries and compaction live in helpers/audit_history.py.
+
+import getpass
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from helpers.query_log import calling_page
+
+DEFAULT_USER = os.environ.get("GRANT_TRACKER_USER") or getpass.getuser()
+
+# Audited tables: natural key columns and the columns whose changes are kept
+AUDITED = {
+    "actual_expenses": {"key": ("grant_id", "month", "qb_code", "line_item_id"), "fields": ("amount", "notes")},
+    "anticipated_expenses": {"key": ("grant_id", "line_item_id", "month"), "fields": ("expected_amount",)},
+    "grant_line_items": {"key": ("id",), "fields": ("name", "description", "allocated_amount")},
+}
+
+_local = threading.local()
+_encode = json.JSONEncoder(separators=(",", ":"), default=str).encode  # built once; json.dumps(default=...) is not
+
+
+# --- Actor ---
+SESSION_USER_KEY = "audit_user"  # st.session_state key holding the editor's name
+
+
+@contextmanager
+def audit_context(user=None, page=None):
+    """Attributes edits made inside the block to user / page (e.g. for scripts and imports)."""
+    previous = getattr(_local, "actor", None)
+    _local.actor = (user, page)
+    try:
+        yield
+    finally:
+        _local.actor = previous
+
+
+@contextmanager
+def session_edits(session, page):
+    """
+    audit_context for a page save: the user is the name stored in the
+    Streamlit session (session[SESSION_USER_KEY]). Raises ValueError when no
+    name has been entered, so page edits never fall back to the server's
+    OS account.
+    """
+    user = str(session.get(SESSION_USER_KEY) or "").strip()
+    if not user:
+        raise ValueError("Enter your name in the sidebar before saving; it is recorded in the Audit Trail.")
+    with audit_context(user, page):
+        yield
+
+
+def _actor():
+    user, page = getattr(_local, "actor", None) or (None, None)
+    return user or DEFAULT_USER, page or calling_page()[0]
+
+
+# --- Recording ---
+def snapshot(conn, table, **filters):
+    """
+    Current audited values of the table rows matching every column=values
+    filter, read on the writer's connection: {key tuple: {column: value}}
+    (grant_id included).
+    """
+    spec = AUDITED[table]
+    conditions, params = [], []
+    for column, values in filters.items():
+        values = list(set(values))
+        if not values:
+            return {}
+        conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+        params.extend(values)
+    columns = list(dict.fromkeys(spec["key"] + ("grant_id",) + spec["fields"]))
+    rows = conn.execute(
+        f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(conditions)}", params
+    ).fetchall()
+    width = len(spec["key"])
+    return {tuple(row[:width]): dict(zip(columns, row)) for row in rows}
+
+
+def _differs(old, new):
+    if isinstance(old, (int, float)) and isinstance(new, (int, float)):
+        return abs(old - new) >= 0.005
+    return (old or None) != (new or None)  # '' and NULL notes are the same
+
+
+def record(conn, table, before, after):
+    """
+    Appends one audit_log row per key in after ({key: {column: new value}})
+    whose audited values differ from before (see snapshot); a new row counts
+    as changed from NULL, so zero / blank inserts are not logged. Runs on the
+    writer's connection inside its transaction. Returns the rows appended.
+    """
+    spec = AUDITED[table]
+    user, page = _actor()
+    changed_at = datetime.now().isoformat(timespec="seconds")
+    entries = []
+    for key, new in after.items():
+        old = before.get(key, {})
+        changes = {
+            field: [old.get(field), new[field]]
+            for field in spec["fields"]
+            if field in new and _differs(old.get(field), new[field])
+        }
+        if not changes:
+            continue
+        grant_id = new.get("grant_id", old.get("grant_id"))
+        entries.append((
+            changed_at, user, page, table, "|".join(str(k) for k in key), grant_id,
+            new.get("month", old.get("month")), _encode(changes),
+        ))
+    if entries:
+        conn.executemany("""
+            INSERT INTO audit_log (changed_at, changed_by, page, table_name, row_key, grant_id, month, changes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, entries)
+    return len(entries)
+
+
+def record_deletes(conn, table, before):
+    """
+    Appends audit_log rows for the snapshotted rows a delete removes: every
+    audited value changes to NULL (zero / blank values are not logged, as
+    for inserts). Returns the rows appended.
+    """
+    fields = AUDITED[table]["fields"]
+    return record(conn, table, before, {key: dict.fromkeys(fields) for key in before})
@@ -0,0 +1,116 @@
+# helpers/audit_history.py
+# Reads and maintains the audit trail written by helpers/audit.py. Old
+# audit_log rows are periodically folded into audit_snapshots (value before
+# the first edit / after the last one per record) to keep the log small.
+#
+#   python -m helpers.audit_history compact --days 365
+
+import argparse
+import json
+import os
+import sys
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from helpers.db_utils import fetch_df, transaction
+from helpers.query_cache import cached, invalidates
+
+COMPACT_AFTER_DAYS = int(os.environ.get("GRANT_TRACKER_AUDIT_COMPACT_DAYS", "365"))
+MIN_RETENTION_DAYS = int(os.environ.get("GRANT_TRACKER_AUDIT_MIN_DAYS", "90"))  # recent edits always kept in full
+
+
+# --- History ---
+@cached("audit_log")
+def get_audit_history(grant_id, month=None, table=None, limit=1000):
+    """
+    Changes for a grant (optionally one month / table), newest first, from
+    the log and from compacted snapshots. changes is {column: [old, new]}.
+    """
+    filters, params = "", [grant_id]
+    if month:
+        filters += " AND month = ?"
+        params.append(month)
+    if table:
+        filters += " AND table_name = ?"
+        params.append(table)
+    df = fetch_df(f"""
+        SELECT changed_at, changed_by, page, table_name, row_key, month, changes, 1 AS edits
+        FROM audit_log
+        WHERE grant_id = ?{filters}
+        UNION ALL
+        SELECT last_changed_at, NULL, NULL, table_name, row_key, month, changes, edits
+        FROM audit_snapshots
+        WHERE grant_id = ?{filters}
+        ORDER BY 1 DESC
+        LIMIT ?
+    """, params + params + [int(limit)])
+    df["changes"] = df["changes"].map(json.loads)
+    return df
+
+
+# --- Compaction ---
+@invalidates("audit_log")
+def compact_audit_log(older_than_days=COMPACT_AFTER_DAYS):
+    """
+    Folds audit_log rows older than the cutoff into one audit_snapshots row
+    per record (value before its first edit, value after its last) and
+    deletes them, in one transaction. Returns the number of log rows folded.
+    Raises ValueError below MIN_RETENTION_DAYS.
+    """
+    if older_than_days < MIN_RETENTION_DAYS:
+        raise ValueError(f"Audit history is kept in full for at least {MIN_RETENTION_DAYS} days.")
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat(timespec="seconds")
+    with transaction() as conn:
+        rows = conn.execute("""
+            SELECT id, changed_at, table_name, row_key, grant_id, month, changes
+            FROM audit_log
+            WHERE changed_at < ?
+            ORDER BY id
+        """, (cutoff,)).fetchall()
+        if not rows:
+            return 0
+
+        folded = defaultdict(lambda: {"changes": {}, "edits": 0})
+        for _, changed_at, table, row_key, grant_id, month, changes in rows:
+            entry = folded[(table, row_key)]
+            entry.setdefault("first", changed_at)
+            entry.update(last=changed_at, grant_id=grant_id, month=month)
+            entry["edits"] += 1
+            for field, (old, new) in json.loads(changes).items():
+                first_old = entry["changes"].get(field, [old])[0]
+                entry["changes"][field] = [first_old, new]
+
+        conn.executemany("""
+            INSERT INTO audit_snapshots
+                (table_name, row_key, grant_id, month, first_changed_at, last_changed_at, edits, changes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (table, row_key, e["grant_id"], e["month"], e["first"], e["last"], e["edits"],
+             json.dumps(e["changes"], default=str))
+            for (table, row_key), e in folded.items()
+        ])
+        # The audit_log delete trigger only lets rows go while the flag row exists
+        conn.execute("INSERT INTO audit_compaction (started_at) VALUES (?)",
+                     (datetime.now().isoformat(timespec="seconds"),))
+        conn.execute("DELETE FROM audit_log WHERE id <= ? AND changed_at < ?", (rows[-1][0], cutoff))
+        conn.execute("DELETE FROM audit_compaction")
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the financial edit audit log.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact = sub.add_parser("compact", help="fold old log rows into snapshots")
+    compact.add_argument("--days", type=int, default=COMPACT_AFTER_DAYS, help="keep this many days in full")
+    args = parser.parse_args(argv)
+
+    try:
+        folded = compact_audit_log(args.days)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"✅ {folded} audit log row(s) compacted")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
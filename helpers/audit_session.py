@@ -0,0 +1,25 @@
+# helpers/audit_session.py
+# Streamlit side of the audit trail: every page that writes asks for the
+# editor's name in the sidebar (kept in st.session_state for the session) and
+# wraps its saves in audited(page) so audit_log records who and where.
+
+import streamlit as st
+
+from helpers.audit import SESSION_USER_KEY, session_edits
+
+
+def editor_name_input():
+    """Sidebar field for the editor's name, shared across pages for the session."""
+    st.session_state[SESSION_USER_KEY] = st.sidebar.text_input(
+        "👤 Your Name",
+        value=st.session_state.get(SESSION_USER_KEY, ""),
+        help="Recorded with every change in the Audit Trail.",
+    ).strip()
+
+
+def audited(page):
+    """session_edits for this session; shows an error and stops the run when no name is set."""
+    if not st.session_state.get(SESSION_USER_KEY):
+        st.error("⚠️ Enter your name in the sidebar before saving; it is recorded in the Audit Trail.")
+        st.stop()
+    return session_edits(st.session_state, page)
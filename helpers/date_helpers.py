@@ -1,23 +1,78 @@
 # helpers/date_helpers.py
 
+import functools
 from datetime import datetime
-from dateutil.relativedelta import relativedelta
+
+import numpy as np
+import pandas as pd
 
 def generate_month_range(start_date, end_date):
     """
     Returns a list of 'YYYY-MM' strings between two dates, inclusive.
     """
-    if isinstance(start_date, str):
-        start_date = datetime.strptime(start_date, "%Y-%m-%d")
-    if isinstance(end_date, str):
-        end_date = datetime.strptime(end_date, "%Y-%m-%d")
+    return list(_cached_month_range(start_date, end_date))
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_month_range(start_date, end_date):
+    return tuple(month_ranges([start_date], [end_date])["month"])
+
+
+def _to_timestamps(dates):
+    return pd.DatetimeIndex([
+        datetime.strptime(d, "%Y-%m-%d") if isinstance(d, str) else pd.Timestamp(d) for d in dates
+    ])
+
+
+def month_ranges(start_dates, end_dates):
+    """
+    Month keys for many date ranges at once. Returns a DataFrame with one row
+    per (range, month): "row" is the position of the range in the inputs and
+    "month" the 'YYYY-MM' key, in order.
+
+    Matches stepping from start_date one month at a time while <= end_date:
+    a start day past the end of a shorter month is clamped and stays clamped,
+    so the end month only counts when the clamped day is <= the end day.
+    """
+    starts, ends = _to_timestamps(start_dates), _to_timestamps(end_dates)
+    if len(starts) != len(ends):
+        raise ValueError("start_dates and end_dates must be the same length.")
+
+    start_idx = starts.year.to_numpy() * 12 + starts.month.to_numpy() - 1
+    end_idx = ends.year.to_numpy() * 12 + ends.month.to_numpy() - 1
+    counts = np.clip(end_idx - start_idx + 1, 0, None)
+    total = int(counts.sum())
+    if total == 0:
+        return pd.DataFrame({"row": np.empty(0, dtype=int), "month": np.empty(0, dtype=object)})
+
+    row = np.repeat(np.arange(len(counts)), counts)
+    step = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    month_idx = start_idx[row] + step
+    year, month = month_idx // 12, month_idx % 12 + 1
+
+    # Day actually reached in each month: the start day, clamped by every month passed so far
+    days_in_month = pd.DatetimeIndex(pd.to_datetime({"year": year, "month": month, "day": 1})).days_in_month.to_numpy()
+    day = np.where(step == 0, starts.day.to_numpy()[row], days_in_month)
+    day = pd.Series(day).groupby(row).cummin().to_numpy()
+
+    end_times = (ends - ends.normalize()).to_numpy()[row]
+    start_times = (starts - starts.normalize()).to_numpy()[row]
+    keep = (month_idx < end_idx[row]) | (day < ends.day.to_numpy()[row]) | (
+        (day == ends.day.to_numpy()[row]) & (start_times <= end_times)
+    )
+    keys = np.char.add(np.char.add(np.char.zfill(year.astype(str), 4), "-"), np.char.zfill(month.astype(str), 2))
+    return pd.DataFrame({"row": row[keep], "month": keys[keep].astype(object)})
+
 
-    months = []
-    current = start_date
-    while current <= end_date:
-        months.append(current.strftime("%Y-%m"))
-        current += relativedelta(months=1)
-    return months
+@functools.lru_cache(maxsize=None)
+def month_label(month):
+    """'2025-06' -> 'Jun 2025', parsed once per key."""
+    return datetime.strptime(month, "%Y-%m").strftime("%b %Y")
+
+
+def month_label_map(months):
+    """{'YYYY-MM': 'Mon YYYY'} for the given month keys."""
+    return {m: month_label(m) for m in months}
 
 
 
@@ -28,18 +83,44 @@ def validate_date_range(start_date, end_date):
         raise ValueError("End date must be after start date.")
 
 
-def distribute_amount_evenly(allocated_amount: float, months: list[str]) -> dict[str, float]:
-    """Evenly distribute the allocated amount across the months without exceeding it."""
-    monthly_base = round(allocated_amount / len(months), 2)
-    distribution = {month: monthly_base for month in months}
+def _even_split(allocated_amount, month_count):
+    """(monthly base, last month amount) under the even-distribution rounding rule."""
+    monthly_base = round(allocated_amount / month_count, 2)
 
     # Calculate how much was actually distributed
-    total_distributed = round(monthly_base * len(months), 2)
+    total_distributed = round(monthly_base * month_count, 2)
     remainder = round(allocated_amount - total_distributed, 2)
 
     # Add the remainder to the final month to match total
     if remainder != 0:
-        last_month = months[-1]
-        distribution[last_month] = round(distribution[last_month] + remainder, 2)
+        return monthly_base, round(monthly_base + remainder, 2)
+    return monthly_base, monthly_base
+
 
+def distribute_amount_evenly(allocated_amount: float, months: list[str]) -> dict[str, float]:
+    """Evenly distribute the allocated amount across the months without exceeding it."""
+    monthly_base, last = _even_split(allocated_amount, len(months))
+    distribution = {month: monthly_base for month in months}
+    distribution[months[-1]] = last
     return distribution
+
+
+def distribute_amounts_evenly(allocated_amounts, month_counts) -> np.ndarray:
+    """
+    Spreads many allocations at once: allocated_amounts[i] over month_counts[i]
+    months, with the same rounding and final-month remainder as
+    distribute_amount_evenly. Returns one flat array in allocation order, so
+    with equal counts it reshapes to (allocations, months).
+    """
+    counts = np.asarray(month_counts, dtype=int)
+    # The rounding runs once per allocation with Python's round so results stay
+    # identical to the scalar rule; only the per-month expansion is vectorized.
+    splits = [_even_split(amount or 0.0, count) if count > 0 else (0.0, 0.0)
+              for amount, count in zip(allocated_amounts, counts.tolist())]
+    base = np.array([b for b, _ in splits], dtype=float)
+    last = np.array([l for _, l in splits], dtype=float)
+
+    amounts = np.repeat(base, counts)
+    has_months = counts > 0
+    amounts[(np.cumsum(counts) - 1)[has_months]] = last[has_months]
+    return amounts
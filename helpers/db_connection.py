@@ -0,0 +1,136 @@
+# helpers/db_connection.py
+
+import atexit
+import os
+import random
+import sqlite3
+import threading
+import time
+
+DB_PATH = os.path.join(os.path.dirname(__file__), "..", "grant_tracker.db")
+
+# --- Storage Profiles ---
+# Pragmas applied to every connection. "wal" lets readers and one writer work
+# concurrently (multi-user deployments); "default" keeps SQLite's rollback
+# journal and synchronous=FULL. Select with GRANT_TRACKER_STORAGE_PROFILE.
+STORAGE_PROFILES = {
+    "default": {
+        "busy_timeout": 5000,
+    },
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",  # durable at checkpoints; safe against corruption in WAL mode
+        "busy_timeout": 5000,  # ms to wait on a locked database before SQLITE_BUSY
+        "cache_size": -32000,  # negative = KiB, i.e. ~32 MB page cache
+        "mmap_size": 268435456,  # 256 MB memory-mapped reads
+        "temp_store": "MEMORY",
+    },
+}
+STORAGE_PROFILE = os.environ.get("GRANT_TRACKER_STORAGE_PROFILE", "wal")
+
+# Retry/backoff for writes that still hit SQLITE_BUSY after busy_timeout
+RETRY_ATTEMPTS = 5
+RETRY_BASE_DELAY = 0.05  # seconds, doubled per attempt with jitter
+
+# One long-lived connection per thread. Streamlit runs each session's script
+# on its own thread, so a rerun reuses the connection instead of reopening it.
+_local = threading.local()
+_registry = {}  # thread -> connection, so connections can be closed on shutdown
+_registry_lock = threading.Lock()
+_stats = {"opened": 0, "closed": 0, "busy_retries": 0}
+_generation = 0  # bumped by close_all_connections so other threads reopen
+
+
+def apply_storage_profile(conn, profile=None):
+    """Applies the pragmas of a storage profile (default: STORAGE_PROFILE) to a connection."""
+    for pragma, value in STORAGE_PROFILES[profile or STORAGE_PROFILE].items():
+        conn.execute(f"PRAGMA {pragma} = {value};")
+
+
+def _open_connection():
+    # check_same_thread=False only so the shutdown hook can close connections
+    # owned by other threads; each connection is still used by a single thread.
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    apply_storage_profile(conn)
+    return conn
+
+
+def is_busy_error(error):
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ("locked" in message or "busy" in message)
+
+
+def run_with_retry(func, *args, **kwargs):
+    """
+    Runs a complete write (one that rolls back on failure) and retries it with
+    exponential backoff when SQLite reports the database as locked/busy.
+    """
+    delay = RETRY_BASE_DELAY
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            return func(*args, **kwargs)
+        except sqlite3.OperationalError as e:
+            if not is_busy_error(e) or attempt == RETRY_ATTEMPTS - 1:
+                raise
+            _stats["busy_retries"] += 1
+            time.sleep(delay + random.uniform(0, delay))
+            delay *= 2
+
+
+def _reap_dead_threads():
+    """Close connections whose owning thread has exited. Caller holds the lock."""
+    for thread in [t for t in _registry if not t.is_alive()]:
+        _registry.pop(thread).close()
+        _stats["closed"] += 1
+
+
+def get_connection():
+    """Return this thread's connection, opening and configuring it on first use."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "generation", None) != _generation:
+        conn = _open_connection()
+        _local.conn = conn
+        _local.generation = _generation
+        with _registry_lock:
+            _reap_dead_threads()
+            _registry[threading.current_thread()] = conn
+            _stats["opened"] += 1
+    return conn
+
+
+def close_connection():
+    """Close the calling thread's connection, if it has one."""
+    conn = getattr(_local, "conn", None)
+    _local.conn = None
+    if conn is None or getattr(_local, "generation", None) != _generation:
+        return  # already closed by close_all_connections
+    with _registry_lock:
+        _registry.pop(threading.current_thread(), None)
+        _stats["closed"] += 1
+    conn.close()
+
+
+def close_all_connections():
+    """Shutdown hook: close every pooled connection. Not safe while other threads are querying."""
+    global _generation
+    with _registry_lock:
+        _generation += 1
+        for conn in _registry.values():
+            conn.close()
+            _stats["closed"] += 1
+        _registry.clear()
+    _local.conn = None
+
+
+def connections_opened():
+    """Number of connections opened since the process started."""
+    return _stats["opened"]
+
+
+def connection_stats():
+    with _registry_lock:
+        return {**_stats, "open": len(_registry)}
+
+
+atexit.register(close_all_connections)
@@ -1,41 +1,118 @@
 # --- db_utils.py (Refactored) ---
-import sqlite3
-import pandas as pd
+from contextlib import contextmanager
 from datetime import date
-import os
-from helpers.date_helpers import (generate_month_range, distribute_amount_evenly)
-
-DB_PATH = os.path.join(os.path.dirname(__file__), "..", "grant_tracker.db")
+from time import perf_counter
+from helpers import audit
+from helpers.date_helpers import (generate_month_range, distribute_amounts_evenly)
+from helpers.query_cache import cached, invalidates
+from helpers.query_log import record_query
 
 # --- DB Connection ---
+# Connections come from the configured backend (SQLite by default, optionally
+# PostgreSQL); see helpers/db_backend.py and helpers/db_connection.py
+from helpers.db_connection import DB_PATH
+from helpers.db_backend import get_backend
+
 def get_connection():
-    conn = sqlite3.connect(DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return get_backend().get_connection()
 
 # --- Shared DB Ops ---
+# Every statement is timed and recorded; see helpers/query_log.py
+# Called inside transaction() they run on its connection and leave the commit
+# to it; otherwise each one commits on its own.
 def fetch_all(query, params=()):
-    with get_connection() as conn:
-        return conn.execute(query, params).fetchall()
+    started = perf_counter()
+    with get_backend().connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    record_query(query, params, started, len(rows))
+    return rows
 
 def fetch_one(query, params=()):
-    with get_connection() as conn:
-        return conn.execute(query, params).fetchone()
+    started = perf_counter()
+    with get_backend().connection() as conn:
+        row = conn.execute(query, params).fetchone()
+    record_query(query, params, started, 1 if row is not None else 0)
+    return row
 
 def execute_query(query, params=()):
-    with get_connection() as conn:
-        conn.execute(query, params)
-        conn.commit()
+    started = perf_counter()
+    cursor = get_backend().run_with_retry(_execute, query, params)
+    record_query(query, params, started, cursor.rowcount)
 
 def insert_and_return_id(query, params):
-    with get_connection() as conn:
+    started = perf_counter()
+    new_id = get_backend().run_with_retry(_insert_returning_id, query, params)
+    record_query(query, params, started, 1)
+    return new_id
+
+def fetch_df(query, params=()):
+    started = perf_counter()
+    df = get_backend().read_df(query, params)
+    record_query(query, params, started, len(df))
+    return df
+
+def execute_many(query, seq_of_params):
+    """Runs one statement for every params tuple in a single transaction."""
+    seq_of_params = list(seq_of_params)
+    started = perf_counter()
+    cursor = get_backend().run_with_retry(_execute_many, query, seq_of_params)
+    record_query(query, seq_of_params[0] if seq_of_params else (), started, cursor.rowcount)
+    return cursor.rowcount
+
+def iter_rows(query, params=(), batch_size=1000):
+    """Yields result rows in batches of batch_size instead of loading them all at once."""
+    started = perf_counter()
+    rows = 0
+    with get_backend().connection() as conn:
         cursor = conn.execute(query, params)
-        conn.commit()
-        return cursor.lastrowid
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            rows += len(batch)
+            yield from batch
+    record_query(query, params, started, rows)
+
+@contextmanager
+def transaction():
+    """
+    Yields the backend connection; commits on success, rolls back on error.
+    On SQLite it takes the write lock up front (BEGIN IMMEDIATE) so concurrent
+    writers wait/retry here instead of failing halfway through the block.
+    Shared ops and nested transaction() calls inside the block join it.
+    """
+    with get_backend().transaction() as conn:
+        yield conn
+
+def _execute(query, params):
+    with get_backend().connection() as conn:
+        return conn.execute(query, params)
+
+def _execute_many(query, seq_of_params):
+    with get_backend().connection() as conn:
+        return conn.executemany(query, seq_of_params)
+
+def _insert_returning_id(query, params):
+    backend = get_backend()
+    with backend.connection() as conn:
+        return backend.insert_returning_id(conn, query, params)
+
+def _audited_delete(query, params, snapshots):
+    """
+    Runs a delete in one transaction and logs the financial rows it removes,
+    including those removed by ON DELETE CASCADE.
+    snapshots: {audited table: audit.snapshot filters for the rows going away}.
+    """
+    with transaction() as conn:
+        before = {table: audit.snapshot(conn, table, **filters) for table, filters in snapshots.items()}
+        conn.execute(query, params)
+        for table, rows in before.items():
+            audit.record_deletes(conn, table, rows)
 
 
 
 # --- Grant Logic & Table ---
+@cached("grants", "funders")
 def get_all_grants():
     query = """
         SELECT g.id, g.name, f.name AS funder, g.start_date, g.end_date, g.status, g.total_award, g.notes
@@ -54,10 +131,12 @@ def get_funder_id(funder_name):
     result = fetch_one(query, (funder_name.strip(),))
     return result[0] if result else None
 
+@invalidates("funders")
 def add_funder_if_missing(funder_name, funder_type):
     query = "INSERT OR IGNORE INTO funders (name, type) VALUES (?, ?)"
     execute_query(query, (funder_name.strip(), funder_type.strip()))
 
+@invalidates("grants")
 def add_grant(grant_name, funder_id, start_date, end_date, total_award, status, notes):
     query = """
         INSERT INTO grants (name, funder_id, start_date, end_date, total_award, status, notes)
@@ -73,6 +152,7 @@ def add_grant(grant_name, funder_id, start_date, end_date, total_award, status,
         notes.strip() if notes else None
     ))
 
+@invalidates("grants")
 def update_grant(grant_id, grant_name, funder_id, start_date, end_date, total_award, status, notes):
     query = """
         UPDATE grants
@@ -90,14 +170,21 @@ def update_grant(grant_id, grant_name, funder_id, start_date, end_date, total_aw
         grant_id
     ))
 
+@invalidates("grants", "grant_line_items", "qb_to_grant_mapping", "actual_expenses", "anticipated_expenses",
+             "audit_log")
 def delete_grant(grant_id):
     query = "DELETE FROM grants WHERE id = ?"
-    execute_query(query, (grant_id,))
+    _audited_delete(query, (grant_id,), {
+        table: {"grant_id": [grant_id]}
+        for table in ("grant_line_items", "actual_expenses", "anticipated_expenses")
+    })
 
+@cached("funders")
 def get_all_funders():
     query = "SELECT id, name, type FROM funders ORDER BY name"
     return fetch_all(query)
 
+@cached("grants", "funders")
 def get_grant_by_id(grant_id):
     query = """
         SELECT g.id, g.name, f.name AS funder_name, f.type AS funder_type, g.start_date, g.end_date, g.total_award, g.status, g.notes
@@ -113,6 +200,7 @@ def get_grant_by_id(grant_id):
 
 
 # --- Grant Line Item Logic Using the  ---
+@cached("grant_line_items")
 def get_line_items_by_grant(grant_id):
     query = """
         SELECT id, name, description, allocated_amount
@@ -122,49 +210,88 @@ def get_line_items_by_grant(grant_id):
     """
     return fetch_all(query, (grant_id,))
 
+@invalidates("grant_line_items", "audit_log")
 def add_line_item(grant_id, name, description, allocated_amount=0.0):
     query = "INSERT INTO grant_line_items (grant_id, name, description, allocated_amount) VALUES (?, ?, ?, ?)"
-    execute_query(query, (grant_id, name.strip(), description.strip(), allocated_amount))
+    backend = get_backend()
+    with transaction() as conn:
+        line_item_id = backend.insert_returning_id(
+            conn, query, (grant_id, name.strip(), description.strip(), allocated_amount)
+        )
+        audit.record(conn, "grant_line_items", {}, audit.snapshot(conn, "grant_line_items", id=[line_item_id]))
 
 ## JUST ADDED
+@invalidates("grant_line_items", "audit_log")
 def update_line_item(line_item_id, name, description, allocated_amount):
+    update_line_items([(line_item_id, name, description, allocated_amount)])
+
+@invalidates("grant_line_items", "audit_log")
+def update_line_items(rows):
+    """
+    Applies many line item edits in one transaction, with their audit_log entries.
+    rows: iterable of (line_item_id, name, description, allocated_amount) tuples.
+    Returns the number of line items updated.
+    """
     query = """
         UPDATE grant_line_items
         SET name = ?, description = ?, allocated_amount = ?
         WHERE id = ?
     """
-    execute_query(query, (
-        name.strip(),
-        description.strip() if description else None,
-        allocated_amount,
-        line_item_id
-    ))
+    params = [
+        (name.strip(), description.strip() if description else None, float(allocated_amount), int(line_item_id))
+        for line_item_id, name, description, allocated_amount in rows
+    ]
+    if not params:
+        return 0
+    with transaction() as conn:
+        before = audit.snapshot(conn, "grant_line_items", id=[p[3] for p in params])
+        updated = conn.executemany(query, params).rowcount
+        audit.record(conn, "grant_line_items", before, {
+            (line_item_id,): {"name": name, "description": description, "allocated_amount": allocated}
+            for name, description, allocated, line_item_id in params
+        })
+    return updated
 
 ## JUST ADDED TEST
+@invalidates("grant_line_items", "audit_log")
 def update_line_item_allocated(item_id, new_allocated_amount):
     query = "UPDATE grant_line_items SET allocated_amount = ? WHERE id = ?"
-    execute_query(query, (new_allocated_amount, item_id))
+    with transaction() as conn:
+        before = audit.snapshot(conn, "grant_line_items", id=[item_id])
+        conn.execute(query, (new_allocated_amount, item_id))
+        audit.record(conn, "grant_line_items", before, {
+            key: {"allocated_amount": new_allocated_amount} for key in before
+        })
 
+@invalidates("grant_line_items", "qb_to_grant_mapping", "actual_expenses", "anticipated_expenses", "audit_log")
 def delete_line_item(item_id):
     query = "DELETE FROM grant_line_items WHERE id = ?"
-    execute_query(query, (item_id,))
+    _audited_delete(query, (item_id,), {
+        "grant_line_items": {"id": [item_id]},
+        "actual_expenses": {"line_item_id": [item_id]},
+        "anticipated_expenses": {"line_item_id": [item_id]},
+    })
 
 
 
 
 # --- QuickBooks Logic ---
+@cached("qb_parent_categories")
 def get_parent_categories():
     query = "SELECT id, name FROM qb_parent_categories ORDER BY name"
     return fetch_all(query)
 
+@invalidates("qb_parent_categories")
 def add_parent_category(name, desc):
     query = "INSERT OR IGNORE INTO qb_parent_categories (name, description) VALUES (?, ?)"
     execute_query(query, (name, desc))
 
+@invalidates("qb_parent_categories")
 def update_parent_category(parent_id, new_name):
     query = "UPDATE qb_parent_categories SET name = ? WHERE id = ?"
     execute_query(query, (new_name, parent_id))
 
+@invalidates("qb_parent_categories")
 def delete_parent_category(parent_id):
     query_check = "SELECT 1 FROM qb_categories WHERE parent_id = ?"
     if fetch_one(query_check, (parent_id,)):
@@ -173,6 +300,7 @@ def delete_parent_category(parent_id):
     execute_query(query_delete, (parent_id,))
     return True
 
+@cached("qb_categories")
 def get_subcategories(parent_id=None):
     if parent_id:
         query = "SELECT id, name FROM qb_categories WHERE parent_id = ? ORDER BY name"
@@ -180,14 +308,28 @@ def get_subcategories(parent_id=None):
     query = "SELECT id, name FROM qb_categories ORDER BY name"
     return fetch_all(query)
 
+@cached("qb_categories", "qb_parent_categories")
+def get_subcategory_labels():
+    """(id, 'Parent / Subcategory') for every subcategory; names alone repeat across parents."""
+    query = """
+        SELECT c.id, IFNULL(p.name, '(no parent)') || ' / ' || c.name
+        FROM qb_categories c
+        LEFT JOIN qb_parent_categories p ON c.parent_id = p.id
+        ORDER BY p.name, c.name
+    """
+    return fetch_all(query)
+
+@invalidates("qb_categories")
 def add_subcategory(name, parent_id):
     query = "INSERT OR IGNORE INTO qb_categories (name, parent_id) VALUES (?, ?)"
     execute_query(query, (name, parent_id))
 
+@invalidates("qb_categories")
 def update_subcategory(subcat_id, new_name):
     query = "UPDATE qb_categories SET name = ? WHERE id = ?"
     execute_query(query, (new_name, subcat_id))
 
+@invalidates("qb_categories")
 def delete_subcategory(subcat_id):
     query_check = "SELECT 1 FROM qb_accounts WHERE category_id = ?"
     if fetch_one(query_check, (subcat_id,)):
@@ -196,6 +338,7 @@ def delete_subcategory(subcat_id):
     execute_query(query_delete, (subcat_id,))
     return True
 
+@cached("qb_accounts")
 def get_qb_codes(category_id=None):
     if category_id:
         query = "SELECT code, name FROM qb_accounts WHERE category_id = ? ORDER BY code"
@@ -203,23 +346,27 @@ def get_qb_codes(category_id=None):
     query = "SELECT code, name FROM qb_accounts ORDER BY code"
     return fetch_all(query)
 
+@invalidates("qb_accounts")
 def add_qb_code(code, name, category_id):
         try:
             query = "INSERT OR IGNORE INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)"
             execute_query(query, (code, name, category_id))
             return True
         
-        except sqlite3.IntegrityError:
+        except get_backend().IntegrityError:
             return False
 
+@invalidates("qb_accounts")
 def update_qb_code(code, new_name):
     query = "UPDATE qb_accounts SET name = ? WHERE code = ?"
     execute_query(query, (new_name, code))
 
+@invalidates("qb_accounts")
 def delete_qb_code(code):
     query = "DELETE FROM qb_accounts WHERE code = ?"
     execute_query(query, (code,))
 
+@cached("qb_accounts", "qb_categories", "qb_parent_categories")
 def get_filtered_qb_codes(parent_filter="All", sub_filter="All"):
     base_query = """
         SELECT a.code, a.name, c.name AS subcategory, p.name AS parent_category
@@ -238,16 +385,17 @@ def get_filtered_qb_codes(parent_filter="All", sub_filter="All"):
     if filters:
         base_query += " WHERE " + " AND ".join(filters)
     base_query += " ORDER BY p.name, c.name, a.code"
-    return pd.read_sql_query(base_query, get_connection(), params=params)
+    return fetch_df(base_query, params)
 
 
 
 
 
 # --- Mapping Logic ---
+@cached("qb_to_grant_mapping", "qb_accounts", "grant_line_items")
 def get_mappings_for_grant(grant_id):
     query = """
-        SELECT m.id, a.code, a.name, l.name
+        SELECT m.id, a.code, a.name, l.name, l.id
         FROM qb_to_grant_mapping m
         JOIN qb_accounts a ON m.qb_code = a.code
         JOIN grant_line_items l ON m.grant_line_item_id = l.id
@@ -260,29 +408,35 @@ def get_mappings_for_grant(grant_id):
 #     query = "INSERT INTO qb_to_grant_mapping (grant_id, qb_code, grant_line_item_id) VALUES (?, ?, ?)"
 #     execute_query(query, (grant_id, qb_code, line_item_id))
 
+@invalidates("qb_to_grant_mapping")
 def add_qb_mapping(grant_id, qb_code, line_item_id):
-    # Check if mapping already exists
-    check_query = """
-        SELECT 1 FROM qb_to_grant_mapping
-        WHERE grant_id = ? AND qb_code = ? AND grant_line_item_id = ?
-        LIMIT 1
-    """
-    existing = fetch_one(check_query, (grant_id, qb_code, line_item_id))
-    
-    if existing:
-        return False  # Duplicate found
-
-    # If not, insert
-    insert_query = """
-        INSERT INTO qb_to_grant_mapping (grant_id, qb_code, grant_line_item_id)
-        VALUES (?, ?, ?)
-    """
-    execute_query(insert_query, (grant_id, qb_code, line_item_id))
-    return True
+    """Maps one QB code to a line item. Returns False if that mapping already exists."""
+    return add_qb_mappings_bulk(grant_id, [(qb_code, line_item_id)]) == 1
+
+@invalidates("qb_to_grant_mapping")
+def add_qb_mappings_bulk(grant_id, pairs):
+    """
+    Maps many (qb_code, line_item_id) pairs to a grant in one transaction.
+    Pairs that are already mapped are skipped (UNIQUE constraint + OR IGNORE).
+    Returns the number of new mappings.
+    """
+    pairs = sorted({(str(code), int(line_item_id)) for code, line_item_id in pairs})
+    if not pairs:
+        return 0
+    # Counted before / after: psycopg2's executemany rowcount only covers the last statement
+    count = "SELECT COUNT(*) FROM qb_to_grant_mapping WHERE grant_id = ?"
+    with transaction() as conn:
+        before = conn.execute(count, (grant_id,)).fetchone()[0]
+        conn.executemany("""
+            INSERT OR IGNORE INTO qb_to_grant_mapping (grant_id, qb_code, grant_line_item_id)
+            VALUES (?, ?, ?)
+        """, [(grant_id, code, line_item_id) for code, line_item_id in pairs])
+        return conn.execute(count, (grant_id,)).fetchone()[0] - before
 
 
 
 
+@invalidates("qb_to_grant_mapping")
 def delete_qb_mapping(mapping_id):
     query = "DELETE FROM qb_to_grant_mapping WHERE id = ?"
     execute_query(query, (mapping_id,))
@@ -311,31 +465,101 @@ def initialize_anticipated_expenses(grant_id, line_item_id, start_date, end_date
     Inserts one anticipated expense row per month for a line item, for the grant duration.
     Uses even distribution logic. Will not insert duplicates thanks to INSERT OR IGNORE.
     """
-    months = generate_month_range(start_date, end_date)
+    return initialize_anticipated_expenses_for_grant(
+        grant_id, start_date, end_date,
+        line_items=[(line_item_id, None, allocated_amount)]
+    )
 
-    # Use helper to evenly distribute amount
-    distribution = distribute_amount_evenly(allocated_amount, months)
 
-    for month, expected_amount in distribution.items():
-        query = """
-            INSERT OR IGNORE INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
-            VALUES (?, ?, ?, ?)
-        """
-        execute_query(query, (grant_id, line_item_id, month, expected_amount))
+@invalidates("anticipated_expenses", "audit_log")
+def initialize_anticipated_expenses_for_grant(grant_id, start_date, end_date, line_items=None):
+    """
+    Seeds the whole month x line-item anticipated grid for a grant in one transaction.
+    line_items: (id, name, allocated_amount) rows; defaults to every line item of the grant.
+    Months that already have a row are left alone, so calling it again is a no-op.
+    Returns the number of rows inserted.
+    """
+    if line_items is None:
+        line_items = get_line_item_allocations(grant_id)
+    months = generate_month_range(start_date, end_date)
+    line_items = list(line_items)
+    if not months or not line_items:
+        return 0
+
+    amounts = distribute_amounts_evenly([li[2] for li in line_items], [len(months)] * len(line_items))
+    params = [
+        (int(grant_id), int(line_item_id), month, expected_amount)
+        for (line_item_id, _, _), row in zip(line_items, amounts.reshape(len(line_items), len(months)).tolist())
+        for month, expected_amount in zip(months, row)
+    ]
+    query = """
+        INSERT OR IGNORE INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+        VALUES (?, ?, ?, ?)
+    """
+    with transaction() as conn:
+        before = audit.snapshot(conn, "anticipated_expenses", grant_id=[grant_id],
+                                line_item_id=[p[1] for p in params], month=months)
+        inserted = conn.executemany(query, params).rowcount
+        # Existing months are left alone, so only the new rows are logged
+        audit.record(conn, "anticipated_expenses", before, {
+            (g, li, month): {"grant_id": g, "month": month, "expected_amount": amount}
+            for g, li, month, amount in params
+            if (g, li, month) not in before
+        })
+    return inserted
 
 
+@invalidates("anticipated_expenses", "audit_log")
 def update_anticipated_expense(grant_id, line_item_id, month, expected_amount):
     query = """
         UPDATE anticipated_expenses
         SET expected_amount = ?
         WHERE grant_id = ? AND line_item_id = ? AND month = ?
     """
-    execute_query(query, (expected_amount, grant_id, line_item_id, month))
+    with transaction() as conn:
+        before = audit.snapshot(conn, "anticipated_expenses",
+                                grant_id=[grant_id], line_item_id=[line_item_id], month=[month])
+        conn.execute(query, (expected_amount, grant_id, line_item_id, month))
+        # UPDATE only: a month without a row is left alone, and not logged
+        audit.record(conn, "anticipated_expenses", before, {
+            key: {"expected_amount": expected_amount} for key in before
+        })
 
 
+@invalidates("anticipated_expenses", "audit_log")
+def update_anticipated_expenses_bulk(grant_id, rows):
+    """
+    Writes many planned amounts for a grant in one transaction, with their audit_log entries.
+    rows: iterable of (line_item_id, month, expected_amount) tuples; months
+    without a row yet are inserted. Returns the number of rows written.
+    """
+    query = """
+        INSERT INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (grant_id, line_item_id, month)
+        DO UPDATE SET expected_amount = excluded.expected_amount
+    """
+    params = [
+        (int(grant_id), int(line_item_id), month, round(float(amount), 2))
+        for line_item_id, month, amount in rows
+    ]
+    if not params:
+        return 0
+    with transaction() as conn:
+        before = audit.snapshot(conn, "anticipated_expenses", grant_id=[int(grant_id)],
+                                line_item_id=[p[1] for p in params], month=[p[2] for p in params])
+        conn.executemany(query, params)
+        audit.record(conn, "anticipated_expenses", before, {
+            (g, li, month): {"grant_id": g, "month": month, "expected_amount": amount}
+            for g, li, month, amount in params
+        })
+    return len(params)
+
+
+@invalidates("anticipated_expenses", "audit_log")
 def delete_anticipated_expenses_for_grant(grant_id):
     query = 'DELETE FROM anticipated_expenses WHERE grant_id = ?'
-    execute_query(query, (grant_id,))
+    _audited_delete(query, (grant_id,), {"anticipated_expenses": {"grant_id": [grant_id]}})
 
 
 # OPTIONAL FOR FUTURE USE using ACTUAL AND ANTICIPATED 
@@ -370,27 +594,64 @@ def get_actual_expenses_for_grant(grant_id, month):
 
 
 def save_actual_expense(grant_id, month, qb_code, line_item_id, amount, notes, date_submitted):
-    # Check for an existing record
-    existing = fetch_one("""
-        SELECT id FROM actual_expenses
-        WHERE grant_id = ? AND month = ? AND qb_code = ? AND line_item_id = ?
-    """, (grant_id, month, qb_code, line_item_id))
-
-    if existing:
-        # Update
-        update_query = """
-            UPDATE actual_expenses
-            SET amount = ?, notes = ?, date_submitted = ?
-            WHERE id = ?
-        """
-        execute_query(update_query, (amount, notes, date_submitted, existing[0]))
-    else:
-        # Insert
-        insert_query = """
-            INSERT INTO actual_expenses (grant_id, month, qb_code, amount, notes, line_item_id, date_submitted)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """
-        execute_query(insert_query, (grant_id, month, qb_code, amount, notes, line_item_id, date_submitted))
+    save_actual_expenses_bulk(grant_id, month, [(qb_code, line_item_id, amount, notes)], date_submitted)
+
+
+def save_actual_expenses_bulk(grant_id, month, rows, date_submitted=None):
+    """
+    Upserts a month of actual expenses in one transaction.
+    rows: iterable of (qb_code, line_item_id, amount, notes) tuples.
+    Returns the number of rows written.
+    """
+    return save_actual_expense_rows(
+        ((grant_id, month, qb_code, line_item_id, amount, notes)
+         for qb_code, line_item_id, amount, notes in rows),
+        date_submitted
+    )
+
+
+@invalidates("actual_expenses", "audit_log")
+def save_actual_expense_rows(rows, date_submitted=None, keep_notes=False):
+    """
+    Upserts actual expenses for any mix of grants and months in one transaction,
+    appending audit_log entries for the amounts and notes that changed. Every
+    row is written, so date_submitted is refreshed even when nothing else changed.
+    rows: iterable of (grant_id, month, qb_code, line_item_id, amount, notes) tuples.
+    With keep_notes (imports), notes already on a row are kept and the given
+    notes only fill blank ones.
+    Relies on the UNIQUE index on (grant_id, month, qb_code, line_item_id).
+    Returns the number of rows written.
+    """
+    if isinstance(date_submitted, date):
+        date_submitted = date_submitted.isoformat()
+    notes_update = "COALESCE(NULLIF(actual_expenses.notes, ''), excluded.notes)" if keep_notes else "excluded.notes"
+    query = f"""
+        INSERT INTO actual_expenses (grant_id, month, qb_code, amount, notes, line_item_id, date_submitted)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (grant_id, month, qb_code, line_item_id) DO UPDATE SET
+            amount = excluded.amount,
+            notes = {notes_update},
+            date_submitted = excluded.date_submitted
+    """
+    params = [
+        (int(grant_id), month, str(qb_code), float(amount), notes,
+         int(line_item_id) if line_item_id is not None else None, date_submitted)
+        for grant_id, month, qb_code, line_item_id, amount, notes in rows
+    ]
+    if not params:
+        return 0
+    with transaction() as conn:
+        before = audit.snapshot(conn, "actual_expenses",
+                                grant_id=[p[0] for p in params], month=[p[1] for p in params])
+        conn.executemany(query, params)
+        audit.record(conn, "actual_expenses", before, {
+            (g, month, code, li): {
+                "grant_id": g, "month": month, "amount": amount,
+                "notes": (keep_notes and before.get((g, month, code, li), {}).get("notes")) or notes,
+            }
+            for g, month, code, amount, notes, li, _ in params
+        })
+    return len(params)
 
 
 
@@ -430,6 +691,29 @@ def save_actual_expense(grant_id, month, qb_code, line_item_id, amount, notes, d
 
 
 
+def get_expense_entry_table(grant_id, month):
+    """
+    One row per QB code mapping of the grant with that month's saved amount and notes.
+    Mappings and existing expenses are joined on their keys in SQL (no per-row lookups).
+    """
+    query = """
+        SELECT l.name AS "Line Item", a.code AS "QB Code", a.name AS "QB Name",
+               IFNULL(e.amount, 0.0) AS "Amount Spent", IFNULL(e.notes, '') AS "Notes",
+               l.id AS line_item_id
+        FROM qb_to_grant_mapping m
+        JOIN qb_accounts a ON m.qb_code = a.code
+        JOIN grant_line_items l ON m.grant_line_item_id = l.id
+        LEFT JOIN actual_expenses e
+            ON e.grant_id = m.grant_id AND e.month = ?
+           AND e.qb_code = m.qb_code AND e.line_item_id = m.grant_line_item_id
+        WHERE m.grant_id = ?
+        ORDER BY a.code
+    """
+    df = fetch_df(query, (month, grant_id))
+    df["Amount Spent"] = df["Amount Spent"].astype(float)
+    return df
+
+
 def get_anticipated_expenses_for_grant(grant_id):
     query = """
         SELECT month, expected_amount, line_item_id
@@ -475,31 +759,11 @@ def get_line_item_allocations(grant_id):
     return fetch_all(query, (grant_id,))
 
 def get_actual_expense_totals(grant_id):
+    # monthly_rollup is maintained by triggers on actual_expenses
     query = """
-        SELECT line_item_id, SUM(amount) as total_spent
-        FROM actual_expenses
+        SELECT line_item_id, SUM(actual_total) as total_spent
+        FROM monthly_rollup
         WHERE grant_id = ?
         GROUP BY line_item_id
     """
     return fetch_all(query, (grant_id,))
-
-
-def get_grant_summary_data(grant_id):
-    # Fetch line items with allocations
-    line_items = get_line_item_allocations(grant_id)
-    actuals = dict(get_actual_expense_totals(grant_id))
-
-    data = []
-    for item_id, name, allocated in line_items:
-        spent = actuals.get(item_id, 0.0)
-        percent_spent = round((spent / allocated) * 100, 1) if allocated else 0.0
-        remaining = allocated - spent
-        data.append({
-            "Line Item": name,
-            "Allocated": allocated,
-            "Spent": spent,
-            "% Spent": f"{percent_spent}%",
-            "Remaining": remaining
-        })
-
-    return pd.DataFrame(data)
@@ -0,0 +1,46 @@
+# helpers/editor_diff.py
+# Compares the frame a page loaded with what st.data_editor hands back, so save
+# buttons write only the cells that actually changed.
+
+import numpy as np
+import pandas as pd
+
+
+def changed_cells(loaded, edited, columns=None, tolerance=0.005):
+    """
+    Numeric cells that differ between two frames with the same index.
+    Returns a DataFrame with key (index value), column, old and new; values
+    within `tolerance` (half a cent by default) count as unchanged.
+    """
+    columns = list(columns if columns is not None else loaded.columns)
+    before = loaded[columns].astype(float).to_numpy()
+    after = edited.reindex(index=loaded.index, columns=columns).astype(float).to_numpy()
+
+    same = np.isclose(before, after, rtol=0.0, atol=tolerance) | (np.isnan(before) & np.isnan(after))
+    rows, cols = np.nonzero(~same)
+    return pd.DataFrame({
+        "key": loaded.index.to_numpy()[rows],
+        "column": np.asarray(columns, dtype=object)[cols],
+        "old": before[rows, cols],
+        "new": after[rows, cols],
+    })
+
+
+def changed_rows(loaded, edited, columns, tolerance=0.005):
+    """
+    Rows of `edited` whose values differ from `loaded` in any of `columns`,
+    compared column by column across the whole frame. Rows line up by index.
+    Text is compared after stripping (None counts as ""), numbers within
+    `tolerance`. Returns the changed rows of `edited`.
+    """
+    edited = edited.reindex(index=loaded.index)
+    changed = pd.Series(False, index=loaded.index)
+    for col in columns:
+        before, after = loaded[col], edited[col]
+        if pd.api.types.is_numeric_dtype(before) and pd.api.types.is_numeric_dtype(after):
+            before, after = before.astype(float), after.astype(float)
+            same = np.isclose(before, after, rtol=0.0, atol=tolerance) | (before.isna() & after.isna())
+        else:
+            same = before.fillna("").astype(str).str.strip() == after.fillna("").astype(str).str.strip()
+        changed |= ~same
+    return edited[changed]
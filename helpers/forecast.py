@@ -0,0 +1,208 @@
+# helpers/forecast.py
+# Distribution strategies for seeding / re-planning anticipated_expenses. Every
+# strategy fills the whole line-item x month grid of a grant in one NumPy pass,
+# and apply_forecast writes it in one transaction.
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from helpers import audit
+from helpers.date_helpers import distribute_amounts_evenly, generate_month_range
+from helpers.db_utils import fetch_all, get_grant_by_id, get_line_item_allocations, transaction
+from helpers.query_cache import invalidates
+
+
+# --- Strategies ---
+# Each takes (allocations, months, grant_id, options) and returns an
+# (allocations x months) array of amounts.
+
+def _weighted(allocations, weights):
+    """
+    Splits allocations by per-month weights in whole cents: every month gets
+    its share rounded down, and the cents left over go one each to the months
+    with the largest fractional parts. Months never go negative and each row
+    adds up to its allocation.
+    """
+    weights = np.asarray(weights, dtype=float)
+    weights = np.broadcast_to(weights, (len(allocations), weights.shape[-1]))
+    totals = weights.sum(axis=1, keepdims=True)
+    if (totals <= 0).any():
+        raise ValueError("Distribution weights must add up to more than zero.")
+    cents = np.round(np.asarray(allocations, dtype=float) * 100)
+    exact = cents[:, None] * weights / totals
+    floor = np.floor(exact)
+    short = (cents - floor.sum(axis=1))[:, None]
+    # Position of each month when sorted by fractional part, largest first (ties: earlier month)
+    order = np.argsort(floor - exact, axis=1, kind="stable")
+    position = np.empty_like(order)
+    np.put_along_axis(position, order, np.arange(order.shape[1]), axis=1)
+    return (floor + (position < short)) / 100
+
+
+def _even(allocations, months, grant_id, options):
+    # Same rounding as distribute_amount_evenly
+    return distribute_amounts_evenly(allocations, [len(months)] * len(allocations)).reshape(len(allocations), len(months))
+
+
+def _front_loaded(allocations, months, grant_id, options):
+    # Linear ramp down: the first month gets n shares, the last one
+    return _weighted(allocations, np.arange(len(months), 0, -1))
+
+
+def _back_loaded(allocations, months, grant_id, options):
+    return _weighted(allocations, np.arange(1, len(months) + 1))
+
+
+def _seasonal(allocations, months, grant_id, options):
+    """options["profile"]: 12 weights for Jan..Dec, or {month number: weight}."""
+    profile = options.get("profile")
+    if profile is None:
+        raise ValueError("The seasonal strategy needs a 12-month profile.")
+    if isinstance(profile, dict):
+        profile = [profile.get(m, 0.0) for m in range(1, 13)]
+    if len(profile) != 12:
+        raise ValueError("A seasonal profile needs exactly 12 monthly weights.")
+    calendar_month = np.array([int(m[5:7]) for m in months]) - 1
+    return _weighted(allocations, np.asarray(profile, dtype=float)[calendar_month])
+
+
+def _remaining(allocations, months, grant_id, options):
+    """
+    Months before options["as_of"] (YYYY-MM, default this month) are planned at
+    their actuals; what is left of each allocation is spread evenly over the
+    rest. Overspent line items get nothing more.
+    """
+    as_of = options.get("as_of") or date.today().strftime("%Y-%m")
+    line_item_ids = options["line_item_ids"]
+    actuals = pd.DataFrame(
+        fetch_all("SELECT line_item_id, month, actual_total FROM monthly_rollup WHERE grant_id = ?", (grant_id,)),
+        columns=["line_item_id", "month", "actual"],
+    )
+    past = np.array([m < as_of for m in months])
+    amounts = (
+        actuals.pivot_table(index="line_item_id", columns="month", values="actual", aggfunc="sum")
+        .reindex(index=line_item_ids, columns=months)
+        .fillna(0.0)
+        .to_numpy(dtype=float)
+    )
+    amounts[:, ~past] = 0.0
+
+    future = int((~past).sum())
+    if future:
+        remaining = np.clip(np.round(allocations - amounts.sum(axis=1), 2), 0.0, None)
+        amounts[:, ~past] = distribute_amounts_evenly(remaining, [future] * len(remaining)).reshape(-1, future)
+    return amounts
+
+
+STRATEGIES = {
+    "even": _even,
+    "front_loaded": _front_loaded,
+    "back_loaded": _back_loaded,
+    "seasonal": _seasonal,
+    "remaining": _remaining,
+}
+
+# Strategies that only look at the allocations and months, so they can plan
+# line items that are not committed yet (e.g. inside clone_grant's transaction)
+PLAN_ONLY_STRATEGIES = ("even", "front_loaded", "back_loaded", "seasonal")
+
+STRATEGY_LABELS = {
+    "even": "Even",
+    "front_loaded": "Front-loaded",
+    "back_loaded": "Back-loaded",
+    "seasonal": "Seasonal profile",
+    "remaining": "Remaining over remaining months",
+}
+
+
+# --- Engine ---
+def compute_forecast(grant_id, strategy="even", line_items=None, **options):
+    """
+    Planned amount per line item and month for a grant under a strategy.
+    line_items: (id, name, allocated_amount) rows; defaults to every line item of the grant.
+    Returns a DataFrame with line_item_id, month, expected_amount.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown distribution strategy: {strategy}")
+    grant = get_grant_by_id(grant_id)
+    if grant is None:
+        raise ValueError(f"Grant {grant_id} does not exist.")
+    if line_items is None:
+        line_items = get_line_item_allocations(grant_id)
+    months = generate_month_range(grant[4], grant[5])  # [4] = start_date, [5] = end_date
+    return plan_amounts(months, line_items, strategy, grant_id, **options)
+
+
+def plan_amounts(months, line_items, strategy="even", grant_id=None, **options):
+    """
+    compute_forecast() for an explicit month range and (id, name, allocated_amount)
+    line items, without looking the grant up; lets callers plan line items
+    they have not committed yet.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown distribution strategy: {strategy}")
+    line_items = list(line_items)
+    if not months or not line_items:
+        return pd.DataFrame({"line_item_id": [], "month": [], "expected_amount": []})
+
+    ids = [li[0] for li in line_items]
+    allocations = np.array([li[2] or 0.0 for li in line_items], dtype=float)
+    amounts = STRATEGIES[strategy](allocations, months, grant_id, {**options, "line_item_ids": ids})
+    return pd.DataFrame({
+        "line_item_id": np.repeat(ids, len(months)),
+        "month": np.tile(months, len(ids)),
+        "expected_amount": amounts.ravel(),
+    })
+
+
+@invalidates("anticipated_expenses", "audit_log")
+def apply_forecast(grant_id, strategy="even", line_items=None, replace=True, **options):
+    """
+    Writes compute_forecast() to anticipated_expenses in one transaction.
+    replace=True overwrites existing months and drops rows outside the grant
+    period for these line items; replace=False only fills months with no row.
+    Returns the number of rows written.
+    """
+    plan = compute_forecast(grant_id, strategy, line_items, **options)
+    if plan.empty:
+        return 0
+
+    params = [
+        (grant_id, int(li), month, float(amount))
+        for li, month, amount in plan.itertuples(index=False)
+    ]
+    if replace:
+        insert = """
+            INSERT INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (grant_id, line_item_id, month)
+            DO UPDATE SET expected_amount = excluded.expected_amount
+        """
+    else:
+        insert = """
+            INSERT OR IGNORE INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+            VALUES (?, ?, ?, ?)
+        """
+
+    with transaction() as conn:
+        before = audit.snapshot(conn, "anticipated_expenses", grant_id=[grant_id])
+        if replace:
+            first, last = plan["month"].min(), plan["month"].max()
+            planned = {int(li) for li in plan["line_item_id"].unique()}
+            conn.executemany("""
+                DELETE FROM anticipated_expenses
+                WHERE grant_id = ? AND line_item_id = ? AND (month < ? OR month > ?)
+            """, [(grant_id, li, first, last) for li in planned])
+            audit.record_deletes(conn, "anticipated_expenses", {
+                key: row for key, row in before.items()
+                if key[1] in planned and not first <= key[2] <= last
+            })
+        written = conn.executemany(insert, params).rowcount
+        audit.record(conn, "anticipated_expenses", before, {
+            (int(g), li, month): {"grant_id": int(g), "month": month, "expected_amount": amount}
+            for g, li, month, amount in params
+            if replace or (int(g), li, month) not in before
+        })
+    return written
@@ -1,14 +1,23 @@
 # helpers/grant_controller.py
 
+from datetime import date
+
+from . import audit
+from .date_helpers import generate_month_range
+from .db_backend import get_backend
 from .db_utils import (
     add_funder_if_missing,
     get_funder_id,
     add_grant,
     update_grant,
     delete_grant,
+    fetch_one,
     grant_exists,
-    get_grant_by_id
+    get_grant_by_id,
+    transaction,
 )
+from .forecast import PLAN_ONLY_STRATEGIES, plan_amounts
+from .query_cache import invalidates
 
 def handle_add_grant(grant_name, funder_name, funder_type, start_date, end_date, total_award, status, notes):
     if grant_exists(grant_name):
@@ -29,6 +38,93 @@ def handle_delete_grant(grant_id):
 def get_grant_details(grant_id):
     return get_grant_by_id(grant_id)
 
+# --- Renewal ---
+def _next_year(value, label):
+    if not value:
+        raise ValueError(f"The source grant has no {label}; pass the renewal's {label} explicitly.")
+    day = date.fromisoformat(str(value)[:10])
+    try:
+        return day.replace(year=day.year + 1)
+    except ValueError:  # Feb 29
+        return day.replace(year=day.year + 1, day=28)
+
+@invalidates("grants", "grant_line_items", "qb_to_grant_mapping", "anticipated_expenses", "audit_log")
+def clone_grant(source_grant_id, new_name, start_date=None, end_date=None, scale=1.0,
+                total_award=None, status="Pending", notes=None, copy_mappings=True, strategy="even",
+                **options):
+    """
+    Creates a renewal of a grant in one transaction: the grant row (same
+    funder), its line items with allocations multiplied by scale, its QB
+    mappings and an anticipated plan spread over the new period with a
+    forecast strategy (one of PLAN_ONLY_STRATEGIES; options go to it). Dates
+    default to the source period one year later and total_award to the source
+    award times scale. Returns the new grant's id.
+    """
+    if strategy not in PLAN_ONLY_STRATEGIES:
+        raise ValueError(f"A renewal can't be planned with the {strategy} strategy; "
+                         f"use one of: {', '.join(PLAN_ONLY_STRATEGIES)}.")
+    source = fetch_one(
+        "SELECT funder_id, start_date, end_date, total_award, notes FROM grants WHERE id = ?", (source_grant_id,)
+    )
+    if source is None:
+        raise ValueError(f"Grant {source_grant_id} does not exist.")
+    new_name = new_name.strip()
+    if not new_name:
+        raise ValueError("Grant name is required.")
+    if grant_exists(new_name):
+        raise ValueError("Grant with this name already exists.")
+    funder_id, source_start, source_end, source_award, source_notes = source
+    start_date = start_date or _next_year(source_start, "start date")
+    end_date = end_date or _next_year(source_end, "end date")
+    start_date = start_date.isoformat() if isinstance(start_date, date) else start_date
+    end_date = end_date.isoformat() if isinstance(end_date, date) else end_date
+    if end_date < start_date:
+        raise ValueError("End date must be on or after the start date.")
+    if total_award is None:
+        total_award = round((source_award or 0.0) * scale, 2)
+
+    backend = get_backend()
+    with transaction() as conn:
+        new_id = backend.insert_returning_id(conn, """
+            INSERT INTO grants (name, funder_id, start_date, end_date, total_award, status, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (new_name, funder_id, start_date, end_date, total_award, status,
+              notes.strip() if notes else source_notes))
+        conn.execute("""
+            INSERT INTO grant_line_items (grant_id, name, description, allocated_amount)
+            SELECT ?, name, description, ROUND(IFNULL(allocated_amount, 0) * ?, 2)
+            FROM grant_line_items
+            WHERE grant_id = ?
+            ORDER BY id
+        """, (new_id, float(scale), source_grant_id))
+        audit.record(conn, "grant_line_items", {}, audit.snapshot(conn, "grant_line_items", grant_id=[new_id]))
+        if copy_mappings:
+            # Line item names are unique per grant, so they pair old and new rows
+            conn.execute("""
+                INSERT INTO qb_to_grant_mapping (grant_id, qb_code, grant_line_item_id)
+                SELECT ?, m.qb_code, tl.id
+                FROM qb_to_grant_mapping m
+                JOIN grant_line_items sl ON sl.id = m.grant_line_item_id
+                JOIN grant_line_items tl ON tl.grant_id = ? AND tl.name = sl.name
+                WHERE m.grant_id = ?
+            """, (new_id, new_id, source_grant_id))
+
+        line_items = conn.execute(
+            "SELECT id, name, allocated_amount FROM grant_line_items WHERE grant_id = ? ORDER BY id", (new_id,)
+        ).fetchall()
+        plan = plan_amounts(generate_month_range(start_date, end_date), line_items, strategy, **options)
+        if not plan.empty:
+            params = [(new_id, int(li), month, float(amount)) for li, month, amount in plan.itertuples(index=False)]
+            conn.executemany("""
+                INSERT INTO anticipated_expenses (grant_id, line_item_id, month, expected_amount)
+                VALUES (?, ?, ?, ?)
+            """, params)
+            audit.record(conn, "anticipated_expenses", {}, {
+                (g, li, month): {"grant_id": g, "month": month, "expected_amount": amount}
+                for g, li, month, amount in params
+            })
+    return new_id
+
 
 
 
@@ -0,0 +1,103 @@
+# helpers/mapping_rules.py
+# Rule-based QB code -> line item mapping. Each rule expands to a set of
+# (qb_code, line_item_id) pairs with one query; the rules of a request are
+# unioned, diffed against the grant's current mappings and written with
+# add_qb_mappings_bulk in a single transaction.
+#
+#   ("codes", ["8705", "8706"], line_item_id)      # these codes
+#   ("subcategory", subcategory_id, line_item_id)   # every code under a subcategory
+#   ("parent_category", parent_id, line_item_id)    # every code under a parent category
+#   ("copy_grant", source_grant_id, None)           # another grant's mappings, by line item name
+
+from collections import defaultdict
+
+from helpers.db_utils import add_qb_mappings_bulk, fetch_all
+
+
+# --- Rules ---
+# Each takes (grant_id, target, line_item_id) and returns a set of pairs.
+
+def _codes(grant_id, codes, line_item_id):
+    codes = [str(c) for c in codes]
+    if not codes:
+        return set()
+    known = fetch_all(
+        f"SELECT code FROM qb_accounts WHERE code IN ({', '.join('?' * len(codes))})", codes
+    )
+    return {(row[0], line_item_id) for row in known}
+
+
+def _subcategory(grant_id, subcategory_id, line_item_id):
+    rows = fetch_all("SELECT code FROM qb_accounts WHERE category_id = ?", (subcategory_id,))
+    return {(row[0], line_item_id) for row in rows}
+
+
+def _parent_category(grant_id, parent_id, line_item_id):
+    rows = fetch_all("""
+        SELECT a.code
+        FROM qb_accounts a
+        JOIN qb_categories c ON a.category_id = c.id
+        WHERE c.parent_id = ?
+    """, (parent_id,))
+    return {(row[0], line_item_id) for row in rows}
+
+
+def _copy_grant(grant_id, source_grant_id, line_item_id):
+    """Source mappings whose line item has a same-named line item (case-insensitive) on grant_id."""
+    rows = fetch_all("""
+        SELECT m.qb_code, tl.id
+        FROM qb_to_grant_mapping m
+        JOIN grant_line_items sl ON sl.id = m.grant_line_item_id
+        JOIN grant_line_items tl ON tl.grant_id = ? AND LOWER(TRIM(tl.name)) = LOWER(TRIM(sl.name))
+        WHERE m.grant_id = ?
+    """, (grant_id, source_grant_id))
+    return {(code, li) for code, li in rows}
+
+
+RULES = {
+    "codes": _codes,
+    "subcategory": _subcategory,
+    "parent_category": _parent_category,
+    "copy_grant": _copy_grant,
+}
+
+
+# --- Planning ---
+def expand_rules(grant_id, rules):
+    """Union of the (qb_code, line_item_id) pairs every rule maps to."""
+    line_items = {row[0] for row in fetch_all("SELECT id FROM grant_line_items WHERE grant_id = ?", (grant_id,))}
+    pairs = set()
+    for kind, target, line_item_id in rules:
+        if kind not in RULES:
+            raise ValueError(f"Unknown mapping rule: {kind}")
+        if kind != "copy_grant":
+            line_item_id = int(line_item_id)
+            if line_item_id not in line_items:
+                raise ValueError(f"Line item {line_item_id} does not belong to grant {grant_id}.")
+        pairs |= RULES[kind](grant_id, target, line_item_id)
+    return pairs
+
+
+def plan_mappings(grant_id, rules):
+    """
+    What applying rules to a grant would do, without writing:
+    new (pairs to insert), already_mapped (count) and ambiguous (codes that
+    would end up mapped to more than one line item of the grant).
+    """
+    pairs = expand_rules(grant_id, rules)
+    existing = set(fetch_all(
+        "SELECT qb_code, grant_line_item_id FROM qb_to_grant_mapping WHERE grant_id = ?", (grant_id,)
+    ))
+    line_items_by_code = defaultdict(set)
+    for code, line_item_id in pairs | existing:
+        line_items_by_code[code].add(line_item_id)
+    return {
+        "new": sorted(pairs - existing),
+        "already_mapped": len(pairs & existing),
+        "ambiguous": sorted(code for code, items in line_items_by_code.items() if len(items) > 1),
+    }
+
+
+def apply_mapping_rules(grant_id, rules):
+    """Expands rules and writes the new mappings in one transaction. Returns the number added."""
+    return add_qb_mappings_bulk(grant_id, expand_rules(grant_id, rules))
@@ -0,0 +1,243 @@
+# helpers/projections.py
+# Burn rate and projected spend per line item, from monthly_rollup (actuals and
+# plan) and the line item allocations. Everything is computed on a dense
+# line-item x month grid in one pandas pass. Grids are kept per grant and
+# refreshed incrementally: after a write only the grants whose rollup_versions
+# counter, line items or dates changed are reloaded and recomputed.
+
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from helpers.date_helpers import month_ranges
+from helpers.db_utils import fetch_all, fetch_df
+from helpers.query_cache import cached
+
+RECENT_MONTHS = 3  # window for the recent burn rate
+MAX_GRIDS = 2000  # per-grant grids kept for incremental refresh
+
+PROJECTION_COLUMNS = [
+    "grant_id", "line_item_id", "line_item", "allocated", "spent_to_date",
+    "months_elapsed", "months_remaining", "burn_rate", "recent_burn_rate",
+    "projected_end_spend", "planned_end_spend", "projected_overspend", "exhaustion_month",
+]
+
+
+def _month_index(month):
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def _month_key(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def default_as_of():
+    """The last closed month (the month before today), as YYYY-MM."""
+    today = date.today()
+    return _month_key(today.year * 12 + today.month - 2)
+
+
+# --- Loading ---
+def _grant_filter(grant_ids, column):
+    if grant_ids is None:
+        return "", []
+    return f" AND {column} IN ({', '.join('?' * len(grant_ids))})", list(grant_ids)
+
+
+def _load_grants(grant_ids=None, active_only=False):
+    """(grants, line items) frames for the given grants, or every grant."""
+    status_filter = " AND LOWER(status) = 'active'" if active_only else ""
+    g_filter, g_params = _grant_filter(grant_ids, "id")
+    grants = fetch_df(f"""
+        SELECT id AS grant_id, start_date, end_date
+        FROM grants
+        WHERE start_date IS NOT NULL AND end_date IS NOT NULL{status_filter}{g_filter}
+        ORDER BY id
+    """, g_params)
+    li_filter, li_params = _grant_filter(grants["grant_id"].tolist(), "grant_id")
+    line_items = fetch_df(f"""
+        SELECT grant_id, id AS line_item_id, name AS line_item, IFNULL(allocated_amount, 0) AS allocated
+        FROM grant_line_items
+        WHERE TRUE{li_filter}
+    """, li_params)
+    return grants, line_items
+
+
+def _load_rollup(grant_ids):
+    g_filter, g_params = _grant_filter(grant_ids, "grant_id")
+    return fetch_df(f"""
+        SELECT grant_id, line_item_id, month, actual_total AS actual, anticipated_total AS anticipated
+        FROM monthly_rollup
+        WHERE TRUE{g_filter}
+    """, g_params)
+
+
+def _stamps(grants, line_items):
+    """
+    grant_id -> (rollup version, hash of the grant's dates and line items); a
+    grant whose stamp is unchanged has the same projection inputs.
+    """
+    ids = grants["grant_id"].tolist()
+    g_filter, g_params = _grant_filter(ids, "grant_id")
+    versions = dict(fetch_all(f"SELECT grant_id, version FROM rollup_versions WHERE TRUE{g_filter}", g_params))
+    row_hashes = pd.util.hash_pandas_object(line_items, index=False)
+    item_hashes = row_hashes.groupby(line_items["grant_id"].to_numpy()).sum()
+    grant_hashes = pd.util.hash_pandas_object(grants, index=False).to_numpy()
+    return {
+        g: (versions.get(g, 0), int(grant_hashes[i]), int(item_hashes.get(g, 0)))
+        for i, g in enumerate(ids)
+    }
+
+
+# --- Engine ---
+def _project(grants, line_items, rollup, as_of):
+    """
+    Dense grid with one row per (grant, line item, month) of the grant period:
+    actual, anticipated, elapsed, cumulative_actual and projected_cumulative,
+    plus the per-line-item projection columns repeated on every row.
+    """
+    if line_items is None or line_items.empty:
+        return pd.DataFrame(columns=PROJECTION_COLUMNS + ["month", "actual", "anticipated", "elapsed",
+                                                          "cumulative_actual", "projected_cumulative"])
+
+    months = month_ranges(grants["start_date"].tolist(), grants["end_date"].tolist())
+    months["grant_id"] = grants["grant_id"].to_numpy()[months["row"].to_numpy()]
+    grid = (
+        line_items.merge(months[["grant_id", "month"]], on="grant_id")
+        .merge(rollup, on=["grant_id", "line_item_id", "month"], how="left")
+        .sort_values(["grant_id", "line_item_id", "month"], ignore_index=True)
+    )
+    for col in ("allocated", "actual", "anticipated"):
+        grid[col] = grid[col].fillna(0.0).astype(float)
+
+    by_item = grid.groupby("line_item_id", sort=False)
+    grid["elapsed"] = grid["month"] <= as_of
+    elapsed_actual = grid["actual"].where(grid["elapsed"], 0.0)
+    grid["cumulative_actual"] = elapsed_actual.groupby(grid["line_item_id"]).cumsum().round(2)
+
+    grid["months_elapsed"] = by_item["elapsed"].transform("sum").astype(int)
+    grid["months_remaining"] = by_item["month"].transform("size") - grid["months_elapsed"]
+    grid["spent_to_date"] = elapsed_actual.groupby(grid["line_item_id"]).transform("sum").round(2)
+    grid["burn_rate"] = (grid["spent_to_date"] / grid["months_elapsed"].where(grid["months_elapsed"] > 0)).fillna(0.0)
+
+    # Recent burn: mean of the last RECENT_MONTHS elapsed months
+    step_back = grid["months_elapsed"] - grid.groupby("line_item_id").cumcount()
+    recent = grid["elapsed"] & (step_back <= RECENT_MONTHS)
+    grid["recent_burn_rate"] = (
+        grid["actual"].where(recent, 0.0).groupby(grid["line_item_id"]).transform("sum")
+        / np.minimum(grid["months_elapsed"], RECENT_MONTHS).where(grid["months_elapsed"] > 0)
+    ).fillna(0.0)
+
+    # Future months continue at the average burn rate
+    future_step = (~grid["elapsed"]).astype(int).groupby(grid["line_item_id"]).cumsum()
+    grid["projected_cumulative"] = (grid["spent_to_date"] + grid["burn_rate"] * future_step).where(
+        ~grid["elapsed"], grid["cumulative_actual"]
+    ).round(2)
+    grid["projected_end_spend"] = (grid["spent_to_date"] + grid["burn_rate"] * grid["months_remaining"]).round(2)
+    grid["planned_end_spend"] = (
+        grid["spent_to_date"]
+        + grid["anticipated"].where(~grid["elapsed"], 0.0).groupby(grid["line_item_id"]).transform("sum")
+    ).round(2)
+    grid["projected_overspend"] = (grid["projected_end_spend"] - grid["allocated"]).round(2)
+
+    grid["exhaustion_month"] = _exhaustion_months(grid, as_of)
+    return grid
+
+
+def _exhaustion_months(grid, as_of):
+    """
+    First month the projected cumulative spend reaches the allocation, or None.
+    Past the grant end it is extrapolated at the burn rate.
+    """
+    reached = (grid["projected_cumulative"] >= grid["allocated"]) & (grid["allocated"] > 0)
+    first_reached = grid["month"].where(reached).groupby(grid["line_item_id"]).transform("first")
+
+    items = grid.drop_duplicates("line_item_id").set_index("line_item_id")
+    last_elapsed = items["months_elapsed"].where(items["months_elapsed"] > 0)
+    start_index = items["month"].map(_month_index)
+    shortfall = (items["allocated"] - items["spent_to_date"]).round(6)
+    months_needed = np.ceil(shortfall / items["burn_rate"].where(items["burn_rate"] > 0))
+    extrapolated = (start_index + last_elapsed - 1 + months_needed).map(
+        lambda i: _month_key(int(i)) if pd.notna(i) else None
+    )
+
+    fallback = grid["line_item_id"].map(extrapolated.where(items["allocated"] > 0))
+    return first_reached.where(first_reached.notna(), fallback).astype(object).where(lambda s: s.notna(), None)
+
+
+def _summary(grid):
+    if grid.empty:
+        return pd.DataFrame(columns=PROJECTION_COLUMNS)
+    return grid.drop_duplicates("line_item_id")[PROJECTION_COLUMNS].reset_index(drop=True)
+
+
+# --- Incremental grids ---
+_grids = {}  # (grant_id, as_of) -> (stamp, grid)
+_grids_lock = threading.Lock()
+
+
+def _refresh(grants, line_items, as_of):
+    """
+    The dense grid for these grants, reusing the stored grid of every grant
+    whose stamp is unchanged; only the rest have their rollup rows loaded and
+    are recomputed (in one _project pass).
+    """
+    stamps = _stamps(grants, line_items)
+    with _grids_lock:
+        kept = {g: _grids.get((g, as_of)) for g in stamps}
+    stale = [g for g, entry in kept.items() if entry is None or entry[0] != stamps[g]]
+
+    if stale:
+        stale_grants = grants[grants["grant_id"].isin(stale)]
+        stale_items = line_items[line_items["grant_id"].isin(stale)]
+        # Stamps are read first: a write in between only makes the next refresh recompute
+        grid = _project(stale_grants, stale_items, _load_rollup(stale), as_of)
+        parts = dict(tuple(grid.groupby("grant_id", sort=False))) if not grid.empty else {}
+        with _grids_lock:
+            for g in stale:
+                part = parts.get(g, grid.iloc[0:0]).reset_index(drop=True)
+                kept[g] = (stamps[g], part)
+                _grids.pop((g, as_of), None)
+                _grids[(g, as_of)] = kept[g]
+            while len(_grids) > MAX_GRIDS:
+                _grids.pop(next(iter(_grids)))
+
+    parts = [kept[g][1] for g in stamps if not kept[g][1].empty]
+    if not parts:
+        return _project(grants, None, None, as_of)
+    return pd.concat(parts, ignore_index=True)
+
+
+@cached("grants", "grant_line_items", "actual_expenses", "anticipated_expenses")
+def _grant_grid(grant_id, as_of):
+    return _refresh(*_load_grants([int(grant_id)]), as_of)
+
+
+@cached("grants", "grant_line_items", "actual_expenses", "anticipated_expenses")
+def _active_grid(as_of):
+    return _refresh(*_load_grants(active_only=True), as_of)
+
+
+# --- Public API ---
+def get_grant_projection(grant_id, as_of=None):
+    """
+    Projection per line item of one grant: spent to date through as_of
+    (default: last closed month), average and recent monthly burn,
+    projected and planned end-of-grant spend, projected overspend and the
+    month the allocation runs out.
+    """
+    return _summary(_grant_grid(grant_id, as_of or default_as_of()))
+
+
+def get_spend_curve(grant_id, as_of=None):
+    """Cumulative actual and projected spend per line item and month for one grant."""
+    grid = _grant_grid(grant_id, as_of or default_as_of())
+    return grid[["line_item_id", "line_item", "month", "allocated", "actual", "anticipated", "elapsed",
+                 "cumulative_actual", "projected_cumulative"]].reset_index(drop=True)
+
+
+def get_active_projections(as_of=None):
+    """get_grant_projection for every line item of every active grant, from one pass."""
+    return _summary(_active_grid(as_of or default_as_of()))
@@ -0,0 +1,391 @@
+# helpers/qb_import.py
+# Streams a QuickBooks General Ledger / Transaction Detail CSV export into
+# actual_expenses. Rows are read one at a time and only the per
+# (grant, month, code, line item) totals are kept in memory.
+
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, date
+
+from helpers.db_utils import fetch_all, save_actual_expense_rows, transaction
+from helpers.qb_search import suggest_codes
+from helpers.query_cache import invalidates
+
+# Header names QuickBooks uses for each field (matched case-insensitively)
+DATE_COLUMNS = ("date", "transaction date", "txn date")
+ACCOUNT_COLUMNS = ("account", "account number", "account #", "account name")
+AMOUNT_COLUMNS = ("amount", "net amount")
+DEBIT_COLUMNS = ("debit",)
+CREDIT_COLUMNS = ("credit",)
+CLASS_COLUMNS = ("class",)
+
+DATE_FORMATS = ("%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y", "%m-%d-%Y")
+IMPORT_NOTE = "Imported from QuickBooks GL"
+
+_CODE_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)")
+
+
+def parse_account_code(account):
+    """
+    'Expenses:Program:8705 · Workshops' -> '8705'. Only a number leading the
+    last account segment counts ('Rent 2025' has no code); returns None when
+    there is none.
+    """
+    if not account:
+        return None
+    match = _CODE_RE.match(account.split(":")[-1])
+    return match.group(1) if match else None
+
+
+def parse_month(value):
+    """Transaction date -> 'YYYY-MM', or None if it is not a date."""
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m")
+        except ValueError:
+            continue
+    return None
+
+
+def parse_amount(value):
+    """'$1,234.50' -> 1234.5, '(75.00)' -> -75.0, '' -> 0.0"""
+    value = (value or "").strip().replace("$", "").replace(",", "")
+    if not value:
+        return 0.0
+    if value.startswith("(") and value.endswith(")"):
+        return -float(value[1:-1])
+    return float(value)
+
+
+def _find_column(header, candidates):
+    for i, name in enumerate(header):
+        if name.strip().lower() in candidates:
+            return i
+    return None
+
+
+def _locate_header(reader):
+    """GL exports start with report title rows; skip until the column header row."""
+    for header in reader:
+        cols = {
+            "date": _find_column(header, DATE_COLUMNS),
+            "account": _find_column(header, ACCOUNT_COLUMNS),
+            "amount": _find_column(header, AMOUNT_COLUMNS),
+            "debit": _find_column(header, DEBIT_COLUMNS),
+            "credit": _find_column(header, CREDIT_COLUMNS),
+            "class": _find_column(header, CLASS_COLUMNS),
+        }
+        has_amount = cols["amount"] is not None or cols["debit"] is not None
+        if cols["date"] is not None and cols["account"] is not None and has_amount:
+            return cols
+    raise ValueError("No Date / Account / Amount header row found in the GL export.")
+
+
+def _load_routes():
+    """qb_code -> [(grant_id, line_item_id, grant_name, first_month, last_month)]"""
+    rows = fetch_all("""
+        SELECT m.qb_code, m.grant_id, m.grant_line_item_id, g.name, g.start_date, g.end_date
+        FROM qb_to_grant_mapping m
+        JOIN grants g ON g.id = m.grant_id
+    """)
+    routes = defaultdict(list)
+    for code, grant_id, line_item_id, grant_name, start, end in rows:
+        routes[code].append((grant_id, line_item_id, grant_name, (start or "")[:7], (end or "9999-12")[:7]))
+    return routes
+
+
+def import_gl_csv(source, grant_ids=None, dry_run=False, date_submitted=None):
+    """
+    Imports a QuickBooks GL CSV (a path or a text/binary file object).
+
+    Each row's account code is resolved against qb_accounts and routed through
+    qb_to_grant_mapping to the line item mapped for a grant whose period covers
+    the transaction month. If the export has a Class column whose value is a
+    grant name, routing is limited to that grant. Amounts are summed per
+    (grant, month, code, line item) and upserted in one transaction, replacing
+    what was stored for those keys, so re-importing the same export is safe.
+
+    grant_ids limits the import to those grants; rows that route to another
+    grant are skipped and reported under other_grant_codes. dry_run skips the
+    write. Returns a report dict; suggested_codes lists likely qb_accounts
+    codes for each unknown code, matched on the GL account name.
+    """
+    if isinstance(source, str):
+        with open(source, newline="", encoding="utf-8-sig") as f:
+            return import_gl_csv(f, grant_ids, dry_run, date_submitted)
+    if isinstance(source, (io.BufferedIOBase, io.RawIOBase)):
+        source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+
+    if grant_ids is not None:
+        grant_ids = {int(g) for g in grant_ids}
+    known_codes = {row[0] for row in fetch_all("SELECT code FROM qb_accounts")}
+    routes = _load_routes()
+    grant_names = {route[2] for targets in routes.values() for route in targets}
+
+    totals = defaultdict(float)  # (grant_id, month, code, line_item_id) -> amount
+    unknown = defaultdict(float)  # code not in qb_accounts
+    unknown_accounts = {}  # unknown code -> first GL account text seen for it
+    unmapped = defaultdict(float)  # code not mapped to a grant for that month, or account with no code
+    ambiguous = defaultdict(float)  # code maps to more than one line item
+    other_grant = defaultdict(float)  # code routes only to grants outside grant_ids
+    report = {"rows_read": 0, "rows_imported": 0, "rows_skipped": 0}
+    decisions = {}  # (code, month, class) -> target, memoized across rows
+
+    reader = csv.reader(source)
+    cols = _locate_header(reader)
+
+    for row in reader:
+        report["rows_read"] += 1
+        try:
+            account = row[cols["account"]].strip()
+            code = parse_account_code(account)
+            month = parse_month(row[cols["date"]])
+            if cols["amount"] is not None and row[cols["amount"]].strip():
+                amount = parse_amount(row[cols["amount"]])
+            else:
+                debit = parse_amount(row[cols["debit"]]) if cols["debit"] is not None else 0.0
+                credit = parse_amount(row[cols["credit"]]) if cols["credit"] is not None else 0.0
+                amount = debit - credit
+        except (IndexError, ValueError):
+            report["rows_skipped"] += 1
+            continue
+        if not month or not account:
+            # Subtotal, blank and "Total for ..." lines
+            report["rows_skipped"] += 1
+            continue
+        if not code:
+            # A posting to an account without a leading number can't be routed
+            unmapped[account] += amount
+            continue
+
+        qb_class = row[cols["class"]].strip() if cols["class"] is not None and len(row) > cols["class"] else ""
+        key = (code, month, qb_class)
+        if key not in decisions:
+            targets = [
+                t for t in routes.get(code, [])
+                if t[3] <= month <= t[4] and (qb_class not in grant_names or t[2] == qb_class)
+            ]
+            selected = targets if grant_ids is None else [t for t in targets if t[0] in grant_ids]
+            if code not in known_codes:
+                decisions[key] = unknown
+            elif targets and not selected:
+                decisions[key] = other_grant
+            elif not selected:
+                decisions[key] = unmapped
+            elif len(selected) > 1:
+                decisions[key] = ambiguous
+            else:
+                decisions[key] = (selected[0][0], selected[0][1])
+
+        target = decisions[key]
+        if isinstance(target, tuple):
+            grant_id, line_item_id = target
+            totals[(grant_id, month, code, line_item_id)] += amount
+            report["rows_imported"] += 1
+        else:
+            target[code] += amount
+            if target is unknown:
+                unknown_accounts.setdefault(code, row[cols["account"]])
+
+    rows = [
+        (grant_id, month, code, line_item_id, round(amount, 2), IMPORT_NOTE)
+        for (grant_id, month, code, line_item_id), amount in totals.items()
+    ]
+    written = 0
+    if not dry_run:
+        written = save_actual_expense_rows(rows, date_submitted or date.today(), keep_notes=True)
+
+    report.update({
+        "expenses_written": written,
+        "expenses": len(rows),
+        "total_imported": round(sum(totals.values()), 2),
+        "unknown_codes": {c: round(a, 2) for c, a in sorted(unknown.items())},
+        "unmapped_codes": {c: round(a, 2) for c, a in sorted(unmapped.items())},
+        "ambiguous_codes": {c: round(a, 2) for c, a in sorted(ambiguous.items())},
+        "other_grant_codes": {c: round(a, 2) for c, a in sorted(other_grant.items())},
+        "suggested_codes": {c: suggest_codes(account) for c, account in sorted(unknown_accounts.items())},
+    })
+    return report
+
+
+# --- Chart of Accounts ---
+# Columns accepted in a chart-of-accounts CSV (matched case-insensitively)
+CHART_CODE_COLUMNS = ("code", "account #", "account number", "number", "accnum")
+CHART_NAME_COLUMNS = ("name", "account name", "description", "account")
+CHART_SUB_COLUMNS = ("subcategory", "category", "sub category")
+CHART_PARENT_COLUMNS = ("parent category", "parent", "parent_category", "type", "account type")
+
+# IIF ACCNTTYPE values -> parent category used when NAME has no parent segment
+IIF_ACCOUNT_TYPES = {
+    "EXP": "Expenses",
+    "EXEXP": "Other Expenses",
+    "COGS": "Cost of Goods Sold",
+    "INC": "Income",
+    "EXINC": "Other Income",
+    "BANK": "Bank",
+    "AR": "Accounts Receivable",
+    "AP": "Accounts Payable",
+    "OCASSET": "Other Current Assets",
+    "FIXASSET": "Fixed Assets",
+    "OASSET": "Other Assets",
+    "OCLIAB": "Other Current Liabilities",
+    "LTLIAB": "Long Term Liabilities",
+    "EQUITY": "Equity",
+}
+DEFAULT_SUBCATEGORY = "General"
+
+
+def parse_chart_csv(source):
+    """Chart-of-accounts CSV -> list of (code, name, subcategory, parent_category)."""
+    reader = csv.reader(source)
+    header = next(reader, [])
+    cols = [_find_column(header, c) for c in
+            (CHART_CODE_COLUMNS, CHART_NAME_COLUMNS, CHART_SUB_COLUMNS, CHART_PARENT_COLUMNS)]
+    if None in cols:
+        raise ValueError("Chart CSV needs Code, Name, Subcategory and Parent Category columns.")
+
+    entries = []
+    for row in reader:
+        try:
+            code, name, sub, parent = (row[i].strip() for i in cols)
+        except IndexError:
+            continue
+        if code and name:
+            entries.append((code, name, sub or DEFAULT_SUBCATEGORY, parent or DEFAULT_SUBCATEGORY))
+    return entries
+
+
+def parse_chart_iif(source):
+    """
+    QuickBooks IIF export -> list of (code, name, subcategory, parent_category).
+    NAME is 'Parent:Subcategory:Account'; missing levels fall back to the
+    ACCNTTYPE label and DEFAULT_SUBCATEGORY. Accounts without ACCNUM are skipped.
+    """
+    fields = None
+    entries = []
+    for row in csv.reader(source, delimiter="\t"):
+        if not row:
+            continue
+        if row[0] == "!ACCNT":
+            fields = {name.strip().upper(): i for i, name in enumerate(row)}
+            continue
+        if row[0] != "ACCNT" or fields is None:
+            continue
+
+        def field(name):
+            i = fields.get(name)
+            return row[i].strip() if i is not None and i < len(row) else ""
+
+        code = field("ACCNUM")
+        segments = [s.strip() for s in field("NAME").split(":") if s.strip()]
+        if not code or not segments:
+            continue
+        account_type = field("ACCNTTYPE")
+        parent = segments[0] if len(segments) >= 3 else IIF_ACCOUNT_TYPES.get(account_type, account_type.title() or DEFAULT_SUBCATEGORY)
+        sub = segments[-2] if len(segments) >= 2 else DEFAULT_SUBCATEGORY
+        entries.append((code, segments[-1], sub, parent))
+    return entries
+
+
+def read_chart(source, filename=""):
+    """Parses an uploaded chart of accounts, picking CSV or IIF by extension."""
+    if isinstance(source, (io.BufferedIOBase, io.RawIOBase)):
+        source = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    if filename.lower().endswith(".iif"):
+        return parse_chart_iif(source)
+    return parse_chart_csv(source)
+
+
+def _existing_chart():
+    """code -> (name, subcategory, parent_category) for accounts already stored."""
+    rows = fetch_all("""
+        SELECT a.code, a.name, c.name, p.name
+        FROM qb_accounts a
+        JOIN qb_categories c ON a.category_id = c.id
+        LEFT JOIN qb_parent_categories p ON c.parent_id = p.id
+    """)
+    return {code: (name, sub, parent) for code, name, sub, parent in rows}
+
+
+def diff_chart(entries):
+    """
+    Compares an incoming chart with qb_accounts.
+    Returns {"new": [...], "renamed": [(code, old, new)], "moved": [(code, old_path, new_path)],
+             "removed": [(code, name)], "unchanged": int}
+    """
+    existing = _existing_chart()
+    incoming = {code: (name, sub, parent) for code, name, sub, parent in entries}
+    diff = {"new": [], "renamed": [], "moved": [], "removed": [], "unchanged": 0}
+
+    for code, (name, sub, parent) in incoming.items():
+        if code not in existing:
+            diff["new"].append((code, name, sub, parent))
+            continue
+        old_name, old_sub, old_parent = existing[code]
+        changed = False
+        if old_name != name:
+            diff["renamed"].append((code, old_name, name))
+            changed = True
+        if (old_sub, old_parent) != (sub, parent):
+            diff["moved"].append((code, f"{old_parent} › {old_sub}", f"{parent} › {sub}"))
+            changed = True
+        if not changed:
+            diff["unchanged"] += 1
+
+    diff["removed"] = [(code, existing[code][0]) for code in sorted(existing.keys() - incoming.keys())]
+    return diff
+
+
+@invalidates("qb_parent_categories", "qb_categories", "qb_accounts")
+def apply_chart(entries, remove_missing=False):
+    """
+    Writes a whole chart of accounts in one transaction: creates missing parent
+    categories and subcategories, then upserts every account. With
+    remove_missing, accounts absent from the chart are deleted unless they are
+    still referenced by a mapping or an expense.
+    Returns counts of what was written.
+    """
+    entries = list({code: (code, name, sub, parent) for code, name, sub, parent in entries}.values())
+    with transaction() as conn:
+        # Counted before / after: psycopg2's executemany rowcount only covers the last statement
+        parent_ids = dict(conn.execute("SELECT name, id FROM qb_parent_categories").fetchall())
+        parents_before = len(parent_ids)
+        new_parents = sorted({parent for _, _, _, parent in entries} - parent_ids.keys())
+        if new_parents:
+            conn.executemany("INSERT OR IGNORE INTO qb_parent_categories (name) VALUES (?)", [(p,) for p in new_parents])
+            parent_ids = dict(conn.execute("SELECT name, id FROM qb_parent_categories").fetchall())
+        parents_created = len(parent_ids) - parents_before
+
+        # qb_categories has no UNIQUE(name, parent_id), so resolve in memory
+        sub_ids = {(name, pid): cid for cid, name, pid in conn.execute("SELECT id, name, parent_id FROM qb_categories")}
+        missing = {(sub, parent_ids[parent]) for _, _, sub, parent in entries} - sub_ids.keys()
+        conn.executemany("INSERT INTO qb_categories (name, parent_id) VALUES (?, ?)", sorted(missing))
+        if missing:
+            sub_ids = {(name, pid): cid for cid, name, pid in conn.execute("SELECT id, name, parent_id FROM qb_categories")}
+
+        conn.executemany("""
+            INSERT INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)
+            ON CONFLICT (code) DO UPDATE SET name = excluded.name, category_id = excluded.category_id
+        """, [(code, name, sub_ids[(sub, parent_ids[parent])]) for code, name, sub, parent in entries])
+
+        removed = 0
+        if remove_missing:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS chart_codes (code TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM chart_codes")
+            conn.executemany("INSERT OR IGNORE INTO chart_codes (code) VALUES (?)", [(e[0],) for e in entries])
+            removed = conn.execute("""
+                DELETE FROM qb_accounts
+                WHERE code NOT IN (SELECT code FROM chart_codes)
+                  AND code NOT IN (SELECT qb_code FROM qb_to_grant_mapping WHERE qb_code IS NOT NULL)
+                  AND code NOT IN (SELECT qb_code FROM actual_expenses WHERE qb_code IS NOT NULL)
+            """).rowcount
+
+    return {
+        "accounts": len(entries),
+        "parent_categories_created": parents_created,
+        "subcategories_created": len(missing),
+        "accounts_removed": removed,
+    }
@@ -0,0 +1,170 @@
+# helpers/qb_search.py
+# In-memory search over the chart of accounts (code, name, subcategory and
+# parent category). The index is built once from a single query and cached
+# until qb_accounts or its categories change; lookups are a bisect into a
+# sorted token list plus a substring pass over the surviving candidates.
+
+import re
+from bisect import bisect_left
+
+from helpers.db_utils import fetch_all
+from helpers.query_cache import cached
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)*")
+
+# Match ranks, lower is better
+_CODE_PREFIX, _NAME_WORD, _CATEGORY_WORD, _NAME_SUBSTRING, _CATEGORY_SUBSTRING = range(5)
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+class QbSearchIndex:
+    def __init__(self, rows):
+        self.entries = [tuple(row) for row in rows]  # (code, name, subcategory, parent_category)
+        self.by_code = {entry[0]: entry for entry in self.entries}
+        self._names = [" ".join(_tokens(entry[1])) for entry in self.entries]
+        self._codes = [entry[0].lower() for entry in self.entries]
+        self._categories = [f"{entry[2] or ''} {entry[3] or ''}".lower() for entry in self.entries]
+
+        tokens = []
+        for i, (code, name, subcategory, parent) in enumerate(self.entries):
+            tokens.append((code.lower(), _CODE_PREFIX, i))
+            tokens.extend((t, _NAME_WORD, i) for t in _tokens(name))
+            tokens.extend((t, _CATEGORY_WORD, i) for t in _tokens(subcategory) + _tokens(parent))
+        tokens.sort()
+        self._tokens = tokens
+        self._keys = [t[0] for t in tokens]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix_matches(self, term):
+        """entry index -> best rank among tokens starting with term"""
+        matches = {}
+        for pos in range(bisect_left(self._keys, term), len(self._keys)):
+            token, rank, i = self._tokens[pos]
+            if not token.startswith(term):
+                break
+            if i not in matches or rank < matches[i]:
+                matches[i] = rank
+        return matches
+
+    def _substring_rank(self, term, i):
+        if term in self._codes[i] or term in self._names[i]:
+            return _NAME_SUBSTRING
+        if term in self._categories[i]:
+            return _CATEGORY_SUBSTRING
+        return None
+
+    def search(self, query, limit=20):
+        """
+        Entries matching every word of query, best first: exact code, code
+        prefix, name prefix, then word prefixes and substrings across name,
+        subcategory and parent category. An empty query returns everything
+        in chart order.
+        """
+        terms = _tokens(query)
+        if not terms:
+            return self.entries[:limit] if limit else list(self.entries)
+
+        scores = None  # entry index -> summed rank over the terms seen so far
+        for term in terms:
+            matches = self._prefix_matches(term)
+            candidates = range(len(self.entries)) if scores is None else scores.keys()
+            for i in candidates:
+                if i not in matches:
+                    rank = self._substring_rank(term, i)
+                    if rank is not None:
+                        matches[i] = rank
+            if scores is None:
+                scores = matches
+            else:
+                scores = {i: scores[i] + rank for i, rank in matches.items() if i in scores}
+            if not scores:
+                return []
+
+        phrase = " ".join(terms)
+        code_query = terms[0]
+
+        def sort_key(i):
+            code, name = self._codes[i], self._names[i]
+            if code == code_query:
+                tier = 0
+            elif code.startswith(code_query):
+                tier = 1
+            elif name.startswith(phrase):
+                tier = 2
+            else:
+                tier = 3
+            return tier, scores[i], code
+
+        ranked = sorted(scores, key=sort_key)
+        return [self.entries[i] for i in (ranked[:limit] if limit else ranked)]
+
+
+@cached("qb_accounts", "qb_categories", "qb_parent_categories")
+def get_qb_index():
+    """The search index for the current chart of accounts."""
+    return QbSearchIndex(fetch_all("""
+        SELECT a.code, a.name, c.name, p.name
+        FROM qb_accounts a
+        LEFT JOIN qb_categories c ON a.category_id = c.id
+        LEFT JOIN qb_parent_categories p ON c.parent_id = p.id
+        ORDER BY p.name, c.name, a.code
+    """))
+
+
+@cached("qb_accounts", "qb_categories", "qb_parent_categories", "qb_to_grant_mapping")
+def _most_mapped():
+    """Every chart entry, codes mapped to the most line items first (chart order within ties)."""
+    counts = dict(fetch_all("SELECT qb_code, COUNT(*) FROM qb_to_grant_mapping GROUP BY qb_code"))
+    return sorted(get_qb_index().entries, key=lambda entry: -counts.get(entry[0], 0))
+
+
+# --- Public API ---
+def search_qb_codes(query, limit=20):
+    """
+    Ranked (code, name, subcategory, parent_category) tuples matching query.
+    An empty query lists the most-mapped codes first, so a picker can show a
+    short list before anything is typed.
+    """
+    if not _tokens(query):
+        entries = _most_mapped()
+        return entries[:limit] if limit else list(entries)
+    return get_qb_index().search(query, limit)
+
+
+def qb_code_count():
+    """Number of codes in the chart of accounts."""
+    return len(get_qb_index())
+
+
+def qb_code_label(code):
+    """'8705 – Workshops' for a known code, else the code itself."""
+    entry = get_qb_index().by_code.get(code)
+    return f"{entry[0]} – {entry[1]}" if entry else code
+
+
+def suggest_codes(account, limit=3):
+    """
+    Likely qb_accounts codes for a GL account string whose code is unknown,
+    e.g. 'Expenses:Program:8706 · Workshops'. Matches on the account name
+    first, then on ever shorter prefixes of the code.
+    """
+    leaf = (account or "").split(":")[-1]
+    words = [t for t in _tokens(leaf) if not t[0].isdigit()]
+    index = get_qb_index()
+    if words:
+        found = index.search(" ".join(words), limit)
+        if found:
+            return [entry[0] for entry in found]
+    codes = [t for t in _tokens(leaf) if t[0].isdigit()]
+    if codes:
+        code = codes[0]
+        for end in range(len(code) - 1, 0, -1):
+            found = index.search(code[:end], limit)
+            if found:
+                return [entry[0] for entry in found]
+    return []
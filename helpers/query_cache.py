@@ -0,0 +1,91 @@
+# helpers/query_cache.py
+
+import functools
+import threading
+from collections import defaultdict
+
+import pandas as pd
+
+# Read results are memoized per table "generation". Every writer bumps the
+# generation of the tables it touches, which evicts the entries built from them.
+# State is per process, which matches how Streamlit serves all sessions.
+MAX_ENTRIES = 512
+
+_generations = defaultdict(int)  # table -> generation
+_entries = {}  # key -> (tables, generation snapshot, value)
+_lock = threading.RLock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def _snapshot(tables):
+    return tuple(_generations[t] for t in tables)
+
+
+def cached(*tables):
+    """Memoizes a read that depends on the given tables."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (func.__qualname__, args, tuple(sorted(kwargs.items())))
+            with _lock:
+                entry = _entries.get(key)
+                if entry and entry[1] == _snapshot(tables):
+                    _stats["hits"] += 1
+                    value = entry[2]
+                    # DataFrames are mutable; never hand out the cached instance
+                    return value.copy() if isinstance(value, pd.DataFrame) else value
+                _stats["misses"] += 1
+                snapshot = _snapshot(tables)
+
+            value = func(*args, **kwargs)
+
+            with _lock:
+                # Skip storing if a writer ran while we were reading
+                if snapshot == _snapshot(tables):
+                    if len(_entries) >= MAX_ENTRIES:
+                        _entries.pop(next(iter(_entries)))
+                        _stats["evictions"] += 1
+                    _entries[key] = (tables, snapshot, value)
+            return value.copy() if isinstance(value, pd.DataFrame) else value
+        return wrapper
+    return decorator
+
+
+def invalidate(*tables):
+    """Bumps the generation of each table and drops entries that read from them."""
+    with _lock:
+        for table in tables:
+            _generations[table] += 1
+        stale = [key for key, (deps, _, _) in _entries.items() if set(deps) & set(tables)]
+        for key in stale:
+            del _entries[key]
+        _stats["evictions"] += len(stale)
+
+
+def invalidates(*tables):
+    """Decorator for writers: invalidates the given tables once the write returns."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                invalidate(*tables)
+        return wrapper
+    return decorator
+
+
+def clear_cache():
+    with _lock:
+        _stats["evictions"] += len(_entries)
+        _entries.clear()
+
+
+def cache_stats():
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "entries": len(_entries),
+            "hit_rate": round(_stats["hits"] / lookups, 3) if lookups else 0.0,
+        }
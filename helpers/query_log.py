@@ -0,0 +1,168 @@
+# helpers/query_log.py
+# Records every statement issued through the db_utils shared ops: timing, row
+# count, calling page and normalized SQL. Statements slower than the threshold
+# also capture the backend's query plan. pages/diagnostics.py renders the results.
+
+import functools
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+
+from helpers.db_backend import get_backend
+
+ENABLED = os.environ.get("GRANT_TRACKER_QUERY_LOG", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("GRANT_TRACKER_SLOW_QUERY_MS", "100"))
+
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_HELPERS = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+_local = threading.local()
+_run_ids = itertools.count(1)
+_recent = deque(maxlen=2000)  # individual statements
+_runs = deque(maxlen=100)  # per-rerun summaries
+_slow = deque(maxlen=200)  # slow statements with their plans
+_by_sql = defaultdict(lambda: {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "pages": set()})
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """Collapses whitespace and replaces literals so identical statements group together."""
+    sql = re.sub(r"\s+", " ", query).strip()
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    sql = re.sub(r"\(\s*\?(?:\s*,\s*\?)+\s*\)", "(...)", sql)
+    return sql
+
+
+def calling_page():
+    """
+    (relative path, frame) of the page script that issued the statement, or of
+    the first non-helper module when it did not come from a page.
+    """
+    frame = sys._getframe(2)
+    fallback = None
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_ROOT):
+            relative = os.path.relpath(filename, _ROOT)
+            if relative.startswith("pages" + os.sep) or relative == "streamlit_app.py":
+                # Walk up to the script's module-level frame
+                while frame.f_back is not None and frame.f_back.f_code.co_filename == frame.f_code.co_filename:
+                    frame = frame.f_back
+                return relative, frame
+            if fallback is None and not filename.startswith(_HELPERS):
+                fallback = relative
+        frame = frame.f_back
+    return fallback or "unknown", None
+
+
+def _current_run(page, script_frame):
+    """
+    Every Streamlit rerun executes the page script in a fresh module-level
+    frame, so a new script frame on this thread opens a new rerun record.
+    Statements from outside a page are grouped per thread.
+    """
+    run = getattr(_local, "run", None)
+    if run is None or (script_frame is not None and getattr(_local, "script_frame", None) is not script_frame):
+        run = {"run_id": next(_run_ids), "page": page, "thread": threading.current_thread().name,
+               "started": time.time(), "queries": 0, "total_ms": 0.0}
+        _local.run = run
+        _local.script_frame = script_frame
+        _runs.append(run)
+    return run
+
+
+def _explain(query, params):
+    try:
+        backend = get_backend()
+        with backend.connection() as conn:
+            # Under a savepoint: a failed EXPLAIN would otherwise abort the
+            # caller's open PostgreSQL transaction
+            conn.execute("SAVEPOINT explain_plan")
+            try:
+                rows = conn.execute(backend.explain_prefix + query, params).fetchall()
+            except Exception:
+                conn.execute("ROLLBACK TO SAVEPOINT explain_plan")
+                raise
+            finally:
+                conn.execute("RELEASE SAVEPOINT explain_plan")
+        return "\n".join(str(row[-1]) for row in rows) or "(no plan steps)"
+    except Exception as e:  # e.g. multi-statement scripts or DDL
+        return f"(no plan: {e})"
+
+
+def record_query(query, params, started, rows):
+    """Called by the db_utils shared ops after a statement finishes."""
+    if not ENABLED:
+        return
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    sql = normalize_sql(query)
+    page, script_frame = calling_page()
+
+    plan = None
+    if elapsed_ms >= SLOW_QUERY_MS:
+        plan = _explain(query, params)
+
+    with _lock:
+        run = _current_run(page, script_frame)
+        run["queries"] += 1
+        run["total_ms"] += elapsed_ms
+
+        stats = _by_sql[sql]
+        stats["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["rows"] += rows if rows and rows > 0 else 0
+        stats["pages"].add(page)
+
+        entry = {"run_id": run["run_id"], "page": page, "sql": sql, "ms": round(elapsed_ms, 3),
+                 "rows": rows, "at": time.time()}
+        _recent.append(entry)
+        if plan is not None:
+            _slow.append({**entry, "plan": plan})
+
+
+def set_slow_query_threshold(ms):
+    global SLOW_QUERY_MS
+    SLOW_QUERY_MS = float(ms)
+
+
+def recent_runs(limit=20):
+    """Most recent reruns first: run_id, page, thread, started, queries, total_ms."""
+    with _lock:
+        return [dict(run, total_ms=round(run["total_ms"], 3)) for run in list(_runs)[-limit:]][::-1]
+
+
+def top_queries(limit=20, order_by="total_ms"):
+    """Normalized statements ranked by total time (or "count" / "max_ms")."""
+    with _lock:
+        rows = [
+            {"sql": sql, "count": s["count"], "total_ms": round(s["total_ms"], 3),
+             "avg_ms": round(s["total_ms"] / s["count"], 3), "max_ms": round(s["max_ms"], 3),
+             "rows": s["rows"], "pages": ", ".join(sorted(s["pages"]))}
+            for sql, s in _by_sql.items()
+        ]
+    return sorted(rows, key=lambda r: r[order_by], reverse=True)[:limit]
+
+
+def slow_queries(limit=50):
+    with _lock:
+        return list(_slow)[-limit:][::-1]
+
+
+def run_queries(run_id):
+    with _lock:
+        return [q for q in _recent if q["run_id"] == run_id]
+
+
+def reset_query_log():
+    with _lock:
+        _recent.clear()
+        _runs.clear()
+        _slow.clear()
+        _by_sql.clear()
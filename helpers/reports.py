@@ -0,0 +1,241 @@
+# helpers/reports.py
+# Monthly expense reports for funders: one row per line item (allocation,
+# planned vs actual for the month and to date) followed by its QB code detail.
+# Rows are streamed from the database straight into a CSV or XLSX writer, so
+# memory stays flat however large the report is.
+#
+#   python -m helpers.reports 2025-06 --out reports/               # every active grant
+#   python -m helpers.reports 2025-06 --funder 3 --format csv
+
+import argparse
+import csv
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+from helpers.db_utils import fetch_all, fetch_one, iter_rows
+
+REPORT_COLUMNS = [
+    "Grant", "Funder", "Line Item", "QB Code", "QB Name", "Notes", "Allocated",
+    "Planned (Month)", "Actual (Month)", "Variance (Month)",
+    "Planned To Date", "Actual To Date", "Remaining",
+]
+MONEY_COLUMNS = set(REPORT_COLUMNS[6:])
+FORMATS = ("xlsx", "csv")
+
+
+# --- Rows ---
+def iter_report_rows(month, grant_ids):
+    """
+    Yields report rows (in REPORT_COLUMNS order) for the given grants and
+    YYYY-MM month, ordered by grant and line item. A line item's summary row
+    comes first, then one row per QB code with an actual for the month.
+    """
+    grant_ids = [int(g) for g in grant_ids]
+    if not grant_ids:
+        return
+    in_list = ", ".join("?" * len(grant_ids))
+    query = f"""
+        WITH items AS (
+            SELECT li.id, li.grant_id, li.name, IFNULL(li.allocated_amount, 0) AS allocated,
+                   IFNULL(SUM(CASE WHEN r.month = ? THEN r.anticipated_total END), 0) AS planned_month,
+                   IFNULL(SUM(CASE WHEN r.month = ? THEN r.actual_total END), 0) AS actual_month,
+                   IFNULL(SUM(r.anticipated_total), 0) AS planned_to_date,
+                   IFNULL(SUM(r.actual_total), 0) AS actual_to_date
+            FROM grant_line_items li
+            LEFT JOIN monthly_rollup r
+                   ON r.grant_id = li.grant_id AND r.line_item_id = li.id AND r.month <= ?
+            WHERE li.grant_id IN ({in_list})
+            GROUP BY li.id, li.grant_id, li.name, li.allocated_amount
+        )
+        SELECT g.name, f.name, i.name, 0 AS row_type, NULL, NULL, NULL,
+               i.allocated, i.planned_month, i.actual_month, i.planned_to_date, i.actual_to_date, i.id
+        FROM items i
+        JOIN grants g ON g.id = i.grant_id
+        LEFT JOIN funders f ON f.id = g.funder_id
+        UNION ALL
+        SELECT g.name, f.name, IFNULL(li.name, '(No line item)'), 1, ae.qb_code, qa.name, ae.notes,
+               NULL, NULL, ae.amount, NULL, NULL, IFNULL(li.id, 0)
+        FROM actual_expenses ae
+        JOIN grants g ON g.id = ae.grant_id
+        LEFT JOIN funders f ON f.id = g.funder_id
+        LEFT JOIN grant_line_items li ON li.id = ae.line_item_id
+        LEFT JOIN qb_accounts qa ON qa.code = ae.qb_code
+        WHERE ae.month = ? AND ae.grant_id IN ({in_list})
+        ORDER BY 1, 3, 13, 4, 5
+    """
+    params = (month, month, month, *grant_ids, month, *grant_ids)
+    for (grant, funder, line_item, row_type, code, code_name, notes,
+         allocated, planned, actual, planned_td, actual_td, _) in iter_rows(query, params):
+        if row_type == 0:
+            yield (grant, funder, line_item, None, None, None, allocated, planned, actual,
+                   round(planned - actual, 2), planned_td, actual_td, round(allocated - actual_td, 2))
+        else:
+            yield (grant, funder, line_item, code, code_name, notes, None, None, actual, None, None, None, None)
+
+
+# --- Writers ---
+def _sheet_name(title):
+    return re.sub(r"[\[\]:*?/\\]", " ", title)[:31] or "Report"
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+
+    def write(self, row, summary=False):
+        self.writer.writerow(["" if v is None else v for v in row])
+
+    def close(self):
+        self.file.close()
+
+
+class _XlsxWriter:
+    """xlsxwriter in constant_memory mode, or openpyxl write-only as a fallback."""
+
+    def __init__(self, path, sheet_name):
+        self.path = path
+        try:
+            import xlsxwriter
+        except ImportError:
+            xlsxwriter = None
+        if xlsxwriter is not None:
+            self.book = xlsxwriter.Workbook(path, {"constant_memory": True})
+            self.sheet = self.book.add_worksheet(_sheet_name(sheet_name))
+            self.bold = self.book.add_format({"bold": True})
+            self.money = self.book.add_format({"num_format": "$#,##0.00"})
+            self.bold_money = self.book.add_format({"bold": True, "num_format": "$#,##0.00"})
+            self.row = 0
+            self.engine = "xlsxwriter"
+            return
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise RuntimeError("XLSX export needs xlsxwriter or openpyxl (pip install xlsxwriter); use CSV instead.")
+        self.book = Workbook(write_only=True)
+        self.sheet = self.book.create_sheet(_sheet_name(sheet_name))
+        self.engine = "openpyxl"
+
+    def write(self, row, summary=False):
+        if self.engine == "openpyxl":
+            self.sheet.append(list(row))
+            return
+        for col, value in enumerate(row):
+            if value is None:
+                continue
+            if REPORT_COLUMNS[col] in MONEY_COLUMNS and isinstance(value, (int, float)):
+                self.sheet.write_number(self.row, col, value, self.bold_money if summary else self.money)
+            else:
+                self.sheet.write(self.row, col, value, self.bold if summary else None)
+        self.row += 1
+
+    def close(self):
+        if self.engine == "openpyxl":
+            self.book.save(self.path)
+        else:
+            self.book.close()
+
+
+def write_report(path, month, grant_ids, title="Report"):
+    """Streams the report for grant_ids into path (.csv or .xlsx). Returns the number of data rows."""
+    fmt = os.path.splitext(path)[1].lstrip(".").lower()
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported report format: {fmt}")
+    writer = _CsvWriter(path) if fmt == "csv" else _XlsxWriter(path, title)
+    rows = 0
+    try:
+        writer.write(REPORT_COLUMNS, summary=True)
+        for row in iter_report_rows(month, grant_ids):
+            writer.write(row, summary=row[6] is not None)  # line item rows carry the allocation
+            rows += 1
+    finally:
+        writer.close()
+    return rows
+
+
+def _file_name(name, record_id, month, fmt):
+    # The id keeps names that differ only in punctuation or spacing from sharing a file
+    return f"{re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') or 'report'}_{record_id}_{month}.{fmt}"
+
+
+# --- Per-grant / per-funder ---
+def export_grant_report(grant_id, month, out_dir, fmt="xlsx"):
+    """Writes one grant's report into out_dir and returns its path."""
+    grant = fetch_one("SELECT name FROM grants WHERE id = ?", (grant_id,))
+    if grant is None:
+        raise ValueError(f"Grant {grant_id} does not exist.")
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, _file_name(grant[0], grant_id, month, fmt))
+    write_report(path, month, [grant_id], title=grant[0])
+    return path
+
+
+def export_funder_report(funder_id, month, out_dir, fmt="xlsx"):
+    """Writes one report covering every grant of a funder and returns its path."""
+    funder = fetch_one("SELECT name FROM funders WHERE id = ?", (funder_id,))
+    if funder is None:
+        raise ValueError(f"Funder {funder_id} does not exist.")
+    grant_ids = [row[0] for row in fetch_all("SELECT id FROM grants WHERE funder_id = ?", (funder_id,))]
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, _file_name(funder[0], funder_id, month, fmt))
+    write_report(path, month, grant_ids, title=funder[0])
+    return path
+
+
+# --- Batch ---
+def _init_worker(db_path):
+    from helpers import db_connection
+    db_connection.DB_PATH = db_path
+
+
+def _export_grant_job(args):
+    return export_grant_report(*args)
+
+
+def export_active_grant_reports(month, out_dir, fmt="xlsx", processes=None):
+    """
+    Writes one report per active grant, spread over a process pool.
+    Workers are spawned fresh so none inherits an open SQLite connection;
+    spawning costs about a second, so pass processes=1 for small batches.
+    Returns the list of paths written.
+    """
+    from helpers import db_connection
+
+    grant_ids = [row[0] for row in fetch_all("SELECT id FROM grants WHERE LOWER(status) = 'active' ORDER BY name")]
+    if not grant_ids:
+        return []
+    if processes == 1 or len(grant_ids) == 1:
+        return [export_grant_report(g, month, out_dir, fmt) for g in grant_ids]
+
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = [(g, month, out_dir, fmt) for g in grant_ids]
+    with ProcessPoolExecutor(max_workers=processes, mp_context=get_context("spawn"),
+                             initializer=_init_worker, initargs=(db_connection.DB_PATH,)) as pool:
+        return list(pool.map(_export_grant_job, jobs, chunksize=max(1, len(jobs) // 32)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export monthly expense reports.")
+    parser.add_argument("month", help="YYYY-MM")
+    parser.add_argument("--out", default="reports", help="output directory")
+    parser.add_argument("--format", choices=FORMATS, default="xlsx")
+    parser.add_argument("--grant", type=int, help="only this grant")
+    parser.add_argument("--funder", type=int, help="one report for every grant of this funder")
+    parser.add_argument("--processes", type=int, help="worker processes for the active-grant batch")
+    args = parser.parse_args(argv)
+
+    if args.grant:
+        paths = [export_grant_report(args.grant, args.month, args.out, args.format)]
+    elif args.funder:
+        paths = [export_funder_report(args.funder, args.month, args.out, args.format)]
+    else:
+        paths = export_active_grant_reports(args.month, args.out, args.format, args.processes)
+    print(f"✅ {len(paths)} report(s) written to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
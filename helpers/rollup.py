@@ -0,0 +1,86 @@
+# helpers/rollup.py
+# monthly_rollup is kept current by triggers in db/schema.sql. These helpers
+# rebuild it from scratch and check it against the expense tables.
+#
+#   python -m helpers.rollup verify
+#   python -m helpers.rollup rebuild
+
+import sys
+from helpers.db_utils import fetch_all, transaction
+from helpers.query_cache import invalidate
+
+# Full aggregate of both expense tables, keyed like monthly_rollup
+_AGGREGATE_SQL = """
+    SELECT grant_id, line_item_id, month,
+           ROUND(SUM(actual), 2) AS actual_total,
+           ROUND(SUM(anticipated), 2) AS anticipated_total
+    FROM (
+        SELECT grant_id, line_item_id, month, IFNULL(amount, 0) AS actual, 0 AS anticipated
+        FROM actual_expenses
+        WHERE line_item_id IS NOT NULL AND month IS NOT NULL
+        UNION ALL
+        SELECT grant_id, line_item_id, month, 0, IFNULL(expected_amount, 0)
+        FROM anticipated_expenses
+        WHERE line_item_id IS NOT NULL AND month IS NOT NULL
+    ) AS expense_rows
+    GROUP BY grant_id, line_item_id, month
+"""
+
+
+def rebuild_rollup():
+    """Recomputes monthly_rollup from actual_expenses and anticipated_expenses in one transaction."""
+    with transaction() as conn:
+        conn.execute("DELETE FROM monthly_rollup")
+        cursor = conn.execute(f"""
+            INSERT INTO monthly_rollup (grant_id, line_item_id, month, actual_total, anticipated_total)
+            {_AGGREGATE_SQL}
+        """)
+        rows = cursor.rowcount
+    invalidate("actual_expenses", "anticipated_expenses")
+    return rows
+
+
+def verify_rollup(tolerance=0.005):
+    """
+    Compares monthly_rollup with a fresh aggregate.
+    Returns a list of (grant_id, line_item_id, month, rollup_actual, expected_actual,
+    rollup_anticipated, expected_anticipated) for every key that disagrees.
+    A key missing on one side counts as zero on that side.
+    """
+    query = f"""
+        WITH expected AS ({_AGGREGATE_SQL}),
+        keys AS (
+            SELECT grant_id, line_item_id, month FROM expected
+            UNION
+            SELECT grant_id, line_item_id, month FROM monthly_rollup
+        )
+        SELECT k.grant_id, k.line_item_id, k.month,
+               IFNULL(r.actual_total, 0), IFNULL(e.actual_total, 0),
+               IFNULL(r.anticipated_total, 0), IFNULL(e.anticipated_total, 0)
+        FROM keys k
+        LEFT JOIN monthly_rollup r
+            ON r.grant_id = k.grant_id AND r.line_item_id = k.line_item_id AND r.month = k.month
+        LEFT JOIN expected e
+            ON e.grant_id = k.grant_id AND e.line_item_id = k.line_item_id AND e.month = k.month
+        WHERE ABS(IFNULL(r.actual_total, 0) - IFNULL(e.actual_total, 0)) > ?
+           OR ABS(IFNULL(r.anticipated_total, 0) - IFNULL(e.anticipated_total, 0)) > ?
+        ORDER BY k.grant_id, k.line_item_id, k.month
+    """
+    return fetch_all(query, (tolerance, tolerance))
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "verify"
+    if command == "rebuild":
+        print(f"✅ Rebuilt monthly_rollup ({rebuild_rollup()} rows).")
+    elif command == "verify":
+        mismatches = verify_rollup()
+        if mismatches:
+            print(f"❌ {len(mismatches)} rollup rows out of sync:")
+            for row in mismatches:
+                print("  ", row)
+            sys.exit(1)
+        print("✅ monthly_rollup matches the expense tables.")
+    else:
+        print("Usage: python -m helpers.rollup [verify|rebuild]")
+        sys.exit(2)
@@ -0,0 +1,208 @@
+# helpers/summary.py
+
+import pandas as pd
+from helpers.date_helpers import generate_month_range
+from helpers.db_utils import fetch_df, fetch_one
+from helpers.query_cache import cached
+
+SUMMARY_COLUMNS = [
+    "grant_id", "line_item_id", "line_item", "allocated",
+    "actual", "anticipated", "variance", "remaining", "burn_to_date",
+]
+
+
+def _in_clause(column, ids):
+    """Returns (' AND column IN (?, ...)', params) or ('', []) when ids is None."""
+    if ids is None:
+        return "", []
+    ids = [int(i) for i in ids]
+    if not ids:
+        return " AND FALSE", []
+    return f" AND {column} IN ({', '.join('?' * len(ids))})", ids
+
+
+# --- Line Item Summary Engine ---
+def get_line_item_summary(grant_ids=None, by_month=False):
+    """
+    Allocated, actual, anticipated, variance and burn-to-date per line item,
+    read from monthly_rollup for one grant, a list of grants, or all grants (None).
+
+    variance = anticipated - actual (positive means under plan).
+    burn_to_date = cumulative actual as a % of the allocation.
+    With by_month=True there is one row per line item and month with activity,
+    and remaining/burn_to_date are running totals through that month.
+    """
+    if grant_ids is not None and not isinstance(grant_ids, (list, tuple, set)):
+        grant_ids = [grant_ids]
+
+    rollup_filter, rollup_params = _in_clause("grant_id", grant_ids)
+    li_filter, li_params = _in_clause("li.grant_id", grant_ids)
+
+    # Totals come from monthly_rollup (trigger-maintained), not the raw expense rows
+    if by_month:
+        query = f"""
+            SELECT li.grant_id, li.id AS line_item_id, li.name AS line_item, r.month,
+                   IFNULL(li.allocated_amount, 0) AS allocated,
+                   r.actual_total AS actual,
+                   r.anticipated_total AS anticipated
+            FROM grant_line_items li
+            JOIN monthly_rollup r ON r.grant_id = li.grant_id AND r.line_item_id = li.id
+            WHERE TRUE{li_filter}
+            ORDER BY li.grant_id, li.name, r.month
+        """
+        params = li_params
+    else:
+        query = f"""
+            WITH totals AS (
+                SELECT grant_id, line_item_id,
+                       SUM(actual_total) AS actual,
+                       SUM(anticipated_total) AS anticipated
+                FROM monthly_rollup
+                WHERE TRUE{rollup_filter}
+                GROUP BY grant_id, line_item_id
+            )
+            SELECT li.grant_id, li.id AS line_item_id, li.name AS line_item,
+                   IFNULL(li.allocated_amount, 0) AS allocated,
+                   IFNULL(t.actual, 0) AS actual,
+                   IFNULL(t.anticipated, 0) AS anticipated
+            FROM grant_line_items li
+            LEFT JOIN totals t ON t.grant_id = li.grant_id AND t.line_item_id = li.id
+            WHERE TRUE{li_filter}
+            ORDER BY li.grant_id, li.name
+        """
+        params = rollup_params + li_params
+
+    df = fetch_df(query, params)
+    for col in ("allocated", "actual", "anticipated"):
+        df[col] = df[col].astype(float)
+
+    spent_to_date = df.groupby("line_item_id")["actual"].cumsum() if by_month else df["actual"]
+    df["variance"] = df["anticipated"] - df["actual"]
+    df["remaining"] = df["allocated"] - spent_to_date
+    df["burn_to_date"] = (
+        (spent_to_date / df["allocated"].where(df["allocated"] != 0) * 100).round(1).fillna(0.0)
+    )
+
+    columns = SUMMARY_COLUMNS[:3] + (["month"] if by_month else []) + SUMMARY_COLUMNS[3:]
+    return df[columns]
+
+
+def get_grant_summary_data(grant_id):
+    """Per-line-item spending table for the summary dashboard (numeric columns stay numeric)."""
+    df = get_line_item_summary(grant_id)
+    return df.rename(columns={
+        "line_item": "Line Item",
+        "allocated": "Allocated",
+        "actual": "Spent",
+        "burn_to_date": "% Spent",
+        "remaining": "Remaining",
+    })[["Line Item", "Allocated", "Spent", "% Spent", "Remaining"]]
+
+
+# --- Budget vs Actual Variance ---
+VARIANCE_METRICS = ["planned", "actual", "variance", "cumulative_variance"]
+
+
+@cached("grants", "grant_line_items", "actual_expenses", "anticipated_expenses")
+def get_variance_matrix(grant_id, start_month=None, end_month=None):
+    """
+    Dense line item x month matrix of planned (anticipated), actual, variance
+    (planned - actual) and cumulative variance for one grant, optionally limited
+    to a YYYY-MM window. Cumulative variance carries in everything before the
+    window, so it always reflects the grant to date.
+
+    Returns a DataFrame indexed by (line_item_id, line_item) with
+    (metric, month) columns; metric is one of VARIANCE_METRICS.
+    """
+    grant = fetch_one("SELECT start_date, end_date FROM grants WHERE id = ?", (grant_id,))
+    months = generate_month_range(grant[0], grant[1]) if grant and grant[0] and grant[1] else []
+    months = [m for m in months if (start_month is None or m >= start_month) and (end_month is None or m <= end_month)]
+    first, last = (months[0], months[-1]) if months else ("", "")
+
+    # Line items, the carry-in before the window and the in-window rollup rows, in one query
+    query = """
+        WITH prior AS (
+            SELECT line_item_id, SUM(anticipated_total) - SUM(actual_total) AS carry_in
+            FROM monthly_rollup
+            WHERE grant_id = ? AND month < ?
+            GROUP BY line_item_id
+        )
+        SELECT li.id AS line_item_id, li.name AS line_item, IFNULL(p.carry_in, 0) AS carry_in,
+               r.month, IFNULL(r.anticipated_total, 0) AS planned, IFNULL(r.actual_total, 0) AS actual
+        FROM grant_line_items li
+        LEFT JOIN prior p ON p.line_item_id = li.id
+        LEFT JOIN monthly_rollup r
+               ON r.grant_id = li.grant_id AND r.line_item_id = li.id AND r.month >= ? AND r.month <= ?
+        WHERE li.grant_id = ?
+        ORDER BY li.name
+    """
+    df = fetch_df(query, (grant_id, first, first, last, grant_id))
+    for col in ("carry_in", "planned", "actual"):
+        df[col] = df[col].astype(float)
+
+    items = df.drop_duplicates("line_item_id")[["line_item_id", "line_item", "carry_in"]]
+    dense = pd.MultiIndex.from_product([items["line_item_id"], months], names=["line_item_id", "month"])
+    long = (
+        df.dropna(subset=["month"])
+        .set_index(["line_item_id", "month"])[["planned", "actual"]]
+        .reindex(dense, fill_value=0.0)
+    )
+    long["variance"] = (long["planned"] - long["actual"]).round(2)
+    carry_in = long.index.get_level_values("line_item_id").map(items.set_index("line_item_id")["carry_in"])
+    long["cumulative_variance"] = (long.groupby(level="line_item_id")["variance"].cumsum() + carry_in).round(2)
+
+    # Reshape once: metrics x months as columns
+    matrix = long[VARIANCE_METRICS].unstack("month").reindex(index=items["line_item_id"])
+    matrix = matrix.reindex(columns=pd.MultiIndex.from_product([VARIANCE_METRICS, months], names=[None, "month"]))
+    matrix.index = pd.MultiIndex.from_frame(items[["line_item_id", "line_item"]])
+    return matrix
+
+
+# --- Portfolio Summary ---
+@cached("grants", "funders", "grant_line_items", "actual_expenses")
+def _portfolio_frame():
+    query = """
+        WITH alloc AS (
+            SELECT grant_id, COUNT(*) AS line_items, SUM(allocated_amount) AS allocated
+            FROM grant_line_items
+            GROUP BY grant_id
+        ),
+        spent AS (
+            SELECT grant_id, SUM(actual_total) AS spent
+            FROM monthly_rollup
+            GROUP BY grant_id
+        )
+        SELECT g.id AS grant_id, g.name AS "grant", f.name AS funder, g.status,
+               g.start_date, g.end_date,
+               IFNULL(g.total_award, 0) AS award,
+               IFNULL(a.line_items, 0) AS line_items,
+               IFNULL(a.allocated, 0) AS allocated,
+               IFNULL(s.spent, 0) AS spent
+        FROM grants g
+        LEFT JOIN funders f ON g.funder_id = f.id
+        LEFT JOIN alloc a ON a.grant_id = g.id
+        LEFT JOIN spent s ON s.grant_id = g.id
+        ORDER BY g.start_date DESC
+    """
+    df = fetch_df(query)
+    for col in ("award", "allocated", "spent"):
+        df[col] = df[col].astype(float)
+    df["remaining"] = df["award"] - df["spent"]
+    df["unallocated"] = df["award"] - df["allocated"]
+    df["pct_spent"] = (df["spent"] / df["award"].where(df["award"] != 0) * 100).round(1).fillna(0.0)
+    df["over_allocated"] = df["allocated"] > df["award"]
+    return df
+
+
+def get_portfolio_summary(funders=None, statuses=None):
+    """
+    Award, allocated, spent, remaining and over-allocation flag for every grant,
+    from one grouped query. The unfiltered frame is cached, so changing the
+    funder/status filters does not hit the database.
+    """
+    df = _portfolio_frame()
+    if funders:
+        df = df[df["funder"].isin(funders)]
+    if statuses:
+        df = df[df["status"].isin(statuses)]
+    return df.reset_index(drop=True)
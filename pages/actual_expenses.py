@@ -2,19 +2,21 @@
 
 import streamlit as st
 import pandas as pd
+from contextlib import nullcontext
 from datetime import datetime
 from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
 from helpers.db_utils import (
     get_all_grants,
-    get_line_items_by_grant,
-    get_mappings_for_grant,
-    get_actual_expenses_for_grant,
-    save_actual_expense,
+    get_expense_entry_table,
+    save_actual_expenses_bulk,
 )
-from helpers.date_helpers import generate_month_range
+from helpers.date_helpers import generate_month_range, month_label_map
+from helpers.qb_import import import_gl_csv
+from helpers.audit_session import audited, editor_name_input
 
 st.set_page_config(page_title="💵 Actual Expenses", layout="wide")
 st.title("Enter Monthly Actual Expenses")
+editor_name_input()
 
 # -------------------
 # 1. GRANT SELECTION
@@ -41,50 +43,70 @@ if not month_range:
     st.warning("This grant has no valid month range.")
     st.stop()
 
-month_label_map = {m: datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in month_range}
-label_to_month = {v: k for k, v in month_label_map.items()}
+label_to_month = {v: k for k, v in month_label_map(month_range).items()}
 
 with col2:
     selected_label = st.selectbox("📅 Select Reporting Month", list(label_to_month.keys()))
     selected_month = label_to_month[selected_label]
 
 # --------------------------
-# 3. Retrieve Mappings and Existing Expenses
+# 2b. Import QuickBooks General Ledger (optional)
 # --------------------------
-line_items = get_line_items_by_grant(selected_grant_id)
-mappings = get_mappings_for_grant(selected_grant_id)
-existing_expenses = get_actual_expenses_for_grant(selected_grant_id, selected_month)
-
-# Build lookup for existing records
-expense_lookup = {
-    (row[1], row[5]): row  # (qb_code, line_item_id): full row
-    for row in existing_expenses
-}
+with st.expander("📥 Import from QuickBooks General Ledger (CSV)"):
+    st.caption("Upload a General Ledger or Transaction Detail export. Amounts are routed to line items through the QB code mappings and replace previously saved amounts for the same code and month.")
+    gl_file = st.file_uploader("GL export", type=["csv"], key="gl_upload")
+    only_selected = st.checkbox("Only import into the selected grant", value=True)
+    col_preview, col_import = st.columns(2)
+    preview_clicked = col_preview.button("🔍 Preview Import", disabled=gl_file is None)
+    import_clicked = col_import.button("📥 Import", disabled=gl_file is None)
+
+    if gl_file is not None and (preview_clicked or import_clicked):
+        gl_file.seek(0)
+        try:
+            # A preview writes nothing, so it does not need a name
+            with nullcontext() if preview_clicked else audited("Actual Expenses"):
+                report = import_gl_csv(
+                    gl_file,
+                    grant_ids=[selected_grant_id] if only_selected else None,
+                    dry_run=preview_clicked,
+                )
+        except ValueError as ve:
+            st.error(f"⚠️ {ve}")
+        else:
+            verb = "would be written" if preview_clicked else "written"
+            st.success(
+                f"✅ {report['rows_imported']} of {report['rows_read']} GL rows matched; "
+                f"{report['expenses']} expense entries ({report['total_imported']:,.2f}) {verb}."
+            )
+            for key, label in [
+                ("unmapped_codes", "Codes (or accounts without a code) not mapped to a line item for that month"),
+                ("ambiguous_codes", "Codes mapped to more than one line item"),
+                ("unknown_codes", "Codes not found in QuickBooks accounts"),
+            ]:
+                if report[key]:
+                    st.warning(f"{label}:")
+                    codes_df = pd.DataFrame(list(report[key].items()), columns=["QB Code", "Amount"])
+                    if key == "unknown_codes":
+                        codes_df["Did you mean"] = codes_df["QB Code"].map(
+                            lambda c: ", ".join(report["suggested_codes"].get(c, []))
+                        )
+                    st.dataframe(codes_df, use_container_width=True)
+            if report["other_grant_codes"]:
+                st.info("Skipped (mapped to another grant):")
+                st.dataframe(
+                    pd.DataFrame(list(report["other_grant_codes"].items()), columns=["QB Code", "Amount"]),
+                    use_container_width=True,
+                )
 
 # --------------------------
-# 4. Construct Entry Table
+# 3. Construct Entry Table (mappings joined to this month's expenses)
 # --------------------------
-records = []
-for map_id, qb_code, qb_name, li_name in mappings:
-    line_item_id = next((li[0] for li in line_items if li[1] == li_name), None)
-    expense_row = expense_lookup.get((qb_code, line_item_id))
-
-    records.append({
-        "Line Item": li_name,
-        "QB Code": qb_code,
-        "QB Name": qb_name,
-        "Amount Spent": float(expense_row[2]) if expense_row else 0.0,
-        "Notes": expense_row[3] if expense_row else "",
-        "line_item_id": line_item_id
-    })
-
-if not records:
+entry_df = get_expense_entry_table(selected_grant_id, selected_month)
+
+if entry_df.empty:
     st.info("No line item mappings found for this grant.")
     st.stop()
 
-# Prepare DataFrame for display
-entry_df = pd.DataFrame(records).reset_index(drop=True)
-
 
 st.subheader("📟 Monthly Expense Entry Table")
 gb = GridOptionsBuilder.from_dataframe(entry_df)
@@ -105,7 +127,7 @@ edited_df = grid_response["data"]
 
 
 # --------------------------
-# 5. Submit Expenses
+# 4. Submit Expenses
 # --------------------------
 # if st.button("📂 Submit Actual Expenses"):
 #     for _, row in edited_df.iterrows():
@@ -131,26 +153,22 @@ edited_df = grid_response["data"]
 
 
 if st.button("📂 Submit Actual Expenses"):
-    for _, row in edited_df.iterrows():
-        amount = float(row["Amount Spent"])
-        raw_notes = row.get("Notes", "")
-        notes = raw_notes.strip() if isinstance(raw_notes, str) else ""
-        line_item_id = row["line_item_id"]
-        qb_code = row["QB Code"]
-
-        if amount != 0 or notes:
-            save_actual_expense(
-                grant_id=selected_grant_id,
-                month=selected_month,
-                qb_code=qb_code,
-                line_item_id=line_item_id,
-                amount=amount,
-                notes=notes,
-                date_submitted=datetime.today().date()
-            )
-    st.success("✅ Expenses saved.")
+    amounts = edited_df["Amount Spent"].astype(float)
+    notes = edited_df["Notes"].where(edited_df["Notes"].apply(lambda n: isinstance(n, str)), "").str.strip()
+    to_save = (amounts != 0) | (notes != "")
+
+    # One transaction for the whole month (update or insert per row via upsert)
+    with audited("Actual Expenses"):
+        saved = save_actual_expenses_bulk(
+            grant_id=selected_grant_id,
+            month=selected_month,
+            rows=zip(
+                edited_df.loc[to_save, "QB Code"],
+                edited_df.loc[to_save, "line_item_id"],
+                amounts[to_save],
+                notes[to_save],
+            ),
+            date_submitted=datetime.today().date()
+        )
+    st.success(f"✅ {saved} expenses saved.")
     st.rerun()
-
-
-
-
@@ -0,0 +1,63 @@
+# pages/audit_log.py
+import streamlit as st
+import pandas as pd
+from helpers.audit_history import COMPACT_AFTER_DAYS, MIN_RETENTION_DAYS, compact_audit_log, get_audit_history
+from helpers.db_utils import get_all_grants
+from helpers.date_helpers import generate_month_range, month_label
+
+st.set_page_config(page_title="🧾 Audit Trail", layout="wide")
+st.title("🧾 Audit Trail")
+
+st.markdown("Every change to actual expenses, planned amounts and line item budgets: old and new values, who made it, when and from which page. Older changes are compacted into one row per record showing the value before the first edit and after the last.")
+
+grants = get_all_grants()
+if not grants:
+    st.info("No grants found. Use the sidebar to navigate to ➕ Grants and add your first one!")
+    st.stop()
+
+# -- Filters
+grant_options = {f"{g[1]} ({g[2]})": g for g in grants}
+selected_grant = grant_options[st.selectbox("Select a Grant", list(grant_options.keys()))]
+months = generate_month_range(selected_grant[3], selected_grant[4])  # [3] = start_date, [4] = end_date
+col1, col2 = st.columns(2)
+month = col1.selectbox("Month", [None] + months, format_func=lambda m: "All months" if m is None else month_label(m))
+table = col2.selectbox(
+    "Changes To", [None, "actual_expenses", "anticipated_expenses", "grant_line_items"],
+    format_func=lambda t: {None: "Everything", "actual_expenses": "Actual Expenses",
+                           "anticipated_expenses": "Planned Amounts", "grant_line_items": "Line Items"}[t],
+)
+
+
+def _value(v):
+    # Old/New mix amounts and text; show both as text
+    if v is None:
+        return ""
+    return f"{v:,.2f}" if isinstance(v, (int, float)) else str(v)
+
+
+history = get_audit_history(selected_grant[0], month, table)
+if history.empty:
+    st.info("No recorded changes for this selection.")
+else:
+    # One display row per changed column
+    rows = [
+        (entry.changed_at, entry.changed_by or "(compacted)", entry.page, entry.table_name, entry.row_key,
+         entry.month, field, _value(old), _value(new), entry.edits)
+        for entry in history.itertuples(index=False)
+        for field, (old, new) in entry.changes.items()
+    ]
+    st.dataframe(
+        pd.DataFrame(rows, columns=["When", "Who", "Page", "Table", "Record", "Month", "Field", "Old", "New", "Edits"]),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+# -- Maintenance
+with st.expander("🗜️ Compact Old History"):
+    days = st.number_input("Keep full detail for the last N days", min_value=MIN_RETENTION_DAYS,
+                           value=max(COMPACT_AFTER_DAYS, MIN_RETENTION_DAYS), step=30)
+    confirmed = st.checkbox(f"Replace every change older than {int(days)} days with one summary row per record. "
+                            "The individual edits cannot be restored.")
+    if st.button("Compact Now", disabled=not confirmed):
+        folded = compact_audit_log(int(days))
+        st.success(f"✅ {folded} audit row(s) compacted.")
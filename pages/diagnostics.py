@@ -0,0 +1,83 @@
+# pages/diagnostics.py
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from helpers import query_log
+from helpers.db_backend import get_backend
+from helpers.query_cache import cache_stats
+
+st.set_page_config(page_title="🩺 Diagnostics", layout="wide")
+st.title("🩺 Data Layer Diagnostics")
+
+st.markdown("Statements issued through the shared database helpers, grouped by page rerun. Use this to find which query makes a page slow.")
+
+if not query_log.ENABLED:
+    st.warning("Query logging is disabled (GRANT_TRACKER_QUERY_LOG=0).")
+
+# -- Settings
+col1, col2 = st.columns([3, 1])
+threshold = col1.number_input(
+    "Slow-query threshold (ms) – slower statements capture the query plan",
+    min_value=0.0, value=float(query_log.SLOW_QUERY_MS), step=10.0,
+)
+if threshold != query_log.SLOW_QUERY_MS:
+    query_log.set_slow_query_threshold(threshold)
+if col2.button("🧹 Reset Log"):
+    query_log.reset_query_log()
+    st.rerun()
+
+# -- Pool / cache health
+backend = get_backend()
+conn_stats = backend.stats()
+c_stats = cache_stats()
+m0, m1, m2, m3, m4 = st.columns(5)
+m0.metric("Backend", backend.name)
+m1.metric("Open Connections", conn_stats["open"])
+m2.metric("Connections Opened", conn_stats["opened"])
+m3.metric("Cache Hit Rate", f"{c_stats['hit_rate']:.0%}")
+m4.metric("Cached Entries", c_stats["entries"])
+
+# -- Per-rerun counts
+st.markdown("### 🔁 Recent Page Reruns")
+runs = [r for r in query_log.recent_runs(50) if r["page"] != "pages/diagnostics.py"]
+if runs:
+    runs_df = pd.DataFrame(runs)
+    runs_df["started"] = runs_df["started"].map(lambda t: datetime.fromtimestamp(t).strftime("%H:%M:%S"))
+    st.dataframe(
+        runs_df[["run_id", "page", "started", "queries", "total_ms"]].rename(columns={
+            "run_id": "Run", "page": "Page", "started": "Started", "queries": "Queries", "total_ms": "Total (ms)",
+        }),
+        use_container_width=True,
+        hide_index=True,
+    )
+
+    run_options = {f"#{r['run_id']} – {r['page']} ({r['queries']} queries)": r["run_id"] for r in runs}
+    selected_run = st.selectbox("Inspect a rerun", list(run_options.keys()))
+    run_detail = pd.DataFrame(query_log.run_queries(run_options[selected_run]))
+    if not run_detail.empty:
+        st.dataframe(
+            run_detail[["ms", "rows", "sql"]].sort_values("ms", ascending=False),
+            use_container_width=True,
+            hide_index=True,
+        )
+else:
+    st.info("No queries recorded yet. Open another page, then come back here.")
+
+# -- Top offenders
+st.markdown("### 🐢 Top Statements")
+order_by = st.radio("Rank by", ["total_ms", "count", "max_ms"], horizontal=True,
+                    format_func=lambda k: {"total_ms": "Total time", "count": "Executions", "max_ms": "Slowest run"}[k])
+top = query_log.top_queries(25, order_by)
+if top:
+    st.dataframe(pd.DataFrame(top), use_container_width=True, hide_index=True)
+
+# -- Slow query log
+st.markdown("### 📜 Slow Query Log")
+slow = query_log.slow_queries()
+if slow:
+    for entry in slow:
+        with st.expander(f"{entry['ms']:.1f} ms · {entry['page']} · {entry['sql'][:80]}"):
+            st.code(entry["sql"], language="sql")
+            st.text(entry["plan"])
+else:
+    st.info(f"No statements slower than {query_log.SLOW_QUERY_MS:.0f} ms.")
@@ -6,10 +6,14 @@ from helpers.grant_controller import (
     handle_add_grant,
     handle_update_grant,
     handle_delete_grant,
+    clone_grant,
 )
+from helpers.forecast import STRATEGY_LABELS
+from helpers.audit_session import audited, editor_name_input
 
 st.set_page_config(page_title="Grant Management", page_icon="📑")
 st.title("📑 Grant Management")
+editor_name_input()
 
 st.markdown("Manage grants and related information below. Add new grants, edit existing ones, or delete obsolete entries.")
 
@@ -90,12 +94,48 @@ if grants:
                     st.rerun()
 
                 if col2.form_submit_button("❌ Delete Grant"):
-                    handle_delete_grant(selected_grant_id)
+                    with audited("Grants"):
+                        handle_delete_grant(selected_grant_id)
                     st.warning("⚠️ Grant deleted.")
                     st.rerun()
 else:
     st.info("No grants available yet. Please add one above.")
 
+# -------------------
+# 🔁 Renew / Clone Grant
+# -------------------
+st.markdown("### 🔁 Renew or Clone Grant")
+if grants:
+    with st.expander("Create a renewal from an existing grant"):
+        with st.form("clone_grant_form"):
+            source_label = st.selectbox("Source Grant", list(grant_dict.keys()))
+            source_row = next(row for row in grants if row[0] == grant_dict[source_label])
+            clone_name = st.text_input("New Grant Name")
+            col1, col2 = st.columns(2)
+            clone_start = col1.date_input("Start Date (blank = one year later)", value=None)
+            clone_end = col2.date_input("End Date (blank = one year later)", value=None)
+            clone_scale = st.number_input("Scale Allocations By", value=1.0, min_value=0.0, step=0.05,
+                                          help="1.05 = every line item allocation and the total award up 5%")
+            clone_strategy = st.selectbox("Plan Distribution", ["even", "front_loaded", "back_loaded"],
+                                          format_func=STRATEGY_LABELS.get)
+            clone_mappings = st.checkbox("Copy QB code mappings", value=True)
+            if st.form_submit_button("Create Renewal"):
+                try:
+                    with audited("Grants"):
+                        clone_grant(
+                            source_row[0],
+                            clone_name,
+                            start_date=clone_start,
+                            end_date=clone_end,
+                            scale=clone_scale,
+                            copy_mappings=clone_mappings,
+                            strategy=clone_strategy,
+                        )
+                    st.success(f"✅ '{clone_name.strip()}' created from '{source_row[1]}'.")
+                    st.rerun()
+                except ValueError as ve:
+                    st.error(f"⚠️ {ve}")
+
 # -------------------
 # 📋 Display All Grants
 # -------------------
@@ -1,19 +1,26 @@
 import streamlit as st
 import pandas as pd
+from helpers.editor_diff import changed_rows
+from helpers.mapping_rules import plan_mappings
+from helpers.qb_search import qb_code_count, search_qb_codes
+from helpers.audit_session import audited, editor_name_input
 from helpers.db_utils import (
     get_all_grants,
     get_line_items_by_grant,
     add_line_item,
-    update_line_item,
+    update_line_items,
     delete_line_item,
-    get_filtered_qb_codes,
+    get_parent_categories,
+    get_subcategory_labels,
     get_mappings_for_grant,
     add_qb_mapping,
+    add_qb_mappings_bulk,
     delete_qb_mapping,
 )
 
 st.set_page_config(page_title="Line Item Mapping", page_icon="🧩")
 st.title("🧩 Map QB Codes to Line Items")
+editor_name_input()
 
 
 st.markdown("""
@@ -81,7 +88,8 @@ with st.expander("➕ Add New Line Item"):
             elif li_name in existing_names:
                 st.error("⚠️ A line item with this name already exists for this grant.")
             else:
-                add_line_item(selected_grant_id, li_name, li_desc, li_alloc)
+                with audited("Line Item Mapping"):
+                    add_line_item(selected_grant_id, li_name, li_desc, li_alloc)
                 st.success(f"✅ '{li_name}' added.")
                 st.rerun()
 
@@ -102,23 +110,15 @@ with st.expander("📝 Edit Line Items"):
     )
 
     if st.button("💾 Save Changes to Line Items"):
-        updates_made = False
-        for i, row in edited_df.iterrows():
-            original = df_line_items.iloc[i]
-            if (
-                row["Description"].strip() != original["Description"]
-                or float(row["Allocated Amount"]) != original["Allocated Amount"]
-            ):
-                update_line_item(
-                    original["ID"],
-                    original["Name"],
-                    row["Description"].strip(),
-                    float(row["Allocated Amount"])
-                )
-                updates_made = True
-
-        if updates_made:
-            st.success("✅ Changes saved successfully.")
+        # Only rows whose Description or Allocated Amount changed, saved in one transaction
+        changed = changed_rows(df_editable, edited_df, ["Description", "Allocated Amount"])
+        if not changed.empty:
+            with audited("Line Item Mapping"):
+                update_line_items([
+                    (df_line_items.at[i, "ID"], df_line_items.at[i, "Name"], row["Description"], row["Allocated Amount"])
+                    for i, row in changed.iterrows()
+                ])
+            st.success(f"✅ {len(changed)} line item(s) updated.")
             st.rerun()
         else:
             st.info("ℹ️ No changes to save.")
@@ -136,7 +136,8 @@ with st.expander("❌ Delete Line Item"):
             format_func=lambda x: f"{id_to_name[x]}"
         )
         if st.button("Delete Selected Line Item"):
-            delete_line_item(selected_del_id)
+            with audited("Line Item Mapping"):
+                delete_line_item(selected_del_id)
             st.warning("🗑️ Line item deleted.")
             st.rerun()
     else:
@@ -150,16 +151,23 @@ with st.expander("❌ Delete Line Item"):
 st.divider()
 st.header("🔗 Map QuickBooks Codes to Line Items")
 
-qb_data = get_filtered_qb_codes("All", "All")
 lineitem_labels = {li[1]: li[0] for li in line_items}
 
+# Outside the form so the code list narrows as the user types
+QB_PICKER_LIMIT = 50
+qb_query = st.text_input("🔍 Search QB Codes", placeholder="Code, name, subcategory or parent category")
+qb_matches = {entry[0]: f"{entry[0]} – {entry[1]}" for entry in search_qb_codes(qb_query, limit=QB_PICKER_LIMIT)}
+if qb_query and not qb_matches:
+    st.caption("No QB codes match that search.")
+elif not qb_query and qb_code_count() > len(qb_matches):
+    st.caption(f"Showing the {len(qb_matches)} most-mapped codes. Type to search all {qb_code_count():,}.")
+
 with st.form("map_qb_code_form"):
     li_name = st.selectbox("Grant Line Item", options=list(lineitem_labels.keys()))
-    qb_choice = st.selectbox("QB Code", [f"{r['code']} – {r['name']}" for _, r in qb_data.iterrows()])
+    code = st.selectbox("QB Code", options=list(qb_matches.keys()), format_func=qb_matches.get)
     
-    if st.form_submit_button("Map Code"):
+    if st.form_submit_button("Map Code") and code:
         li_id = lineitem_labels[li_name]
-        code = qb_choice.split("–")[0].strip()
         success = add_qb_mapping(selected_grant_id, code, li_id)
 
         
@@ -170,6 +178,45 @@ with st.form("map_qb_code_form"):
             st.warning(f"Mapping already exists between '{code}' and '{li_name}'")
 
 
+# --- Bulk Mapping ---
+with st.expander("⚡ Bulk Mapping"):
+    st.caption("Map many codes at once. Codes already mapped to the chosen line item are skipped; everything is saved in one transaction.")
+    bulk_tab, category_tab, copy_tab = st.tabs(["Selected Codes", "By Category", "Copy From Grant"])
+    rules = []
+
+    with bulk_tab:
+        bulk_codes = st.multiselect("QB Codes (narrow with the search above)", options=list(qb_matches.keys()),
+                                    format_func=qb_matches.get)
+        bulk_li = st.selectbox("Line Item", options=list(lineitem_labels.keys()), key="bulk_codes_li")
+        if st.button("Map Selected Codes") and bulk_codes and bulk_li:
+            rules = [("codes", bulk_codes, lineitem_labels[bulk_li])]
+
+    with category_tab:
+        level = st.radio("Rule", ["Subcategory", "Parent Category"], horizontal=True)
+        categories = get_subcategory_labels() if level == "Subcategory" else get_parent_categories()
+        category_options = {c[0]: c[1] for c in categories}  # by id: subcategory names repeat across parents
+        category = st.selectbox(level, options=list(category_options.keys()), format_func=category_options.get)
+        category_li = st.selectbox("Line Item", options=list(lineitem_labels.keys()), key="bulk_category_li")
+        if st.button("Map Every Code in Category") and category and category_li:
+            kind = "subcategory" if level == "Subcategory" else "parent_category"
+            rules = [(kind, category, lineitem_labels[category_li])]
+
+    with copy_tab:
+        st.caption("Copies another grant's mappings onto line items here with the same name.")
+        source_options = {f"{g[1]} ({g[2]})": g[0] for g in grants if g[0] != selected_grant_id}
+        source = st.selectbox("Copy From", options=list(source_options.keys()))
+        if st.button("Copy Mappings") and source:
+            rules = [("copy_grant", source_options[source], None)]
+
+    if rules:
+        # Write exactly the previewed pairs rather than expanding the rules again
+        plan = plan_mappings(selected_grant_id, rules)
+        added = add_qb_mappings_bulk(selected_grant_id, plan["new"])
+        st.success(f"✅ {added} mapping(s) added, {plan['already_mapped']} already mapped.")
+        if plan["ambiguous"]:
+            st.warning("These codes are now mapped to more than one line item: " + ", ".join(plan["ambiguous"]))
+
+
 # ----------------------------------
 # 4. View/Delete Existing Mappings
 # ----------------------------------
@@ -177,12 +224,13 @@ st.header("📎 Existing QB Mappings")
 mappings = get_mappings_for_grant(selected_grant_id)
 
 if mappings:
-    df_map = pd.DataFrame(mappings, columns=["ID", "QB Code", "QB Name", "Line Item"])
+    df_map = pd.DataFrame(mappings, columns=["ID", "QB Code", "QB Name", "Line Item", "Line Item ID"])
     grouped = df_map.groupby("Line Item")
 
+    mapped_ids = set(df_map["Line Item ID"])
     mapped_items = df_map["Line Item"].unique().tolist()
     total_items = len(line_items)
-    unmapped_items = [li[1] for li in line_items if li[1] not in mapped_items]
+    unmapped_items = [li[1] for li in line_items if li[0] not in mapped_ids]
 
     # Summary
     if total_items == 0:
@@ -323,7 +371,7 @@ else:
 
 # mappings = get_mappings_for_grant(selected_grant_id)
 # if mappings:
-#     df_map = pd.DataFrame(mappings, columns=["ID", "QB Code", "QB Name", "Line Item"])
+#     df_map = pd.DataFrame(mappings, columns=["ID", "QB Code", "QB Name", "Line Item", "Line Item ID"])
 
 #     # 🧮 Mapping Tracker
 #     mapped_ids = df_map["Line Item"].unique().tolist()
@@ -1,256 +1,156 @@
-# import streamlit as st
-# import pandas as pd
-# from helpers.db_utils import (
-#     get_all_grants,
-#     get_line_items_by_grant,
-#     get_anticipated_expenses_for_grant,
-#     update_anticipated_expense,
-#     initialize_anticipated_expenses,
-#     delete_anticipated_expenses_for_grant
-# )
-# from helpers.date_helpers import generate_month_range
-# from datetime import datetime
-
-# st.set_page_config(page_title="Monthly Planning", page_icon="📆")
-# st.title("📆 Monthly Expense Planning")
-
-# st.markdown("""
-# This page allows you to plan **anticipated monthly expenses** for each line item in a grant.
-# You can review allocations, edit expected monthly amounts, and ensure your budget is distributed across the grant period.
-# """)
-
-# # ----------------------------------
-# # 🎯 Select a Grant
-# # ----------------------------------
-# grants = get_all_grants()
-
-# if not grants:
-#     st.warning("⚠️ No grants found. Please add a grant first.")
-#     st.stop()
-
-# grant_options = {f"{g[1]} ({g[2]})": g[0] for g in grants}
-# selected_label = st.selectbox("📅 Select a Grant", list(grant_options.keys()))
-# selected_grant_id = grant_options.get(selected_label)
-
-# if selected_grant_id is None:
-#     st.warning("⚠️ Please select a valid grant.")
-#     st.stop()
-
-# selected_grant = next(g for g in grants if g[0] == selected_grant_id)
-
-# # ----------------------------------
-# # 🧹 Optional Dev Cleanup Button
-# # ----------------------------------
-# if st.button("🧹 Reset Anticipated Expenses (Dev Only)"):
-#     delete_anticipated_expenses_for_grant(selected_grant_id)
-#     st.success("Anticipated expenses deleted for this grant.")
-#     st.rerun()
-
-
-# # ----------------------------------
-# # 🧾 Line Items & Initialization
-# # ----------------------------------
-# line_items = get_line_items_by_grant(selected_grant_id)
-# # Check if anticipated expenses already exist
-# anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
-
-# # Only initialize if there are no anticipated expenses yet
-# if not anticipated_raw:
-#     for li in line_items:
-#         li_id = li[0]
-#         allocated_amount = li[3] or 0.0
-#         initialize_anticipated_expenses(
-#             grant_id=selected_grant_id,
-#             line_item_id=li_id,
-#             start_date=selected_grant[3],
-#             end_date=selected_grant[4],
-#             allocated_amount=allocated_amount
-#         )
-#     # Refresh after initializing
-#     anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
-
-# # Still stop and warn if for any reason nothing was inserted
-# if not anticipated_raw:
-#     st.warning("⚠️ No anticipated expenses found. Please initialize them first.")
-#     st.stop()
-
-# # ----------------------------------
-# # 📊 Create Editable Forecast Table
-# # ----------------------------------
-# # Get anticipated expense data
-# anticipated_df = pd.DataFrame(anticipated_raw, columns=["Month", "Expected Amount", "Line Item ID"])
-
-# # Line item lookups
-# li_map = {li[0]: li[1] for li in line_items}        # ID → Line Item Name
-# alloc_map = {li[0]: li[3] for li in line_items}     # ID → Allocated Amount
-
-# # Add metadata columns
-# anticipated_df["Line Item"] = anticipated_df["Line Item ID"].map(li_map)
-# anticipated_df["Allocated Amount"] = anticipated_df["Line Item ID"].map(alloc_map)
-
-
-# # Month formatting: Keep raw month key, but show formatted label
-# months = generate_month_range(selected_grant[3], selected_grant[4])
-# month_label_map = {m: datetime.strptime(m, "%Y-%m").strftime("%b %Y") for m in months}
-
-# # Pivot + rename columns for display
-# pivot_months = anticipated_df.pivot_table(index="Line Item", columns="Month", values="Expected Amount", fill_value=0.0) # Pivot monthly values
-# pivot_months = pivot_months[[m for m in months if m in pivot_months.columns]] # Sort month columns in correct order
-# pivot_months.columns = [month_label_map[m] for m in pivot_months.columns] # Rename columns to "Dec 2024", etc.
-
-
-# # Allocated Amount per line item
-# alloc_df = anticipated_df[["Line Item", "Allocated Amount"]].drop_duplicates().set_index("Line Item")
-
-# # Join allocated amount to the pivoted months
-# pivot_df = alloc_df.join(pivot_months)
-
-# # Optional: Reset index if needed (not mandatory for display)
-# # pivot_df.reset_index(inplace=True)
-
-# pivot_df["Total Planned"] = pivot_df.sum(axis=1)
-# pivot_df["Remaining"] = pivot_df["Allocated Amount"] - pivot_df["Total Planned"]
-
-
-
-# # Display with read-only index
-# # st.data_editor(
-# #     pivot_df,
-# #     use_container_width=True,
-# #     key="forecast_editor",
-# #     column_config={
-# #         "Line Item": st.column_config.Column(disabled=True),
-# #         "Allocated Amount": st.column_config.NumberColumn(disabled=True)
-# #     },
-# #     num_rows="fixed"
-# # )
-# st.data_editor(
-#     pivot_df,
-#     use_container_width=True,
-#     key="forecast_editor",
-#     column_config={
-#         "Line Item": st.column_config.Column(disabled=True),
-#         "Allocated Amount": st.column_config.NumberColumn(disabled=True, format="dollar"),
-#         "Total Planned" : st.column_config.NumberColumn(format="dollar", disabled=True),
-#         "Remaining": st.column_config.NumberColumn(disabled=True, format="dollar")
-
-#     },
-#     num_rows="fixed"
-# )
-
-# # Can use format = 'accounting' or 'dollar' in NumberColumn
-
-# # ----------------------------------
-# # 💾 Save Changes
-# # ----------------------------------
-# if st.button("💾 Save Forecast Changes"):
-#     # Reverse map to raw month keys
-#     label_to_month = {v: k for k, v in month_label_map.items()}
-#     updated_df = st.session_state.forecast_editor
-#     updates_made = 0
-
-#     for line_item_name, row in updated_df.iterrows():
-#         line_item_id = next((li[0] for li in line_items if li[1] == line_item_name), None)
-#         for formatted_month, val in row.items():
-#             raw_month = label_to_month[formatted_month]
-#             update_anticipated_expense(selected_grant_id, line_item_id, raw_month, float(val))
-#             updates_made += 1
-
-#     st.success(f"✅ {updates_made} monthly values updated.")
-
-
-### NEWER
-
-
-
-
-
-
-###############
-# import streamlit as st
-# import pandas as pd
-# from helpers.db_utils import (
-#     get_all_grants,
-#     get_line_items_by_grant,
-#     get_anticipated_expenses_for_grant,
-#     update_anticipated_expense,
-#     initialize_anticipated_expenses
-# )
-# from helpers.date_helpers import generate_month_range
-
-# st.set_page_config(page_title="Monthly Planning", page_icon="📆")
-# st.title("📆 Monthly Expense Planning")
-
-# st.markdown("""
-# This page allows you to plan **anticipated monthly expenses** for each line item in a grant.
-# You can review allocations, edit expected monthly amounts, and ensure your budget is distributed across the grant period.
-# """)
-
-# # ----------------------------------
-# # 🎯 Select a Grant
-# # ----------------------------------
-# grants = get_all_grants()
-
-# if not grants:
-#     st.warning("⚠️ No grants found. Please add a grant first.")
-#     st.stop()
-
-# grant_options = {f"{g[1]} ({g[2]})": g[0] for g in grants}
-# selected_label = st.selectbox("📅 Select a Grant", list(grant_options.keys()))
-# selected_grant_id = grant_options.get(selected_label)
-
-# # Optional: Protect against empty selection even if grants exist
-# if selected_grant_id is None:
-#     st.warning("⚠️ Please select a valid grant.")
-#     st.stop()
-
-# # Safe to continue
-# selected_grant = next(g for g in grants if g[0] == selected_grant_id)
-
-
-# # Get line items for the selected grant
-# line_items = get_line_items_by_grant(selected_grant_id)
-
-# # Initialize anticipated expenses for each line item
-# for li in line_items:
-#     li_id = li[0]
-#     initialize_anticipated_expenses(
-#         grant_id=selected_grant_id,
-#         line_item_id=li_id,
-#         start_date=selected_grant[3],  # start_date from grant
-#         end_date=selected_grant[4]     # end_date from grant
-#     )
-
-
-# # ----------------------------------
-# # 📋 Load Anticipated Expenses
-# # ----------------------------------
-# line_items = get_line_items_by_grant(selected_grant_id)
-# anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
-
-# if not anticipated_raw:
-#     st.warning("⚠️ No anticipated expenses found. Please initialize them first.")
-#     st.stop()
-
-# # Create DataFrame
-# anticipated_df = pd.DataFrame(anticipated_raw, columns=["Month", "Expected Amount", "Line Item ID"])
-# li_map = {li[0]: li[1] for li in line_items}  # ID to Name
-# anticipated_df["Line Item"] = anticipated_df["Line Item ID"].map(li_map)
-
-# # Pivot for display
-# months = generate_month_range(selected_grant[3], selected_grant[4])
-
-# pivot_df = anticipated_df.pivot_table(index="Line Item", columns="Month", values="Expected Amount", fill_value=0.0)
-# pivot_df = pivot_df[[m for m in months if m in pivot_df.columns]]  # Ensure proper order
-
-# st.data_editor(pivot_df, use_container_width=True, key="forecast_editor")
-
-# if st.button("💾 Save Forecast Changes"):
-#     updated_df = st.session_state.forecast_editor
-#     updates_made = 0
-#     for line_item_name, row in updated_df.iterrows():
-#         line_item_id = next((li[0] for li in line_items if li[1] == line_item_name), None)
-#         for month, val in row.items():
-#             update_anticipated_expense(selected_grant_id, line_item_id, month, float(val))
-#             updates_made += 1
-#     st.success(f"✅ {updates_made} monthly values updated.")
+# pages/monthly_planning.py
+import streamlit as st
+import pandas as pd
+from datetime import date
+from helpers.db_utils import (
+    get_all_grants,
+    get_line_items_by_grant,
+    get_anticipated_expenses_for_grant,
+    update_anticipated_expenses_bulk,
+    initialize_anticipated_expenses_for_grant,
+    delete_anticipated_expenses_for_grant
+)
+from helpers.date_helpers import generate_month_range, month_label, month_label_map
+from helpers.editor_diff import changed_cells
+from helpers.forecast import STRATEGY_LABELS, apply_forecast
+from helpers.audit_session import audited, editor_name_input
+
+st.set_page_config(page_title="Monthly Planning", page_icon="📆", layout="wide")
+st.title("📆 Monthly Expense Planning")
+editor_name_input()
+
+st.markdown("""
+This page allows you to plan **anticipated monthly expenses** for each line item in a grant.
+You can review allocations, edit expected monthly amounts, and ensure your budget is distributed across the grant period.
+""")
+
+# ----------------------------------
+# 🎯 Select a Grant
+# ----------------------------------
+grants = get_all_grants()
+
+if not grants:
+    st.warning("⚠️ No grants found. Please add a grant first.")
+    st.stop()
+
+grant_options = {f"{g[1]} ({g[2]})": g for g in grants}
+selected_label = st.selectbox("📅 Select a Grant", list(grant_options.keys()))
+selected_grant = grant_options[selected_label]
+selected_grant_id = selected_grant[0]
+
+# ----------------------------------
+# 🧹 Optional Dev Cleanup Button
+# ----------------------------------
+if st.button("🧹 Reset Anticipated Expenses (Dev Only)"):
+    with audited("Monthly Planning"):
+        delete_anticipated_expenses_for_grant(selected_grant_id)
+    st.success("Anticipated expenses deleted for this grant.")
+    st.rerun()
+
+# ----------------------------------
+# 🧾 Line Items & Initialization
+# ----------------------------------
+line_items = get_line_items_by_grant(selected_grant_id)
+if not line_items:
+    st.warning("⚠️ This grant has no line items yet. Add them on the Line Item Mapping page.")
+    st.stop()
+
+months = generate_month_range(selected_grant[3], selected_grant[4])  # [3] = start_date, [4] = end_date
+if not months:
+    st.warning("This grant has no valid month range.")
+    st.stop()
+
+# Seed the whole grid in one transaction the first time a grant is planned
+anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
+if not anticipated_raw:
+    with audited("Monthly Planning"):
+        initialize_anticipated_expenses_for_grant(
+            selected_grant_id, selected_grant[3], selected_grant[4],
+            line_items=[(li[0], li[1], li[3]) for li in line_items],
+        )
+    anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
+
+editor_key = f"forecast_editor_{selected_grant_id}"
+
+# ----------------------------------
+# 🔁 Re-plan with a Distribution Strategy
+# ----------------------------------
+with st.expander("🔁 Re-plan with a Distribution Strategy"):
+    strategy = st.selectbox("Strategy", list(STRATEGY_LABELS.keys()), format_func=STRATEGY_LABELS.get)
+    options = {}
+    if strategy == "seasonal":
+        st.caption("Relative weight for each calendar month (e.g. 2 = twice a normal month).")
+        weight_cols = st.columns(6)
+        options["profile"] = [
+            weight_cols[m % 6].number_input(month_label(f"2000-{m + 1:02d}")[:3],
+                                            min_value=0.0, value=1.0, step=0.5, key=f"season_{m}")
+            for m in range(12)
+        ]
+    elif strategy == "remaining":
+        this_month = date.today().strftime("%Y-%m")
+        # Earlier months are planned at their actuals; the rest of each allocation is spread from here
+        options["as_of"] = st.selectbox(
+            "Re-plan from", months, format_func=month_label,
+            index=months.index(this_month) if this_month in months else 0,
+        )
+    st.warning("This replaces every planned amount for this grant.")
+    if st.button("Apply Strategy"):
+        with audited("Monthly Planning"):
+            written = apply_forecast(selected_grant_id, strategy, **options)
+        st.session_state.pop(editor_key, None)  # drop unsaved edits made against the old plan
+        st.success(f"✅ {written} monthly values re-planned ({STRATEGY_LABELS[strategy]}).")
+        anticipated_raw = get_anticipated_expenses_for_grant(selected_grant_id)
+
+# ----------------------------------
+# 📊 Create Editable Forecast Table
+# ----------------------------------
+labels = month_label_map(months)
+li_names = {li[0]: li[1] for li in line_items}         # ID → Line Item Name
+li_allocated = {li[0]: li[3] or 0.0 for li in line_items}  # ID → Allocated Amount
+
+# Keyed by line item ID so renamed or duplicate-looking names cannot mix rows up
+anticipated_df = pd.DataFrame(anticipated_raw, columns=["Month", "Expected Amount", "Line Item ID"])
+planned = (
+    anticipated_df.pivot(index="Line Item ID", columns="Month", values="Expected Amount")
+    .reindex(index=list(li_names.keys()), columns=months)
+    .fillna(0.0)
+)
+planned.columns = [labels[m] for m in months]
+
+grid = planned.copy()
+grid.insert(0, "Line Item", grid.index.map(li_names))
+grid.insert(1, "Allocated Amount", grid.index.map(li_allocated))
+grid["Total Planned"] = planned.sum(axis=1)
+grid["Remaining"] = grid["Allocated Amount"] - grid["Total Planned"]
+
+edited = st.data_editor(
+    grid,
+    use_container_width=True,
+    hide_index=True,
+    key=editor_key,
+    column_config={
+        "Line Item": st.column_config.Column(disabled=True),
+        "Allocated Amount": st.column_config.NumberColumn(disabled=True, format="dollar"),
+        "Total Planned": st.column_config.NumberColumn(format="dollar", disabled=True),
+        "Remaining": st.column_config.NumberColumn(disabled=True, format="dollar"),
+        **{label: st.column_config.NumberColumn(format="dollar") for label in planned.columns},
+    },
+    num_rows="fixed"
+)
+
+# ----------------------------------
+# 💾 Save Changes
+# ----------------------------------
+if st.button("💾 Save Forecast Changes"):
+    # Only cells that differ from what was loaded are written, in one transaction
+    label_to_month = {v: k for k, v in labels.items()}
+    changes = changed_cells(planned, edited[planned.columns].fillna(0.0))
+    if changes.empty:
+        st.info("No changes to save.")
+    else:
+        with audited("Monthly Planning"):
+            update_anticipated_expenses_bulk(selected_grant_id, [
+                (line_item_id, label_to_month[label], new)
+                for line_item_id, label, new in changes[["key", "column", "new"]].itertuples(index=False)
+            ])
+        st.success(f"✅ {len(changes)} monthly value(s) updated.")
@@ -0,0 +1,100 @@
+# pages/portfolio_summary.py
+import streamlit as st
+from helpers.summary import get_portfolio_summary
+from helpers.projections import get_active_projections
+
+st.set_page_config(page_title="📊 Portfolio Summary", layout="wide")
+st.title("📊 Grant Portfolio Summary")
+
+st.markdown("Award, allocation and spending for every grant at a glance. Use the filters to narrow by funder or status.")
+
+# -- Filters
+portfolio = get_portfolio_summary()
+if portfolio.empty:
+    st.info("No grants found. Use the sidebar to navigate to ➕ Grants and add your first one!")
+    st.stop()
+
+col1, col2 = st.columns(2)
+selected_funders = col1.multiselect("Funder", sorted(portfolio["funder"].dropna().unique()))
+selected_statuses = col2.multiselect("Status", sorted(portfolio["status"].dropna().unique()))
+
+df = get_portfolio_summary(selected_funders, selected_statuses)
+
+# -- Totals
+m1, m2, m3, m4 = st.columns(4)
+m1.metric("Total Award", f"${df['award'].sum():,.2f}")
+m2.metric("Allocated", f"${df['allocated'].sum():,.2f}")
+m3.metric("Spent", f"${df['spent'].sum():,.2f}")
+m4.metric("Remaining", f"${df['remaining'].sum():,.2f}")
+
+over = df[df["over_allocated"]]
+if not over.empty:
+    st.warning(f"⚠️ {len(over)} grant(s) have allocations exceeding the total award: " + ", ".join(over["grant"]))
+
+# -- Table
+st.markdown("### 📋 Grants")
+st.dataframe(
+    df.drop(columns=["grant_id"]).rename(columns={
+        "grant": "Grant",
+        "funder": "Funder",
+        "status": "Status",
+        "start_date": "Start",
+        "end_date": "End",
+        "award": "Total Award",
+        "line_items": "Line Items",
+        "allocated": "Allocated",
+        "spent": "Spent",
+        "remaining": "Remaining",
+        "unallocated": "Unallocated",
+        "pct_spent": "% Spent",
+        "over_allocated": "Over-Allocated",
+    }),
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Total Award": st.column_config.NumberColumn(format="dollar"),
+        "Allocated": st.column_config.NumberColumn(format="dollar"),
+        "Spent": st.column_config.NumberColumn(format="dollar"),
+        "Remaining": st.column_config.NumberColumn(format="dollar"),
+        "Unallocated": st.column_config.NumberColumn(format="dollar"),
+        "% Spent": st.column_config.NumberColumn(format="%.1f%%"),
+    },
+)
+
+# -- Chart
+st.markdown("### 📈 Award vs Spent")
+st.bar_chart(df.set_index("grant")[["award", "allocated", "spent"]])
+
+# -- Projected Overspend (active grants)
+st.markdown("### 🔥 Projected Overspend")
+projections = get_active_projections()
+projections = projections[projections["grant_id"].isin(df["grant_id"]) & (projections["projected_overspend"] > 0)]
+if projections.empty:
+    st.success("✅ No line items on active grants are projected to overspend at their current burn rate.")
+else:
+    grant_names = dict(zip(df["grant_id"], df["grant"]))
+    st.dataframe(
+        projections.assign(grant=projections["grant_id"].map(grant_names))
+        .sort_values("projected_overspend", ascending=False)[
+            ["grant", "line_item", "allocated", "spent_to_date", "burn_rate", "projected_end_spend",
+             "projected_overspend", "exhaustion_month"]
+        ].rename(columns={
+            "grant": "Grant",
+            "line_item": "Line Item",
+            "allocated": "Allocated",
+            "spent_to_date": "Spent to Date",
+            "burn_rate": "Avg Burn / Month",
+            "projected_end_spend": "Projected End Spend",
+            "projected_overspend": "Projected Over",
+            "exhaustion_month": "Runs Out",
+        }),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Allocated": st.column_config.NumberColumn(format="dollar"),
+            "Spent to Date": st.column_config.NumberColumn(format="dollar"),
+            "Avg Burn / Month": st.column_config.NumberColumn(format="dollar"),
+            "Projected End Spend": st.column_config.NumberColumn(format="dollar"),
+            "Projected Over": st.column_config.NumberColumn(format="dollar"),
+        },
+    )
@@ -16,6 +16,7 @@ from helpers.db_utils import (
     delete_qb_code,
     get_filtered_qb_codes,
 )
+from helpers.qb_import import read_chart, diff_chart, apply_chart
 st.set_page_config(page_title="QuickBook Codes", page_icon="💼")
 st.title("💼 Quickbook Mapping Tool")
 st.write(
@@ -135,6 +136,46 @@ if selected_sub != "No Subcategories Yet":
             st.warning(f"Code '{selected_code}' deleted.")
             st.rerun()
 
+# -------------------
+# BULK IMPORT
+# -------------------
+st.markdown("### 📥 Import Chart of Accounts")
+with st.expander("Upload a full chart of accounts (CSV or QuickBooks IIF)"):
+    st.caption("CSV columns: Code, Name, Subcategory, Parent Category. IIF files use ACCNUM for the code and 'Parent:Subcategory:Account' names.")
+    chart_file = st.file_uploader("Chart of accounts", type=["csv", "iif"], key="chart_upload")
+
+    if chart_file is not None:
+        try:
+            chart_entries = read_chart(chart_file, chart_file.name)
+        except ValueError as ve:
+            st.error(f"⚠️ {ve}")
+            chart_entries = []
+
+        if chart_entries:
+            diff = diff_chart(chart_entries)
+            st.info(
+                f"{len(chart_entries)} accounts in file: {len(diff['new'])} new, {len(diff['renamed'])} renamed, "
+                f"{len(diff['moved'])} moved, {len(diff['removed'])} not in file, {diff['unchanged']} unchanged."
+            )
+            for key, columns in [
+                ("new", ["Code", "Name", "Subcategory", "Parent Category"]),
+                ("renamed", ["Code", "Current Name", "New Name"]),
+                ("moved", ["Code", "Current Category", "New Category"]),
+                ("removed", ["Code", "Name"]),
+            ]:
+                if diff[key]:
+                    st.markdown(f"**{key.title()}**")
+                    st.dataframe(pd.DataFrame(diff[key], columns=columns), use_container_width=True)
+
+            remove_missing = st.checkbox("Delete codes that are not in the file (codes still mapped or used are kept)")
+            if st.button("Apply Chart of Accounts"):
+                result = apply_chart(chart_entries, remove_missing=remove_missing)
+                st.success(
+                    f"✅ {result['accounts']} accounts saved; {result['parent_categories_created']} parent categories and "
+                    f"{result['subcategories_created']} subcategories created; {result['accounts_removed']} removed."
+                )
+                st.rerun()
+
 # -------------------
 # FILTERS & DISPLAY
 # -------------------
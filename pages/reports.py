@@ -0,0 +1,92 @@
+# pages/reports.py
+import io
+import os
+import tempfile
+import zipfile
+from datetime import date
+
+import streamlit as st
+from helpers.db_utils import get_all_grants, get_all_funders
+from helpers.date_helpers import generate_month_range, month_label
+from helpers.reports import (
+    FORMATS,
+    export_active_grant_reports,
+    export_funder_report,
+    export_grant_report,
+)
+
+st.set_page_config(page_title="📤 Reports", layout="wide")
+st.title("📤 Monthly Expense Reports")
+
+st.markdown("Funder-ready monthly reports: each line item with its allocation, planned vs actual for the month and to date, followed by the QuickBooks codes behind the actuals.")
+
+grants = get_all_grants()
+if not grants:
+    st.info("No grants found. Use the sidebar to navigate to ➕ Grants and add your first one!")
+    st.stop()
+
+# -- Report month & format
+all_months = sorted({m for g in grants if g[3] and g[4] for m in generate_month_range(g[3], g[4])})
+if not all_months:
+    st.warning("No grant has a valid month range.")
+    st.stop()
+this_month = date.today().strftime("%Y-%m")
+col1, col2 = st.columns(2)
+month = col1.selectbox(
+    "📅 Report Month", all_months, format_func=month_label,
+    index=all_months.index(this_month) if this_month in all_months else len(all_months) - 1,
+)
+fmt = col2.radio("Format", FORMATS, horizontal=True, format_func=str.upper)
+mime = "text/csv" if fmt == "csv" else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _offer_download(path, label):
+    with open(path, "rb") as f:
+        st.download_button(label, f.read(), file_name=os.path.basename(path), mime=mime)
+
+
+# -- Single grant / funder
+tab_grant, tab_funder, tab_batch = st.tabs(["Per Grant", "Per Funder", "All Active Grants"])
+
+with tab_grant:
+    grant_options = {f"{g[1]} ({g[2]})": g[0] for g in grants}
+    selected_grant = st.selectbox("Grant", list(grant_options.keys()))
+    if st.button("Build Grant Report"):
+        try:
+            with tempfile.TemporaryDirectory() as out_dir:
+                _offer_download(export_grant_report(grant_options[selected_grant], month, out_dir, fmt), "⬇️ Download")
+        except RuntimeError as e:
+            st.error(str(e))
+
+with tab_funder:
+    funders = get_all_funders()
+    if funders:
+        funder_options = {f[1]: f[0] for f in funders}
+        selected_funder = st.selectbox("Funder", list(funder_options.keys()))
+        if st.button("Build Funder Report"):
+            try:
+                with tempfile.TemporaryDirectory() as out_dir:
+                    _offer_download(export_funder_report(funder_options[selected_funder], month, out_dir, fmt), "⬇️ Download")
+            except RuntimeError as e:
+                st.error(str(e))
+    else:
+        st.info("No funders found.")
+
+with tab_batch:
+    st.caption("One report per active grant, built in parallel worker processes and bundled into a zip.")
+    if st.button("Build All Reports"):
+        try:
+            with st.spinner("Building reports..."), tempfile.TemporaryDirectory() as out_dir:
+                paths = export_active_grant_reports(month, out_dir, fmt)
+                buffer = io.BytesIO()
+                with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as bundle:
+                    for path in paths:
+                        bundle.write(path, os.path.basename(path))
+            if paths:
+                st.success(f"✅ {len(paths)} report(s) built.")
+                st.download_button("⬇️ Download zip", buffer.getvalue(), file_name=f"grant_reports_{month}.zip",
+                                   mime="application/zip")
+            else:
+                st.info("No active grants to report on.")
+        except RuntimeError as e:
+            st.error(str(e))
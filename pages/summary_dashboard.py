@@ -1,8 +1,10 @@
 import streamlit as st
 import pandas as pd
 from helpers.db_utils import (
-    get_all_grants, get_grant_by_id, get_grant_summary_data, is_allocation_exceeding_total
+    get_all_grants, get_grant_by_id, is_allocation_exceeding_total
 )
+from helpers.summary import get_grant_summary_data
+from helpers.projections import get_grant_projection, get_spend_curve
 
 st.set_page_config(page_title="📋 Grant Summary", layout="wide")
 
@@ -38,8 +40,57 @@ if selected:
     # -- Summary Table
     st.markdown("### 📊 Line Item Spending Summary")
     df_summary = get_grant_summary_data(grant_id)
-    st.dataframe(df_summary, use_container_width=True)
+    st.dataframe(
+        df_summary,
+        use_container_width=True,
+        column_config={
+            "Allocated": st.column_config.NumberColumn(format="dollar"),
+            "Spent": st.column_config.NumberColumn(format="dollar"),
+            "% Spent": st.column_config.NumberColumn(format="%.1f%%"),
+            "Remaining": st.column_config.NumberColumn(format="dollar"),
+        },
+    )
 
     # -- Optional Chart
     st.markdown("### 📈 Allocation vs Actuals")
     st.bar_chart(df_summary.set_index("Line Item")[["Allocated", "Spent"]])
+
+    # -- Burn Rate & Projections
+    st.markdown("### 🔥 Burn Rate & Projections")
+    st.caption("Actuals through the last closed month; later months are projected at each line item's average monthly burn.")
+    df_projection = get_grant_projection(grant_id)
+    if df_projection.empty:
+        st.info("No line items to project.")
+    else:
+        overspent = df_projection[df_projection["projected_overspend"] > 0]
+        if not overspent.empty:
+            st.warning("⚠️ Projected to overspend: " + ", ".join(overspent["line_item"]))
+        st.dataframe(
+            df_projection.drop(columns=["grant_id", "line_item_id"]).rename(columns={
+                "line_item": "Line Item",
+                "allocated": "Allocated",
+                "spent_to_date": "Spent to Date",
+                "months_elapsed": "Months Elapsed",
+                "months_remaining": "Months Left",
+                "burn_rate": "Avg Burn / Month",
+                "recent_burn_rate": "Recent Burn / Month",
+                "projected_end_spend": "Projected End Spend",
+                "planned_end_spend": "Planned End Spend",
+                "projected_overspend": "Projected Over (Under)",
+                "exhaustion_month": "Runs Out",
+            }),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "Allocated": st.column_config.NumberColumn(format="dollar"),
+                "Spent to Date": st.column_config.NumberColumn(format="dollar"),
+                "Avg Burn / Month": st.column_config.NumberColumn(format="dollar"),
+                "Recent Burn / Month": st.column_config.NumberColumn(format="dollar"),
+                "Projected End Spend": st.column_config.NumberColumn(format="dollar"),
+                "Planned End Spend": st.column_config.NumberColumn(format="dollar"),
+                "Projected Over (Under)": st.column_config.NumberColumn(format="dollar"),
+            },
+        )
+
+        curve = get_spend_curve(grant_id)
+        st.line_chart(curve.pivot(index="month", columns="line_item", values="projected_cumulative"))
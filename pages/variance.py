@@ -0,0 +1,56 @@
+# pages/variance.py
+import streamlit as st
+from helpers.db_utils import get_all_grants
+from helpers.date_helpers import generate_month_range, month_label_map
+from helpers.summary import VARIANCE_METRICS, get_variance_matrix
+
+st.set_page_config(page_title="📉 Budget vs Actual", layout="wide")
+st.title("📉 Budget vs Actual by Month")
+
+st.markdown("Planned (anticipated) against actual spending for every line item and month. Variance is planned minus actual, so positive numbers mean under plan.")
+
+# -- Grant & window
+grants = get_all_grants()
+if not grants:
+    st.info("No grants found. Use the sidebar to navigate to ➕ Grants and add your first one!")
+    st.stop()
+
+grant_options = {f"{g[1]} ({g[2]})": g for g in grants}
+selected_grant = grant_options[st.selectbox("Select a Grant", list(grant_options.keys()))]
+months = generate_month_range(selected_grant[3], selected_grant[4])  # [3] = start_date, [4] = end_date
+if not months:
+    st.warning("This grant has no valid month range.")
+    st.stop()
+
+labels = month_label_map(months)
+window = st.select_slider(
+    "Months", options=months, value=(months[0], months[-1]), format_func=labels.get,
+) if len(months) > 1 else (months[0], months[0])
+metric = st.radio(
+    "Show", VARIANCE_METRICS, horizontal=True,
+    format_func=lambda m: {"planned": "Planned", "actual": "Actual", "variance": "Variance",
+                           "cumulative_variance": "Cumulative Variance"}[m],
+)
+
+matrix = get_variance_matrix(selected_grant[0], window[0], window[1])
+if matrix.empty:
+    st.info("This grant has no line items yet.")
+    st.stop()
+
+# -- Matrix
+table = matrix[metric].droplevel("line_item_id")
+table.columns = [labels[m] for m in table.columns]
+table.index.name = "Line Item"
+table["Total" if metric != "cumulative_variance" else "To Date"] = (
+    table.sum(axis=1) if metric != "cumulative_variance" else table.iloc[:, -1]
+)
+st.dataframe(
+    table,
+    use_container_width=True,
+    column_config={col: st.column_config.NumberColumn(format="dollar") for col in table.columns},
+)
+
+# -- Totals by month
+st.markdown("### 📈 Planned vs Actual (all line items)")
+totals = matrix[["planned", "actual"]].sum().unstack(level=0)  # YYYY-MM index keeps months in order
+st.line_chart(totals)
@@ -2,9 +2,11 @@
 import streamlit as st
 import pandas as pd
 from helpers.db_utils import get_all_grants
+from helpers.audit_session import editor_name_input
 
 st.set_page_config(page_title="Grant Tracker Home", page_icon="🏠")
 st.title("🏠 Welcome to the Grant Tracker")
+editor_name_input()
 
 # --- Intro Section ---
 st.markdown("""
@@ -24,6 +26,10 @@ st.markdown("- **Funders** – (Coming soon) Manage organizations funding your g
 st.markdown("- **QuickBooks Codes** – Set up internal QB account codes")
 st.markdown("- **Line Item Mapping** – Link QB codes to your grant’s line items")
 st.markdown("- Monthly Planning")
+st.markdown("- **Portfolio Summary** – Award, allocation and spending across all grants")
+st.markdown("- **Budget vs Actual** – Planned against actual spending by line item and month")
+st.markdown("- **Reports** – Monthly expense reports per grant or funder (CSV / Excel)")
+st.markdown("- **Audit Trail** – History of every change to expenses, plans and line item budgets")
 st.markdown("- 🌎 [First Steps Kent](https://www.firststepskent.org/) – Program information")
 
 # --- Grant Overview Table ---
@@ -48,3 +54,8 @@ st.page_link('pages/lineitem_maps.py', label="Line Item Mapping", icon="🧩")
 st.page_link('pages/monthly_planning.py', label='Month Planning')
 st.page_link('pages/actual_expenses.py', label="💵 Actual Expenses")
 st.page_link('pages/summary_dashboard.py', label="Summary Dashboard")
+st.page_link('pages/portfolio_summary.py', label="Portfolio Summary", icon="📊")
+st.page_link('pages/variance.py', label="Budget vs Actual", icon="📉")
+st.page_link('pages/reports.py', label="Reports", icon="📤")
+st.page_link('pages/audit_log.py', label="Audit Trail", icon="🧾")
+st.page_link('pages/diagnostics.py', label="Diagnostics", icon="🩺")
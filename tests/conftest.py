@@ -0,0 +1,95 @@
+# tests/conftest.py
+# Fixtures for the helpers tests. Each test gets an empty database built from
+# the repo schema: a scratch SQLite file by default, or the PostgreSQL server
+# at GRANT_TRACKER_TEST_DATABASE_URL when it is set and psycopg2 is installed
+# (its tables are truncated between tests, so point it at a throwaway database).
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+
+from helpers import db_backend, db_connection, projections  # noqa: E402
+from helpers.query_cache import clear_cache  # noqa: E402
+
+TEST_DATABASE_URL = os.environ.get("GRANT_TRACKER_TEST_DATABASE_URL", "")
+
+_TABLES = ("audit_compaction", "audit_snapshots", "audit_log", "rollup_versions", "monthly_rollup", "anticipated_expenses", "actual_expenses",
+           "qb_to_grant_mapping", "grant_line_items", "grants", "funders", "qb_accounts",
+           "qb_categories", "qb_parent_categories")
+
+
+def _schema(name):
+    with open(os.path.join(ROOT, "db", name)) as f:
+        return f.read()
+
+
+def _sqlite_backend(tmp_path, monkeypatch):
+    path = str(tmp_path / "grant_tracker.db")
+    with sqlite3.connect(path) as conn:
+        conn.executescript(_schema("schema.sql"))
+    monkeypatch.setattr(db_connection, "DB_PATH", path)
+    return db_backend.SQLiteBackend()
+
+
+def _postgres_backend():
+    backend = db_backend.create_backend("postgres", TEST_DATABASE_URL)
+    with backend.get_connection() as conn:
+        cursor = conn.raw.cursor()
+        cursor.execute(_schema("schema_postgres.sql"))
+        cursor.execute(f"TRUNCATE {', '.join(_TABLES)} RESTART IDENTITY CASCADE")
+    return backend
+
+
+def _backend_params():
+    params = ["sqlite"]
+    try:
+        import psycopg2  # noqa: F401
+        has_driver = True
+    except ImportError:
+        has_driver = False
+    params.append(pytest.param("postgres", marks=pytest.mark.skipif(
+        not (TEST_DATABASE_URL and has_driver),
+        reason="GRANT_TRACKER_TEST_DATABASE_URL and psycopg2 are needed for the PostgreSQL run",
+    )))
+    return params
+
+
+@pytest.fixture(params=_backend_params())
+def backend(request, tmp_path, monkeypatch):
+    """The active db_utils backend, over an empty database."""
+    if request.param == "sqlite":
+        active = _sqlite_backend(tmp_path, monkeypatch)
+    else:
+        active = _postgres_backend()
+    db_backend.set_backend(active)
+    clear_cache()
+    projections._grids.clear()  # keyed by grant id, so only valid for one database
+    yield active
+    db_backend.set_backend(None)  # closes it
+    clear_cache()
+    projections._grids.clear()
+
+
+@pytest.fixture
+def grant(backend):
+    """A grant with two line items (Salaries, Supplies) and a small chart of accounts: (grant_id, [line item ids])."""
+    from helpers import db_utils
+
+    db_utils.execute_query("INSERT INTO funders (name, type) VALUES (?, ?)", ("Test Funder", "Foundation"))
+    funder_id = db_utils.fetch_one("SELECT id FROM funders WHERE name = ?", ("Test Funder",))[0]
+    db_utils.add_grant("Test Grant", funder_id, "2025-01-01", "2025-06-30", 12000.0, "Active", "")
+    grant_id = db_utils.fetch_one("SELECT id FROM grants WHERE name = ?", ("Test Grant",))[0]
+    db_utils.add_line_item(grant_id, "Salaries", "", 6000.0)
+    db_utils.add_line_item(grant_id, "Supplies", "", 6000.0)
+    line_items = [row[0] for row in db_utils.fetch_all(
+        "SELECT id FROM grant_line_items WHERE grant_id = ? ORDER BY id", (grant_id,))]
+    db_utils.execute_query("INSERT INTO qb_parent_categories (name) VALUES (?)", ("Expenses",))
+    db_utils.execute_query("INSERT INTO qb_categories (name, parent_id) VALUES (?, ?)", ("Program", 1))
+    db_utils.execute_many("INSERT INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)",
+                          [("8705", "Workshops", 1), ("8706", "Materials", 1)])
+    return grant_id, line_items
@@ -0,0 +1,130 @@
+# tests/test_audit.py
+# The financial edit audit trail (helpers/audit.py, helpers/audit_history.py).
+
+import json
+
+import pytest
+
+from helpers import db_utils
+from helpers.audit import DEFAULT_USER, SESSION_USER_KEY, session_edits
+from helpers.audit_history import compact_audit_log
+
+
+def _log(grant_id, table=None):
+    query = "SELECT table_name, row_key, month, changes FROM audit_log WHERE grant_id = ?"
+    params = [grant_id]
+    if table:
+        query += " AND table_name = ?"
+        params.append(table)
+    return [(t, key, month, json.loads(changes)) for t, key, month, changes in db_utils.fetch_all(query + " ORDER BY id", params)]
+
+
+# --- Append-only guard ---
+def test_audit_log_rejects_update_and_delete(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 100)])
+    with pytest.raises(Exception, match="audit_log"):
+        db_utils.execute_query("UPDATE audit_log SET changed_by = ?", ("someone else",))
+    with pytest.raises(Exception, match="audit_log"):
+        db_utils.execute_query("DELETE FROM audit_log")
+    assert len(_log(grant_id, "anticipated_expenses")) == 1
+
+
+def test_compaction_may_delete_folded_rows(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.execute_many("""
+        INSERT INTO audit_log (changed_at, changed_by, page, table_name, row_key, grant_id, month, changes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, [
+        ("2020-01-01T09:00:00", "a", None, "anticipated_expenses", f"{grant_id}|{salaries}|2025-01", grant_id,
+         "2025-01", json.dumps({"expected_amount": [None, 100.0]})),
+        ("2020-02-01T09:00:00", "b", None, "anticipated_expenses", f"{grant_id}|{salaries}|2025-01", grant_id,
+         "2025-01", json.dumps({"expected_amount": [100.0, 150.0]})),
+    ])
+    with pytest.raises(ValueError, match="at least"):
+        compact_audit_log(0)
+    assert compact_audit_log() == 2
+    assert _log(grant_id, "anticipated_expenses") == []
+    assert db_utils.fetch_one("SELECT COUNT(*) FROM audit_compaction")[0] == 0
+    edits, changes = db_utils.fetch_one("SELECT edits, changes FROM audit_snapshots WHERE grant_id = ?", (grant_id,))
+    assert (edits, json.loads(changes)) == (2, {"expected_amount": [None, 150.0]})
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 175)])
+    with pytest.raises(Exception, match="audit_log"):
+        db_utils.execute_query("DELETE FROM audit_log")
+    assert len(_log(grant_id, "anticipated_expenses")) == 1
+
+
+# --- Attribution ---
+def test_page_saves_record_the_session_user_and_page(grant):
+    grant_id, (salaries, _) = grant
+    session = {SESSION_USER_KEY: "Dana Reyes"}
+    with session_edits(session, "Monthly Planning"):
+        db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 100)])
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 120)])  # outside a page save
+
+    logged = db_utils.fetch_all("SELECT changed_by, page FROM audit_log WHERE grant_id = ? AND table_name = ? ORDER BY id",
+        (grant_id, "anticipated_expenses"))
+    assert tuple(logged[0]) == ("Dana Reyes", "Monthly Planning")
+    assert logged[1][0] == DEFAULT_USER != "Dana Reyes"
+
+
+def test_page_saves_need_a_name(grant):
+    grant_id, (salaries, _) = grant
+    with pytest.raises(ValueError, match="Enter your name"):
+        with session_edits({SESSION_USER_KEY: "  "}, "Monthly Planning"):
+            db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 100)])
+    assert _log(grant_id, "anticipated_expenses") == []
+
+
+# --- Writers ---
+def test_resaving_actuals_refreshes_date_without_logging(grant):
+    grant_id, (salaries, _) = grant
+    rows = [(grant_id, "2025-01", "8705", salaries, 100.0, "")]
+    assert db_utils.save_actual_expense_rows(rows, date_submitted="2025-02-01") == 1
+    assert db_utils.save_actual_expense_rows(rows, date_submitted="2025-03-01") == 1
+    assert db_utils.fetch_one("SELECT date_submitted FROM actual_expenses WHERE grant_id = ?", (grant_id,))[0] == "2025-03-01"
+    assert [changes for *_, changes in _log(grant_id, "actual_expenses")] == [{"amount": [None, 100.0]}]
+
+
+def test_line_item_writers_are_logged(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.update_line_item_allocated(salaries, 7000.0)
+    db_utils.add_line_item(grant_id, "Travel", "", 500.0)
+    travel = db_utils.fetch_one("SELECT id FROM grant_line_items WHERE name = ?", ("Travel",))[0]
+    assert [(key, changes) for _, key, _, changes in _log(grant_id, "grant_line_items")][-2:] == [
+        (str(salaries), {"allocated_amount": [6000.0, 7000.0]}),
+        (str(travel), {"name": [None, "Travel"], "allocated_amount": [None, 500.0]}),
+    ]
+
+
+def test_deletes_are_logged_as_null(grant):
+    grant_id, (salaries, supplies) = grant
+    db_utils.save_actual_expense_rows([(grant_id, "2025-01", "8705", salaries, 100.0, "rent")])
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 250), (supplies, "2025-01", 75)])
+    logged = len(_log(grant_id))
+
+    db_utils.delete_line_item(salaries)  # cascades to its actual and anticipated rows
+    deleted = {(table, key): changes for table, key, _, changes in _log(grant_id)[logged:]}
+    assert deleted == {
+        ("grant_line_items", str(salaries)): {"name": ["Salaries", None], "allocated_amount": [6000.0, None]},
+        ("actual_expenses", f"{grant_id}|2025-01|8705|{salaries}"): {"amount": [100.0, None], "notes": ["rent", None]},
+        ("anticipated_expenses", f"{grant_id}|{salaries}|2025-01"): {"expected_amount": [250.0, None]},
+    }
+
+    db_utils.delete_anticipated_expenses_for_grant(grant_id)
+    assert _log(grant_id)[-1][3] == {"expected_amount": [75.0, None]}
+
+    logged = len(_log(grant_id))
+    db_utils.delete_grant(grant_id)
+    assert [(table, changes) for table, _, _, changes in _log(grant_id)[logged:]] == [
+        ("grant_line_items", {"name": ["Supplies", None], "allocated_amount": [6000.0, None]}),
+    ]
+
+
+def test_seeding_the_plan_logs_new_rows_only(grant):
+    grant_id, (salaries, supplies) = grant
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 999)])
+    logged = len(_log(grant_id))
+    assert db_utils.initialize_anticipated_expenses_for_grant(grant_id, "2025-01-01", "2025-06-30") == 11
+    keys = [key for _, key, _, _ in _log(grant_id)[logged:]]
+    assert len(keys) == 11 and f"{grant_id}|{salaries}|2025-01" not in keys
@@ -0,0 +1,57 @@
+# tests/test_concurrency.py
+# Concurrent writers (helpers/db_connection.py storage profiles and busy
+# retries, helpers/db_backend.py transactions): simultaneous saves must not
+# fail and must leave monthly_rollup in step with the expense tables.
+
+import threading
+
+import pytest
+
+from helpers import db_connection, db_utils
+from helpers.rollup import verify_rollup
+
+WRITERS = 4
+WRITES = 10  # save rounds per writer
+MONTHS = ["2025-01", "2025-02", "2025-03"]
+
+
+def _writer(grant_id, mappings, writer_id, errors):
+    """Saves actual expenses, planned amounts and allocations the way the pages do."""
+    for n in range(WRITES):
+        month = MONTHS[n % len(MONTHS)]
+        amount = float(writer_id * 1000 + n)
+        try:
+            db_utils.save_actual_expenses_bulk(
+                grant_id, month, [(code, li, amount, f"writer {writer_id}") for code, li in mappings]
+            )
+            _, li = mappings[n % len(mappings)]
+            db_utils.update_anticipated_expense(grant_id, li, month, amount)
+            db_utils.update_line_item_allocated(li, amount)
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+
+
+@pytest.mark.parametrize("profile", sorted(db_connection.STORAGE_PROFILES))
+def test_concurrent_writers(grant, backend, profile, monkeypatch):
+    if backend.name != "sqlite" and profile != "wal":
+        pytest.skip("storage profiles only apply to SQLite")
+    grant_id, (salaries, supplies) = grant
+    mappings = [("8705", salaries), ("8706", supplies)]
+    for code, li in mappings:
+        db_utils.add_qb_mapping(grant_id, code, li)
+    db_utils.initialize_anticipated_expenses_for_grant(grant_id, "2025-01-01", "2025-06-30")
+    if backend.name == "sqlite":
+        monkeypatch.setattr(db_connection, "STORAGE_PROFILE", profile)
+        backend.close()  # every writer opens its connection under the profile
+
+    errors = []
+    threads = [threading.Thread(target=_writer, args=(grant_id, mappings, i, errors)) for i in range(WRITERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert verify_rollup() == []
+    saved = db_utils.fetch_one("SELECT COUNT(*) FROM actual_expenses WHERE grant_id = ?", (grant_id,))[0]
+    assert saved == len(MONTHS) * len(mappings)
@@ -0,0 +1,185 @@
+# tests/test_db_backend.py
+# The db_utils shared ops on each backend (helpers/db_backend.py): dialect
+# translation, insert_returning_id, the upsert paths, transactions and the
+# per-thread connection pool.
+
+import threading
+
+import pytest
+
+from helpers import db_utils, query_log
+from helpers.db_backend import translate_to_postgres
+
+
+# --- Dialect translation ---
+@pytest.mark.parametrize("query, expected", [
+    ("SELECT * FROM grants WHERE id = ?", "SELECT * FROM grants WHERE id = %s"),
+    ("SELECT IFNULL(amount, 0) FROM actual_expenses", "SELECT COALESCE(amount, 0) FROM actual_expenses"),
+    ("BEGIN IMMEDIATE", "BEGIN"),
+    ("EXPLAIN QUERY PLAN SELECT 1", "EXPLAIN SELECT 1"),
+    ("INSERT OR IGNORE INTO funders (name, type) VALUES (?, ?);",
+     "INSERT INTO funders (name, type) VALUES (%s, %s) ON CONFLICT DO NOTHING"),
+    ("SELECT name FROM qb_accounts WHERE name LIKE ?", "SELECT name FROM qb_accounts WHERE name LIKE %s"),
+])
+def test_translate_to_postgres(query, expected):
+    assert translate_to_postgres(query) == expected
+
+
+def test_translate_leaves_placeholders_in_string_literals_alone():
+    query = "SELECT * FROM grants WHERE notes = 'why?' AND id = ?"
+    assert translate_to_postgres(query) == "SELECT * FROM grants WHERE notes = 'why?' AND id = %s"
+
+
+def test_translate_escapes_percent_only_with_params():
+    # psycopg2 formats the whole statement, string literals included, only when params are passed
+    query = "SELECT amount % 2 FROM grants WHERE notes LIKE '50% done%'"
+    assert translate_to_postgres(query + " AND id = ?", True) == (
+        "SELECT amount %% 2 FROM grants WHERE notes LIKE '50%% done%%' AND id = %s")
+    assert translate_to_postgres(query, False) == query
+
+
+def test_percent_in_literals_round_trips(grant):
+    grant_id, _ = grant
+    db_utils.execute_query("UPDATE grants SET notes = '50% done' WHERE id = ?", (grant_id,))
+    assert db_utils.fetch_one("SELECT notes FROM grants WHERE notes LIKE '50%' AND id = ?", (grant_id,))[0] == "50% done"
+    assert db_utils.fetch_one("SELECT COUNT(*) FROM grants WHERE notes LIKE '50%'")[0] == 1
+
+
+# --- insert_returning_id ---
+def test_insert_and_return_id(grant):
+    grant_id, _ = grant
+    first = db_utils.insert_and_return_id(
+        "INSERT INTO grant_line_items (grant_id, name, description, allocated_amount) VALUES (?, ?, ?, ?)",
+        (grant_id, "Travel", "", 100.0),
+    )
+    second = db_utils.insert_and_return_id(
+        "INSERT INTO grant_line_items (grant_id, name, description, allocated_amount) VALUES (?, ?, ?, ?)",
+        (grant_id, "Rent", "", 200.0),
+    )
+    assert second > first
+    assert db_utils.fetch_one("SELECT name FROM grant_line_items WHERE id = ?", (first,))[0] == "Travel"
+    assert db_utils.fetch_one("SELECT name FROM grant_line_items WHERE id = ?", (second,))[0] == "Rent"
+
+
+def test_insert_and_return_id_inside_transaction(grant):
+    grant_id, _ = grant
+    with db_utils.transaction() as conn:
+        new_id = db_utils.get_backend().insert_returning_id(
+            conn, "INSERT INTO grant_line_items (grant_id, name, description, allocated_amount) VALUES (?, ?, ?, ?)",
+            (grant_id, "Travel", "", 100.0),
+        )
+        # Shared ops inside the block see the uncommitted row
+        assert db_utils.fetch_one("SELECT name FROM grant_line_items WHERE id = ?", (new_id,))[0] == "Travel"
+    assert db_utils.fetch_one("SELECT COUNT(*) FROM grant_line_items WHERE id = ?", (new_id,))[0] == 1
+
+
+# --- Upserts ---
+def test_save_actual_expense_rows_upserts(grant):
+    grant_id, (salaries, supplies) = grant
+    db_utils.save_actual_expense_rows([
+        (grant_id, "2025-01", "8705", salaries, 100.0, ""),
+        (grant_id, "2025-01", "8706", supplies, 50.0, "paper"),
+    ], date_submitted="2025-02-01")
+    db_utils.save_actual_expense_rows([
+        (grant_id, "2025-01", "8705", salaries, 125.0, "revised"),
+    ], date_submitted="2025-02-15")
+
+    rows = db_utils.fetch_all("""
+        SELECT qb_code, amount, notes, date_submitted FROM actual_expenses
+        WHERE grant_id = ? ORDER BY qb_code
+    """, (grant_id,))
+    assert [(code, amount, notes, str(submitted)) for code, amount, notes, submitted in rows] == [
+        ("8705", 125.0, "revised", "2025-02-15"),
+        ("8706", 50.0, "paper", "2025-02-01"),
+    ]
+
+
+def test_update_anticipated_expenses_bulk_inserts_then_updates(grant):
+    grant_id, (salaries, supplies) = grant
+    assert db_utils.update_anticipated_expenses_bulk(grant_id, [
+        (salaries, "2025-01", 1000), (supplies, "2025-01", 500),
+    ]) == 2
+    db_utils.update_anticipated_expenses_bulk(grant_id, [(salaries, "2025-01", 1200.004)])
+
+    rows = db_utils.fetch_all("""
+        SELECT line_item_id, expected_amount FROM anticipated_expenses
+        WHERE grant_id = ? AND month = ? ORDER BY line_item_id
+    """, (grant_id, "2025-01"))
+    assert [tuple(row) for row in rows] == [(salaries, 1200.0), (supplies, 500.0)]
+
+
+def test_insert_or_ignore_skips_existing_rows(grant):
+    grant_id, (salaries, supplies) = grant
+    assert db_utils.add_qb_mappings_bulk(grant_id, [("8705", salaries)]) == 1
+    assert db_utils.add_qb_mappings_bulk(grant_id, [("8705", salaries), ("8706", supplies)]) == 1
+    assert db_utils.add_qb_mapping(grant_id, "8705", salaries) is False
+
+    inserted = db_utils.initialize_anticipated_expenses_for_grant(grant_id, "2025-01-01", "2025-06-30")
+    assert inserted == 12
+    assert db_utils.initialize_anticipated_expenses_for_grant(grant_id, "2025-01-01", "2025-06-30") == 0
+    assert db_utils.fetch_one("SELECT COUNT(*) FROM anticipated_expenses WHERE grant_id = ?", (grant_id,))[0] == 12
+
+
+# --- Transactions ---
+def test_transaction_rolls_back_shared_ops(grant):
+    grant_id, _ = grant
+    with pytest.raises(RuntimeError):
+        with db_utils.transaction():
+            db_utils.execute_query("UPDATE grants SET notes = ? WHERE id = ?", ("changed", grant_id))
+            with db_utils.transaction():  # nested: joins the outer one
+                db_utils.add_line_item(grant_id, "Travel", "", 10.0)
+            raise RuntimeError("abort")
+    assert db_utils.fetch_one("SELECT notes FROM grants WHERE id = ?", (grant_id,))[0] != "changed"
+    assert db_utils.fetch_one("SELECT COUNT(*) FROM grant_line_items WHERE grant_id = ?", (grant_id,))[0] == 2
+
+
+def test_failed_explain_leaves_the_transaction_usable(grant, monkeypatch):
+    grant_id, _ = grant
+    monkeypatch.setattr(query_log, "SLOW_QUERY_MS", 0.0)  # explain every statement
+    with db_utils.transaction():
+        db_utils.execute_query("UPDATE grants SET notes = ? WHERE id = ?", ("kept", grant_id))
+        db_utils.execute_query("CREATE TEMP TABLE IF NOT EXISTS explain_probe (x INTEGER)")  # no plan on PostgreSQL
+        db_utils.execute_query("UPDATE grants SET status = ? WHERE id = ?", ("Closed", grant_id))
+    assert tuple(db_utils.fetch_one("SELECT notes, status FROM grants WHERE id = ?", (grant_id,))) == ("kept", "Closed")
+
+
+# --- Pooled connections ---
+def test_one_connection_per_thread(backend):
+    seen = {}
+    all_connected = threading.Barrier(4)
+
+    def worker(name):
+        first = backend.get_connection()
+        db_utils.fetch_one("SELECT 1")
+        seen[name] = (first, backend.get_connection())
+        all_connected.wait()  # hold on so no thread can inherit an exited one's connection
+
+    main = backend.get_connection()
+    assert backend.get_connection() is main or backend.get_connection().raw is main.raw
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    raw = {name: [getattr(c, "raw", c) for c in pair] for name, pair in seen.items()}
+    assert all(first is again for first, again in raw.values())  # reused within a thread
+    assert len({id(first) for first, _ in raw.values()}) == 4  # not shared between live threads
+    assert backend.stats()["opened"] >= 5
+
+
+def test_dead_thread_connections_are_released(backend):
+    def worker():
+        db_utils.fetch_one("SELECT 1")
+
+    for _ in range(3):
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join()
+    db_utils.fetch_one("SELECT 1")  # the next new connection reaps exited threads
+
+    t = threading.Thread(target=worker)
+    t.start()
+    t.join()
+    assert backend.stats()["open"] <= 3
@@ -0,0 +1,23 @@
+# tests/test_forecast.py
+# Forecast distribution strategies (helpers/forecast.py).
+
+import pytest
+
+from helpers.date_helpers import generate_month_range
+from helpers.forecast import plan_amounts
+
+MONTHS = generate_month_range("2025-01-01", "2027-12-31")  # 36 months
+
+
+@pytest.mark.parametrize("strategy", ["front_loaded", "back_loaded"])
+@pytest.mark.parametrize("allocation", [0.05, 1.0, 2.0, 10.0, 1234.56])
+def test_weighted_plans_stay_non_negative_and_add_up(strategy, allocation):
+    plan = plan_amounts(MONTHS, [(1, "Supplies", allocation)], strategy)
+    assert (plan["expected_amount"] >= 0).all()
+    assert round(plan["expected_amount"].sum(), 2) == allocation
+    assert (plan["expected_amount"] * 100).round(6).mod(1).eq(0).all()  # whole cents
+
+
+def test_front_loaded_plan_leans_early():
+    amounts = plan_amounts(MONTHS, [(1, "Supplies", 10.0)], "front_loaded")["expected_amount"].tolist()
+    assert amounts == sorted(amounts, reverse=True)
@@ -0,0 +1,72 @@
+# tests/test_grant_controller.py
+# Grant renewals (clone_grant).
+
+import pytest
+
+from helpers import db_utils
+from helpers.grant_controller import clone_grant
+
+
+def _count(table):
+    return db_utils.fetch_one(f"SELECT COUNT(*) FROM {table}")[0]
+
+
+def test_clone_grant_copies_line_items_mappings_and_plan(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.add_qb_mapping(grant_id, "8705", salaries)
+
+    new_id = clone_grant(grant_id, "Test Grant 2026", scale=1.5, strategy="front_loaded")
+
+    assert db_utils.fetch_one("SELECT start_date, end_date, total_award FROM grants WHERE id = ?", (new_id,)) == (
+        "2026-01-01", "2026-06-30", 18000.0)
+    line_items = db_utils.fetch_all(
+        "SELECT id, name, allocated_amount FROM grant_line_items WHERE grant_id = ? ORDER BY id", (new_id,))
+    assert [(name, amount) for _, name, amount in line_items] == [("Salaries", 9000.0), ("Supplies", 9000.0)]
+    assert db_utils.fetch_all(
+        "SELECT qb_code, grant_line_item_id FROM qb_to_grant_mapping WHERE grant_id = ?", (new_id,)
+    ) == [("8705", line_items[0][0])]
+    planned = db_utils.fetch_all("""
+        SELECT line_item_id, SUM(expected_amount), MAX(expected_amount) FROM anticipated_expenses
+        WHERE grant_id = ? GROUP BY line_item_id ORDER BY line_item_id
+    """, (new_id,))
+    assert [round(total, 2) for _, total, _ in planned] == [9000.0, 9000.0]
+    first_month = db_utils.fetch_one("""
+        SELECT expected_amount FROM anticipated_expenses WHERE grant_id = ? AND line_item_id = ? AND month = ?
+    """, (new_id, line_items[0][0], "2026-01"))[0]
+    assert first_month == planned[0][2]  # front-loaded
+
+
+@pytest.mark.parametrize("strategy", ["remaining", "no_such_strategy"])
+def test_clone_grant_rejects_strategies_that_need_the_new_grant(grant, strategy):
+    grant_id, _ = grant
+    before = _count("grants")
+    with pytest.raises(ValueError, match="can't be planned"):
+        clone_grant(grant_id, "Test Grant 2026", strategy=strategy)
+    assert _count("grants") == before
+
+
+def test_clone_grant_rolls_back_when_the_plan_fails(grant):
+    grant_id, _ = grant
+    before = (_count("grants"), _count("grant_line_items"))
+    with pytest.raises(ValueError, match="profile"):
+        clone_grant(grant_id, "Test Grant 2026", strategy="seasonal")  # no profile
+    assert (_count("grants"), _count("grant_line_items")) == before
+
+
+def test_clone_grant_without_source_dates_needs_explicit_dates(grant):
+    grant_id, _ = grant
+    db_utils.execute_query("UPDATE grants SET start_date = NULL WHERE id = ?", (grant_id,))
+    with pytest.raises(ValueError, match="no start date"):
+        clone_grant(grant_id, "Test Grant 2026")
+
+    new_id = clone_grant(grant_id, "Test Grant 2026", start_date="2026-01-01")
+    assert db_utils.fetch_one("SELECT start_date, end_date FROM grants WHERE id = ?", (new_id,)) == (
+        "2026-01-01", "2026-06-30")
+
+
+def test_clone_grant_is_audited(grant):
+    grant_id, _ = grant
+    new_id = clone_grant(grant_id, "Test Grant 2026")
+    logged = db_utils.fetch_all(
+        "SELECT table_name, COUNT(*) FROM audit_log WHERE grant_id = ? GROUP BY table_name ORDER BY table_name", (new_id,))
+    assert [tuple(row) for row in logged] == [("anticipated_expenses", 12), ("grant_line_items", 2)]
@@ -0,0 +1,32 @@
+# tests/test_mapping_rules.py
+# Rule-based QB code mapping (helpers/mapping_rules.py).
+
+from helpers import db_utils
+from helpers.mapping_rules import apply_mapping_rules, plan_mappings
+
+
+def test_same_named_subcategories_are_told_apart(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.execute_query("INSERT INTO qb_parent_categories (name) VALUES (?)", ("Payroll",))
+    payroll = db_utils.fetch_one("SELECT id FROM qb_parent_categories WHERE name = ?", ("Payroll",))[0]
+    db_utils.execute_query("INSERT INTO qb_categories (name, parent_id) VALUES (?, ?)", ("Program", payroll))
+    payroll_program = db_utils.fetch_one("SELECT id FROM qb_categories WHERE parent_id = ?", (payroll,))[0]
+    db_utils.execute_query("INSERT INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)",
+                           ("6010", "Program Staff", payroll_program))
+
+    labels = dict(db_utils.get_subcategory_labels())
+    assert labels[payroll_program] == "Payroll / Program"
+    assert sorted(labels.values()) == ["Expenses / Program", "Payroll / Program"]
+
+    assert apply_mapping_rules(grant_id, [("subcategory", payroll_program, salaries)]) == 1
+    assert db_utils.fetch_all("SELECT qb_code FROM qb_to_grant_mapping WHERE grant_id = ?", (grant_id,)) == [("6010",)]
+
+
+def test_planned_pairs_are_written_as_previewed(grant):
+    grant_id, (salaries, supplies) = grant
+    db_utils.add_qb_mapping(grant_id, "8705", salaries)
+    plan = plan_mappings(grant_id, [("codes", ["8705", "8706"], salaries), ("codes", ["8706"], supplies)])
+    assert (plan["new"], plan["already_mapped"], plan["ambiguous"]) == (
+        [("8706", salaries), ("8706", supplies)], 1, ["8706"])
+    assert db_utils.add_qb_mappings_bulk(grant_id, plan["new"]) == 2
+    assert db_utils.add_qb_mappings_bulk(grant_id, plan["new"]) == 0
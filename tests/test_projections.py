@@ -0,0 +1,64 @@
+# tests/test_projections.py
+# Incremental projection grids (helpers/projections.py) against a full recompute.
+
+import pandas as pd
+
+from helpers import db_utils, projections
+from helpers.query_cache import invalidate
+
+AS_OF = "2025-03"
+
+
+def _full_grid():
+    grants, line_items = projections._load_grants(active_only=True)
+    return projections._project(grants, line_items, projections._load_rollup(grants["grant_id"].tolist()), AS_OF)
+
+
+def _second_grant():
+    funder_id = db_utils.fetch_one("SELECT id FROM funders")[0]
+    db_utils.add_grant("Other Grant", funder_id, "2025-01-01", "2025-12-31", 1000.0, "Active", "")
+    grant_id = db_utils.fetch_one("SELECT id FROM grants WHERE name = ?", ("Other Grant",))[0]
+    db_utils.add_line_item(grant_id, "Travel", "", 1000.0)
+    return grant_id
+
+
+def test_only_changed_grants_are_recomputed(grant, monkeypatch):
+    grant_id, (salaries, supplies) = grant
+    other_id = _second_grant()
+    db_utils.save_actual_expense_rows([
+        (grant_id, "2025-01", "8705", salaries, 1000.0, ""),
+        (grant_id, "2025-02", "8706", supplies, 400.0, ""),
+    ])
+    pd.testing.assert_frame_equal(projections._active_grid(AS_OF), _full_grid())
+
+    projected = []
+    project = projections._project
+    monkeypatch.setattr(projections, "_project", lambda grants, *args: (
+        projected.append(grants["grant_id"].tolist()), project(grants, *args))[1])
+
+    db_utils.save_actual_expense_rows([(grant_id, "2025-03", "8705", salaries, 2500.0, "")])
+    pd.testing.assert_frame_equal(projections._active_grid(AS_OF), _full_grid())
+    assert projected[0] == [grant_id]
+
+    projected.clear()
+    db_utils.update_line_item_allocated(db_utils.fetch_one(
+        "SELECT id FROM grant_line_items WHERE grant_id = ?", (other_id,))[0], 50.0)
+    pd.testing.assert_frame_equal(projections._active_grid(AS_OF), _full_grid())
+    assert projected[0] == [other_id]
+
+    projected.clear()
+    db_utils.execute_query("UPDATE grants SET end_date = ? WHERE id = ?", ("2025-04-30", grant_id))
+    invalidate("grants")
+    pd.testing.assert_frame_equal(projections._active_grid(AS_OF), _full_grid())
+    assert projected[0] == [grant_id]
+
+
+def test_grant_projection_follows_edits(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.save_actual_expense_rows([(grant_id, "2025-01", "8705", salaries, 3000.0, "")])
+    summary = projections.get_grant_projection(grant_id, AS_OF)
+    assert summary.loc[summary["line_item_id"] == salaries, "exhaustion_month"].item() == "2025-06"
+
+    db_utils.save_actual_expense_rows([(grant_id, "2025-01", "8705", salaries, 600.0, "")])
+    summary = projections.get_grant_projection(grant_id, AS_OF)
+    assert summary.loc[summary["line_item_id"] == salaries, "spent_to_date"].item() == 600.0
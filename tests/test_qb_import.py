@@ -0,0 +1,99 @@
+# tests/test_qb_import.py
+# QuickBooks GL import (helpers/qb_import.py).
+
+import io
+import json
+
+import pytest
+
+from helpers import db_utils
+from helpers.qb_import import apply_chart, import_gl_csv, parse_account_code
+
+GL_EXPORT = """General Ledger
+Date,Account,Amount
+01/15/2025,Expenses:Program:8705 · Workshops,100.00
+01/20/2025,Expenses:Program:8706 · Materials,40.00
+02/03/2025,Expenses:Program:8710 · Catering,15.00
+"""
+
+
+def _other_grant(funder_id, line_item_name):
+    db_utils.add_grant("Other Grant", funder_id, "2025-01-01", "2025-12-31", 1000.0, "Active", "")
+    grant_id = db_utils.fetch_one("SELECT id FROM grants WHERE name = ?", ("Other Grant",))[0]
+    db_utils.add_line_item(grant_id, line_item_name, "", 1000.0)
+    line_item_id = db_utils.fetch_one("SELECT id FROM grant_line_items WHERE grant_id = ?", (grant_id,))[0]
+    return grant_id, line_item_id
+
+
+def test_rows_for_other_grants_are_reported_separately(grant):
+    grant_id, (salaries, _) = grant
+    funder_id = db_utils.fetch_one("SELECT funder_id FROM grants WHERE id = ?", (grant_id,))[0]
+    other_id, other_line_item = _other_grant(funder_id, "Materials")
+    db_utils.add_qb_mapping(grant_id, "8705", salaries)
+    db_utils.add_qb_mapping(other_id, "8706", other_line_item)
+
+    report = import_gl_csv(io.StringIO(GL_EXPORT), grant_ids=[grant_id], dry_run=True)
+    assert report["rows_imported"] == 1
+    assert report["other_grant_codes"] == {"8706": 40.0}
+    assert report["unmapped_codes"] == {}
+    assert report["unknown_codes"] == {"8710": 15.0}
+
+    report = import_gl_csv(io.StringIO(GL_EXPORT), dry_run=True)
+    assert report["rows_imported"] == 2
+    assert report["other_grant_codes"] == {}
+
+
+def test_import_keeps_notes_typed_on_existing_rows(grant):
+    grant_id, (salaries, supplies) = grant
+    db_utils.add_qb_mapping(grant_id, "8705", salaries)
+    db_utils.add_qb_mapping(grant_id, "8706", supplies)
+    db_utils.save_actual_expense_rows([
+        (grant_id, "2025-01", "8705", salaries, 80.0, "Spring workshop deposit"),
+        (grant_id, "2025-01", "8706", supplies, 10.0, ""),
+    ])
+
+    import_gl_csv(io.StringIO(GL_EXPORT), grant_ids=[grant_id])
+    rows = db_utils.fetch_all(
+        "SELECT qb_code, amount, notes FROM actual_expenses WHERE grant_id = ? ORDER BY qb_code", (grant_id,))
+    assert [tuple(row) for row in rows] == [
+        ("8705", 100.0, "Spring workshop deposit"),
+        ("8706", 40.0, "Imported from QuickBooks GL"),
+    ]
+    logged = db_utils.fetch_all(
+        "SELECT changes FROM audit_log WHERE table_name = ? AND row_key LIKE ? ORDER BY id",
+        ("actual_expenses", f"{grant_id}|2025-01|8705|%"))
+    assert json.loads(logged[-1][0]) == {"amount": [80.0, 100.0]}
+
+
+@pytest.mark.parametrize("account, code", [
+    ("Expenses:Program:8705 · Workshops", "8705"),
+    ("8705.10 Workshop supplies", "8705.10"),
+    ("  8706 Materials", "8706"),
+    ("Expenses:Rent 2025", None),
+    ("Expenses:Suite 200:Utilities", None),
+    ("", None),
+])
+def test_parse_account_code_needs_a_leading_number(account, code):
+    assert parse_account_code(account) == code
+
+
+def test_accounts_without_a_code_are_unmapped(grant):
+    grant_id, (salaries, _) = grant
+    db_utils.add_qb_mapping(grant_id, "8705", salaries)
+    export = GL_EXPORT + "01/31/2025,Expenses:Rent 2025,500.00\n,Total for Expenses,655.00\n"
+    report = import_gl_csv(io.StringIO(export), grant_ids=[grant_id], dry_run=True)
+    assert report["unmapped_codes"] == {"8706": 40.0, "Expenses:Rent 2025": 500.0}
+    assert "2025" not in report["unknown_codes"]
+    assert report["rows_skipped"] == 1
+
+
+def test_apply_chart_counts_new_parent_categories(grant):
+    result = apply_chart([
+        ("8705", "Workshops", "Program", "Expenses"),  # existing parent
+        ("6010", "Program Staff", "Staff", "Payroll"),
+        ("6020", "Benefits", "Staff", "Payroll"),
+        ("7010", "Rent", "Facilities", "Occupancy"),
+    ])
+    assert result["parent_categories_created"] == 2
+    assert result["subcategories_created"] == 2
+    assert apply_chart([("7010", "Rent", "Facilities", "Occupancy")])["parent_categories_created"] == 0
@@ -0,0 +1,17 @@
+# tests/test_qb_search.py
+# QB code search for the pickers (helpers/qb_search.py).
+
+from helpers import db_utils
+from helpers.qb_search import search_qb_codes
+
+
+def test_empty_query_lists_most_mapped_codes_first(grant):
+    grant_id, (_, supplies) = grant
+    db_utils.execute_many("INSERT INTO qb_accounts (code, name, category_id) VALUES (?, ?, ?)",
+                          [(str(code), f"Account {code}", 1) for code in range(9000, 9100)])
+    db_utils.add_qb_mapping(grant_id, "9050", supplies)
+
+    assert [entry[0] for entry in search_qb_codes("", limit=2)] == ["9050", "8705"]
+    assert len(search_qb_codes("", limit=50)) == 50
+    assert len(search_qb_codes("", limit=None)) == 102
+    assert search_qb_codes("workshops")[0][0] == "8705"
@@ -0,0 +1,18 @@
+# tests/test_reports.py
+# Monthly report export (helpers/reports.py).
+
+import os
+
+from helpers import db_utils
+from helpers.reports import export_active_grant_reports
+
+
+def test_similar_grant_names_get_their_own_files(grant, tmp_path):
+    grant_id, _ = grant
+    funder_id = db_utils.fetch_one("SELECT funder_id FROM grants WHERE id = ?", (grant_id,))[0]
+    db_utils.add_grant("Test  Grant!", funder_id, "2025-01-01", "2025-06-30", 1000.0, "Active", "")
+
+    paths = export_active_grant_reports("2025-01", str(tmp_path), fmt="csv", processes=1)
+    assert len(paths) == 2
+    assert len({os.path.basename(p) for p in paths}) == 2
+    assert all(os.path.exists(p) for p in paths)